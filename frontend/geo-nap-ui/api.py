@@ -0,0 +1,402 @@
+# api.py
+import argparse
+import asyncio
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from http import HTTPStatus
+
+import numpy as np
+
+import engine
+import metrics
+import shared_catalog
+from catalog import current_version
+from cli import _init_worker, scenario_arguments
+from models.data_locality import STRATEGIES
+from simulator.monte_carlo import monte_carlo_samples
+
+# Plain asyncio HTTP/1.1 front end for the engine. The event loop only parses
+# requests and batches them; every plan runs in the worker pool.
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8600
+MAX_BODY_BYTES = 1 << 20
+# Requests queued within MAX_WAIT_MS go to the pool together, at most
+# MAX_BATCH per flush, split across the workers.
+MAX_BATCH = 64
+MAX_WAIT_MS = 2.0
+MAX_PENDING = 10_000
+MAX_MONTE_CARLO_RUNS = 100_000
+# Same range as the UI's top K input; the k-best search grows with it.
+MAX_TOP_K = 20
+PERCENTILES = (5, 50, 95)
+# Request flags passed to the engine as-is: per-stage timings and a cProfile
+# report of that one request, both returned inside the breakdown.
+INSTRUMENT_KEYS = ("timings", "profile")
+# Scenario fields by the JSON type they take. Requests are checked against
+# these before they reach a worker, so a worker error is a server error.
+NUMBER_FIELDS = (
+    "required_gpus", "r_max", "model_size", "steps", "dataset_size_gb", "epochs", "batch_size",
+    "sample_size_gb", "training_hours", "base_compute_sec", "compute_scale_per_gb",
+    "bandwidth_base_gbps", "stale_after_hours", "cache_hit_ratio",
+)
+STRING_FIELDS = ("data_source_provider", "topology", "gpu_model", "stale_policy", "origin_region")
+CHOICE_FIELDS = {
+    "egress_pricing": ("tiered", "flat"),
+    "data_strategy": ("auto",) + STRATEGIES,
+    "network_model": ("average", "fair_share"),
+}
+
+ROUTES = {
+    ("POST", "/plan"): "plan",
+    ("POST", "/plan/by-model"): "by_model",
+    ("POST", "/plan/monte-carlo"): "monte_carlo",
+}
+# Route kind -> solver label of geo_nap_plan_duration_seconds.
+SOLVERS = {"plan": "greedy", "by_model": "greedy_by_model", "monte_carlo": "greedy"}
+KNOWN_PATHS = {path for _, path in ROUTES} | {"/health", "/stats", "/metrics"}
+
+
+class RequestError(ValueError):
+    # Client error; mapped to 400 with the message as the error text.
+    pass
+
+
+def _jsonable(value):
+    # Breakdowns carry tuple keys (pairwise costs) and numpy scalars.
+    if isinstance(value, dict):
+        return {"|".join(k) if isinstance(k, tuple) else str(k): _jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def _plan_result(placement, total_cost, forbidden, breakdown):
+    return {
+        "placement": placement,
+        "total_cost": total_cost,
+        "forbidden": sorted(set(forbidden)),
+        "breakdown": breakdown,
+    }
+
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _is_number(value):
+    return (_is_int(value) or isinstance(value, float)) and math.isfinite(value)
+
+
+def _check_scenario(body):
+    for key in NUMBER_FIELDS:
+        if body.get(key) is not None and not _is_number(body[key]):
+            raise RequestError(f"{key} must be a number")
+    for key in STRING_FIELDS:
+        if body.get(key) is not None and not isinstance(body[key], str):
+            raise RequestError(f"{key} must be a string")
+    for key, choices in CHOICE_FIELDS.items():
+        if body.get(key) is not None and body[key] not in choices:
+            raise RequestError(f"{key} must be one of {', '.join(choices)}")
+    if body.get("top_k") is not None and not (_is_int(body["top_k"]) and 1 <= body["top_k"] <= MAX_TOP_K):
+        raise RequestError(f"top_k must be an integer in 1..{MAX_TOP_K}")
+    overrides = body.get("egress_overrides")
+    if overrides is not None and not (
+        isinstance(overrides, dict) and all(_is_number(v) for v in overrides.values())
+    ):
+        raise RequestError("egress_overrides must map providers to numbers")
+    baseline = body.get("egress_baseline_gb")
+    if baseline is not None and not (
+        isinstance(baseline, dict) and all(_is_number(v) and v >= 0 for v in baseline.values())
+    ):
+        raise RequestError("egress_baseline_gb must map providers to non-negative numbers")
+    try:
+        return scenario_arguments(body)
+    except ValueError as exc:
+        raise RequestError(str(exc)) from None
+
+
+def _parse_request(kind, body):
+    # Validates a request body; returns the request _evaluate runs.
+    body = dict(body)
+    request = {
+        "catalog_version": body.pop("catalog_version", None),
+        "instrument": {key: bool(body.pop(key)) for key in INSTRUMENT_KEYS if key in body},
+    }
+    if request["catalog_version"] is not None and not isinstance(request["catalog_version"], str):
+        raise RequestError("catalog_version must be a string")
+    if kind == "by_model":
+        models = body.pop("models", None)
+        if models is not None and not (isinstance(models, list) and all(isinstance(m, str) for m in models)):
+            raise RequestError("models must be a list of strings")
+        request["models"] = models
+    elif kind == "monte_carlo":
+        runs = body.pop("runs", 500)
+        seed = body.pop("seed", None)
+        if not _is_int(runs) or not 1 <= runs <= MAX_MONTE_CARLO_RUNS:
+            raise RequestError(f"runs must be an integer in 1..{MAX_MONTE_CARLO_RUNS}")
+        if seed is not None and not (_is_int(seed) and seed >= 0):
+            raise RequestError("seed must be a non-negative integer")
+        request["runs"], request["seed"] = runs, seed
+    request["args"], request["options"] = _check_scenario(body)
+    return request
+
+
+def _evaluate(kind, request):
+    args, options = request["args"], dict(request["options"])
+    catalog_version = request["catalog_version"]
+    instrument = request["instrument"]
+    if kind == "plan":
+        return _plan_result(*engine.run_geo_nap(*args, catalog_version=catalog_version, **options, **instrument))
+
+    if kind == "by_model":
+        options.pop("top_k", None)
+        results = engine.run_geo_nap_by_model(
+            *args[:-1], models=request["models"], catalog_version=catalog_version, **options, **instrument
+        )
+        return {"results": {model: _plan_result(*result) for model, result in results.items()}}
+
+    # Monte Carlo: the planned cost with +-20% normal noise, as in main.py. Each
+    # request draws from its own generator; workers share the global one.
+    runs = request["runs"]
+    result = _plan_result(*engine.run_geo_nap(*args, catalog_version=catalog_version, **options, **instrument))
+    rng = np.random.default_rng(request["seed"])
+    samples = monte_carlo_samples(result["total_cost"], runs, rng=rng)
+    summary = {"runs": runs, "mean": float(samples.mean()), "std": float(samples.std())}
+    for q, value in zip(PERCENTILES, np.percentile(samples, PERCENTILES)):
+        summary[f"p{q}"] = float(value)
+    return {"plan": result, "cost_distribution": summary}
+
+
+def _run_batch(items):
+    # Worker side: [(kind, request)] -> [(status, payload, compute_ms)]. Requests
+    # were validated by _parse_request, so other errors are the server's.
+    out = []
+    for kind, request in items:
+        started = time.perf_counter()
+        try:
+            status, payload = HTTPStatus.OK, _jsonable(_evaluate(kind, request))
+        except RequestError as exc:
+            status, payload = HTTPStatus.BAD_REQUEST, {"error": str(exc)}
+        except Exception as exc:
+            status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"{type(exc).__name__}: {exc}"}
+        out.append((int(status), payload, (time.perf_counter() - started) * 1000.0))
+    return out
+
+
+class PlanService:
+    # Micro-batching front of the worker pool. Identical requests that arrive
+    # while one is queued or running share its result instead of recomputing.
+
+    def __init__(self, workers=None, max_batch=MAX_BATCH, max_wait_ms=MAX_WAIT_MS):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self._executor = None
+        self._queue = []
+        self._inflight = {}
+        self._timer = None
+        self.stats = {"requests": 0, "coalesced": 0, "batches": 0}
+
+    def start(self):
+        if self.workers <= 1:
+            self._executor = ThreadPoolExecutor(1)
+        else:
+            # Workers attach to one shared copy of the current catalog; later
+            # versions are read from disk by each worker on first use.
+            handle = shared_catalog.share_catalog()
+            self._executor = ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(handle,))
+
+    def close(self):
+        if self._timer is not None:
+            self._timer.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+        shared_catalog.release_all()
+
+    async def submit(self, kind, body, request):
+        # request: body as parsed by _parse_request; identical bodies coalesce.
+        # Returns (status, payload, compute_ms, coalesced).
+        loop = asyncio.get_running_loop()
+        key = (kind, json.dumps(body, sort_keys=True, separators=(",", ":")))
+        self.stats["requests"] += 1
+        future = self._inflight.get(key)
+        coalesced = future is not None
+        if coalesced:
+            self.stats["coalesced"] += 1
+        else:
+            if len(self._inflight) >= MAX_PENDING:
+                return int(HTTPStatus.SERVICE_UNAVAILABLE), {"error": "too many pending requests"}, 0.0, False
+            future = loop.create_future()
+            self._inflight[key] = future
+            self._queue.append((key, kind, request))
+            if len(self._queue) >= self.max_batch:
+                self._flush()
+            elif self._timer is None:
+                self._timer = loop.call_later(self.max_wait, self._flush)
+        status, payload, compute_ms = await asyncio.shield(future)
+        return status, payload, compute_ms, coalesced
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._queue = self._queue, []
+        if not batch:
+            return
+        loop = asyncio.get_running_loop()
+        parts = min(len(batch), self.workers)
+        for i in range(parts):
+            chunk = batch[i::parts]
+            self.stats["batches"] += 1
+            task = loop.run_in_executor(self._executor, _run_batch, [(kind, request) for _, kind, request in chunk])
+            task.add_done_callback(lambda done, chunk=chunk: self._resolve(chunk, done))
+
+    def _resolve(self, chunk, done):
+        try:
+            results = done.result()
+        except Exception as exc:
+            error = (int(HTTPStatus.INTERNAL_SERVER_ERROR), {"error": f"{type(exc).__name__}: {exc}"}, 0.0)
+            results = [error] * len(chunk)
+        for (key, _, _), result in zip(chunk, results):
+            future = self._inflight.pop(key)
+            if not future.done():
+                future.set_result(result)
+
+
+def _response(status, payload, headers=(), keep_alive=True):
+    # str payloads are sent as-is (the metrics exposition), anything else as JSON.
+    if isinstance(payload, str):
+        body, content_type = payload.encode("utf-8"), metrics.CONTENT_TYPE
+    else:
+        body, content_type = json.dumps(payload, separators=(",", ":")).encode("utf-8"), "application/json"
+    lines = [
+        f"HTTP/1.1 {status} {HTTPStatus(status).phrase}",
+        f"Content-Type: {content_type}",
+        f"Content-Length: {len(body)}",
+        f"Connection: {'keep-alive' if keep_alive else 'close'}",
+    ]
+    lines += [f"{name}: {value}" for name, value in headers]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+
+async def _dispatch(service, method, path, raw):
+    if (method, path) == ("GET", "/health"):
+        return int(HTTPStatus.OK), {"status": "ok", "catalog_version": current_version(), "workers": service.workers}, None
+    if (method, path) == ("GET", "/stats"):
+        return int(HTTPStatus.OK), dict(service.stats), None
+    if (method, path) == ("GET", "/metrics"):
+        return int(HTTPStatus.OK), metrics.REGISTRY.render(), None
+    kind = ROUTES.get((method, path))
+    if kind is None:
+        status = HTTPStatus.METHOD_NOT_ALLOWED if path in KNOWN_PATHS else HTTPStatus.NOT_FOUND
+        return int(status), {"error": status.phrase}, None
+    try:
+        body = json.loads(raw or b"{}")
+    except ValueError:
+        return int(HTTPStatus.BAD_REQUEST), {"error": "body is not valid JSON"}, None
+    if not isinstance(body, dict):
+        return int(HTTPStatus.BAD_REQUEST), {"error": "body must be a JSON object"}, None
+    try:
+        request = _parse_request(kind, body)
+    except RequestError as exc:
+        return int(HTTPStatus.BAD_REQUEST), {"error": str(exc)}, None
+    status, payload, compute_ms, coalesced = await service.submit(kind, body, request)
+    # A coalesced request shares another's plan, which was observed already.
+    if status == HTTPStatus.OK and not coalesced:
+        metrics.observe_plan(SOLVERS[kind], compute_ms / 1000.0)
+    return status, payload, (compute_ms, coalesced)
+
+
+def make_handler(service):
+    async def handle(reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                started = time.perf_counter()
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    writer.write(_response(int(HTTPStatus.BAD_REQUEST), {"error": "bad request line"}, keep_alive=False))
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    length = int(headers.get("content-length") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    writer.write(_response(int(HTTPStatus.BAD_REQUEST), {"error": "invalid Content-Length"}, keep_alive=False))
+                    break
+                if length > MAX_BODY_BYTES:
+                    writer.write(_response(int(HTTPStatus.REQUEST_ENTITY_TOO_LARGE), {"error": "body too large"}, keep_alive=False))
+                    break
+                raw = await reader.readexactly(length) if length else b""
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+
+                path = target.split("?", 1)[0]
+                status, payload, timing = await _dispatch(service, method.upper(), path, raw)
+                total_ms = (time.perf_counter() - started) * 1000.0
+                metrics.observe_http_request(
+                    method.upper(), path if path in KNOWN_PATHS else "other", status, total_ms / 1000.0
+                )
+                extra = [("X-Response-Time-Ms", f"{total_ms:.3f}")]
+                if timing is not None:
+                    compute_ms, coalesced = timing
+                    extra.append(("Server-Timing", f"queue;dur={max(total_ms - compute_ms, 0.0):.3f}, "
+                                                   f"compute;dur={compute_ms:.3f}, total;dur={total_ms:.3f}"))
+                    extra.append(("X-Coalesced", "1" if coalesced else "0"))
+                writer.write(_response(status, payload, extra, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    return handle
+
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, workers=None, max_batch=MAX_BATCH, max_wait_ms=MAX_WAIT_MS):
+    service = PlanService(workers, max_batch, max_wait_ms)
+    service.start()
+    server = await asyncio.start_server(make_handler(service), host, port, backlog=1024)
+    print(f"Geo-NAP API on http://{host}:{port} with {service.workers} worker(s)")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Geo-NAP placement engine over HTTP.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=0, help="worker processes (default: CPU count, 1 = in-process)")
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH, help="max requests per pool flush")
+    parser.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_MS, help="batching window")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.max_batch, args.max_wait_ms))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+# benchmarks/harness.py
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+HISTORY_PATH = ROOT_DIR / "cache" / "benchmarks" / "history.json"
+
+# A case is timed for at least MIN_TIME_SEC (and MIN_ROUNDS rounds) after one
+# warm-up call, capped at MAX_ROUNDS.
+MIN_TIME_SEC = 0.5
+MIN_ROUNDS = 3
+MAX_ROUNDS = 1000
+# Median slower than the baseline by more than this fraction is a regression.
+DEFAULT_THRESHOLD = 0.25
+# Allocation sizes are near-deterministic, so memory gets a tighter gate.
+DEFAULT_MEMORY_THRESHOLD = 0.10
+# ...but growth below this many KiB is noise (interned strings, small caches).
+MEMORY_MIN_DELTA_KB = 64.0
+MEMORY_METRICS = ("peak_kb", "retained_kb")
+# Baseline: best median of the last BASELINE_RUNS recorded runs on this machine.
+BASELINE_RUNS = 5
+HISTORY_KEEP = 200
+
+# name -> (setup(size) -> zero-argument callable, sizes)
+BENCHMARKS = {}
+# Same shape; the callable's return value is what counts as retained.
+MEMORY_BENCHMARKS = {}
+
+
+def benchmark(name, sizes):
+    # Registers setup(size), which builds inputs untimed and returns the call to time.
+    def register(setup):
+        BENCHMARKS[name] = (setup, tuple(sizes))
+        return setup
+    return register
+
+
+def memory_benchmark(name, sizes):
+    def register(setup):
+        MEMORY_BENCHMARKS[name] = (setup, tuple(sizes))
+        return setup
+    return register
+
+
+def case_name(name, size):
+    return f"{name}[{size}]"
+
+
+def time_call(fn, min_time=MIN_TIME_SEC, min_rounds=MIN_ROUNDS, max_rounds=MAX_ROUNDS):
+    fn()
+    samples = []
+    started = time.perf_counter()
+    while len(samples) < max_rounds and (len(samples) < min_rounds or time.perf_counter() - started < min_time):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return {
+        "median_ms": statistics.median(samples) * 1000.0,
+        "min_ms": min(samples) * 1000.0,
+        "stdev_ms": (statistics.stdev(samples) if len(samples) > 1 else 0.0) * 1000.0,
+        "rounds": len(samples),
+    }
+
+
+def measure_memory(fn):
+    # Allocations made by one call: peak while it runs, and what is still held
+    # afterwards by its result or by caches it filled. Setup allocations are
+    # made before tracing starts and do not count.
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        result = fn()
+        gc.collect()
+        after, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return {"peak_kb": (peak - before) / 1024.0, "retained_kb": max(after - before, 0) / 1024.0}
+
+
+def _cases(registry, select, max_size):
+    for name, (setup, sizes) in registry.items():
+        if select and not any(s in name for s in select):
+            continue
+        for size in sizes:
+            if max_size is None or size <= max_size:
+                yield name, setup, size
+
+
+def run_benchmarks(select=None, max_size=None, min_time=MIN_TIME_SEC, report=print):
+    results = {}
+    for name, setup, size in _cases(BENCHMARKS, select, max_size):
+        fn = setup(size)
+        results[case_name(name, size)] = stats = time_call(fn, min_time)
+        report(f"{case_name(name, size):<40} {stats['median_ms']:>12.3f} ms  (min {stats['min_ms']:.3f}, {stats['rounds']} rounds)")
+    return results
+
+
+def run_memory_benchmarks(select=None, max_size=None, report=print):
+    results = {}
+    for name, setup, size in _cases(MEMORY_BENCHMARKS, select, max_size):
+        fn = setup(size)
+        results[case_name(name, size)] = measure_memory(fn)
+        del fn
+    if report:
+        report(memory_report(results))
+    return results
+
+
+def memory_report(results):
+    lines = [f"{'case':<40} {'peak MiB':>12} {'retained MiB':>14}"]
+    for case, stats in results.items():
+        lines.append(f"{case:<40} {stats['peak_kb'] / 1024:>12.2f} {stats['retained_kb'] / 1024:>14.2f}")
+    return "\n".join(lines)
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR,
+                             capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    return out.stdout.strip() or None
+
+
+def machine_id():
+    return f"{platform.node()}/{platform.machine()}/py{platform.python_version()}/{os.cpu_count()}cpu"
+
+
+def load_history(path=HISTORY_PATH):
+    try:
+        with Path(path).open("r", encoding="utf-8") as f:
+            history = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return []
+    return history if isinstance(history, list) else []
+
+
+def save_history(history, path=HISTORY_PATH):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        json.dump(history[-HISTORY_KEEP:], f, indent=2)
+    os.replace(tmp, path)
+
+
+def make_run(results, suite=None, kind="latency"):
+    return {
+        "timestamp": time.time(),
+        "suite": suite,
+        "kind": kind,
+        "commit": _git_commit(),
+        "machine": machine_id(),
+        "results": results,
+    }
+
+
+def baselines(history, machine, suite=None, kind="latency", metric="median_ms", runs=BASELINE_RUNS):
+    # Best recorded value per case over the last `runs` runs of the same suite
+    # and kind on the same machine.
+    best = {}
+    same = [
+        run for run in history
+        if run.get("machine") == machine and run.get("suite") == suite and run.get("kind", "latency") == kind
+    ]
+    for run in same[-runs:]:
+        for case, stats in run.get("results", {}).items():
+            value = stats.get(metric)
+            if value is not None and (case not in best or value < best[case]):
+                best[case] = value
+    return best
+
+
+def regressions(results, baseline, threshold=DEFAULT_THRESHOLD, metric="median_ms", min_delta=0.0):
+    # [(case, baseline, current, ratio)] for cases above baseline * (1 + threshold)
+    # by more than min_delta.
+    found = []
+    for case, stats in results.items():
+        base = baseline.get(case)
+        if base and stats[metric] > base * (1.0 + threshold) and stats[metric] - base > min_delta:
+            found.append((case, base, stats[metric], stats[metric] / base))
+    return found
@@ -0,0 +1,250 @@
+# benchmarks/run.py
+import argparse
+import contextlib
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT_DIR))
+
+import catalog  # noqa: E402
+import engine  # noqa: E402
+from benchmarks.harness import (  # noqa: E402
+    BENCHMARKS,
+    DEFAULT_MEMORY_THRESHOLD,
+    DEFAULT_THRESHOLD,
+    HISTORY_PATH,
+    MEMORY_BENCHMARKS,
+    MEMORY_METRICS,
+    MEMORY_MIN_DELTA_KB,
+    MIN_TIME_SEC,
+    baselines,
+    benchmark,
+    load_history,
+    machine_id,
+    make_run,
+    memory_benchmark,
+    regressions,
+    run_benchmarks,
+    run_memory_benchmarks,
+    save_history,
+)
+from models.network import load_bandwidth, load_rtt  # noqa: E402
+from offer import validate_offers  # noqa: E402
+from optimizer.milp import solve_geo_nap  # noqa: E402
+from simulator.monte_carlo import monte_carlo_samples  # noqa: E402
+from simulator.synthetic_catalog import iter_offers  # noqa: E402
+from ui.results import build_base_result, build_model_results  # noqa: E402
+
+SIZES = (100, 1_000, 10_000, 100_000, 1_000_000)
+DEFAULT_MAX_SIZE = 100_000
+SEED = 7
+# Bump when the inputs change so old timings stop serving as baselines.
+SUITE = "synthetic-catalog-1"
+# Bench catalogs are registered in memory under numeric versions far above
+# real (time-based) ones so they never shadow a published snapshot.
+VERSION_BASE = 9_000_000_000_000_000_000
+
+# UI-default scenario, except a wider RTT bound so large catalogs stay feasible.
+SCENARIO = (8, 50, 5, 0, 200.0, 3, 128, 0.02, "aws", {}, "ring", None)
+UI_TOP_K = 5
+# Sites a placement is spread over for the pairwise_costs stage, drawn from a
+# catalog large enough to cover every generated site.
+PAIRWISE_SITES = (16, 64, 256)
+PAIRWISE_CATALOG = 100_000
+
+_tmp_dir = None
+
+
+def synthetic_offers(n, seed=SEED):
+    # Validated rows, as load_catalog would return them for a published snapshot.
+    offers, _ = validate_offers(iter_offers(n, seed))
+    return offers
+
+
+def register_catalog(n):
+    version = str(VERSION_BASE + n)
+    catalog.register_loaded(version, synthetic_offers(n))
+    return version
+
+
+def _matrix_csv(n, column):
+    # n-row pair matrix in the data/rtt.csv / data/bandwidth.csv layout.
+    global _tmp_dir
+    if _tmp_dir is None:
+        _tmp_dir = tempfile.TemporaryDirectory(prefix="geonap-bench-")
+    path = Path(_tmp_dir.name) / f"{column}-{n}.csv"
+    if not path.exists():
+        rng = np.random.default_rng(SEED)
+        sites = max(2, int(np.ceil(np.sqrt(n))) + 1)
+        src = rng.integers(0, sites, n)
+        dst = (src + rng.integers(1, sites, n)) % sites
+        pd.DataFrame({
+            "from": [f"site_{s}" for s in src],
+            "to": [f"site_{d}" for d in dst],
+            column: rng.uniform(1.0, 100.0, n).round(1),
+        }).to_csv(path, index=False)
+    return path
+
+
+@contextlib.contextmanager
+def _quiet_stdout():
+    # CBC writes its log straight to fd 1.
+    sys.stdout.flush()
+    saved = os.dup(1)
+    with open(os.devnull, "w") as devnull:
+        os.dup2(devnull.fileno(), 1)
+        try:
+            yield
+        finally:
+            os.dup2(saved, 1)
+            os.close(saved)
+
+
+@benchmark("run_geo_nap", SIZES)
+def bench_run_geo_nap(n):
+    # Warm path: enrichment and index are cached per catalog version.
+    version = register_catalog(n)
+    return lambda: engine.run_geo_nap(*SCENARIO, catalog_version=version)
+
+
+@benchmark("run_geo_nap_cold", SIZES)
+def bench_run_geo_nap_cold(n):
+    version = register_catalog(n)
+
+    def call():
+        engine.clear_caches()
+        engine.run_geo_nap(*SCENARIO, catalog_version=version)
+    return call
+
+
+@benchmark("milp.solve_geo_nap", SIZES[:3])
+def bench_solve_geo_nap(n):
+    offers = synthetic_offers(n)
+    # One variable per offer; many offers share a site in generated catalogs.
+    providers = [f"{o['provider']}_{o['region']}_{i}" for i, o in enumerate(offers)]
+    gpu_price = {p: o["price"] for p, o in zip(providers, offers)}
+    egress = {p: 0.09 for p in providers}
+    capacity = {p: o["capacity"] or engine.DEFAULT_CAPACITY for p, o in zip(providers, offers)}
+
+    def call():
+        with _quiet_stdout():
+            solve_geo_nap(providers, gpu_price, egress, 8, set(), 5, 100, capacity)
+    return call
+
+
+@benchmark("network.load_rtt", SIZES)
+def bench_load_rtt(n):
+    path = _matrix_csv(n, "rtt_ms")
+    return lambda: load_rtt(path)
+
+
+@benchmark("network.load_bandwidth", SIZES)
+def bench_load_bandwidth(n):
+    path = _matrix_csv(n, "bandwidth_gbps")
+    return lambda: load_bandwidth(path)
+
+
+@benchmark("monte_carlo_samples", SIZES)
+def bench_monte_carlo(n):
+    return lambda: monte_carlo_samples(1000.0, runs=n)
+
+
+@memory_benchmark("catalog.load", SIZES)
+def memory_catalog_load(n):
+    # Decode + validate a snapshot file's bytes, as load_catalog does.
+    data = json.dumps([dict(o) for o in iter_offers(n, SEED)]).encode("utf-8")
+    return lambda: catalog.decode_offers(data)
+
+
+@memory_benchmark("engine.prepare", SIZES)
+def memory_prepare(n):
+    version = register_catalog(n)
+    engine.clear_caches()
+    return lambda: engine.prepare(version, 0.0, "penalize")
+
+
+@memory_benchmark("run_geo_nap", SIZES)
+def memory_run_geo_nap(n):
+    version = register_catalog(n)
+    engine.prepare(version, 0.0, "penalize")
+    return lambda: engine.run_geo_nap(*SCENARIO, top_k=UI_TOP_K, catalog_version=version)
+
+
+@memory_benchmark("breakdown.pairwise_costs", PAIRWISE_SITES)
+def memory_pairwise_costs(n):
+    # Sized by placed sites (n^2 entries), one offer per site.
+    version = register_catalog(PAIRWISE_CATALOG)
+    _, enriched, _ = engine.prepare(version, 0.0, "penalize")
+    offers = list({p.name: p for p in reversed(enriched)}.values())[:n]
+    placement = {p.name: 1 for p in offers}
+    params = engine.normalize_params(len(offers), *SCENARIO[1:8], 0.0, 0.4, 0.08, 10.0)
+    return lambda: engine.evaluate_placement(offers, placement, params, "aws", {}, "mesh")[1]["pairwise_costs"]
+
+
+@memory_benchmark("session_state", SIZES)
+def memory_session_state(n):
+    # base_result + model_results as the UI stores them after one Run click.
+    version = register_catalog(n)
+    engine.prepare(version, 0.0, "penalize")
+    _, providers_cache = catalog.load_catalog(version)
+
+    def call():
+        placement, cost, forbidden, breakdown = engine.run_geo_nap(*SCENARIO, top_k=UI_TOP_K, catalog_version=version)
+        by_model = engine.run_geo_nap_by_model(*SCENARIO[:11], None, catalog_version=version)
+        return {
+            "base_result": build_base_result(providers_cache, placement, cost, forbidden, breakdown, version),
+            "model_results": build_model_results(providers_cache, by_model),
+        }
+    return call
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time (or measure memory of) engine entry points over synthetic catalogs.")
+    parser.add_argument("-k", "--select", action="append", help="only benchmarks whose name contains this (repeatable)")
+    parser.add_argument("--max-size", type=int, default=DEFAULT_MAX_SIZE, help="skip larger sizes (default: %(default)s)")
+    parser.add_argument("--min-time", type=float, default=MIN_TIME_SEC, help="seconds of timing per case")
+    parser.add_argument("--threshold", type=float,
+                        help=f"allowed growth vs baseline (default {DEFAULT_THRESHOLD} latency, {DEFAULT_MEMORY_THRESHOLD} memory)")
+    parser.add_argument("--memory", action="store_true", help="measure tracemalloc peak/retained allocations instead of time")
+    parser.add_argument("--history", default=str(HISTORY_PATH), help="JSON history file")
+    parser.add_argument("--no-record", action="store_true", help="compare only, do not append this run")
+    parser.add_argument("--list", action="store_true", help="list benchmarks and exit")
+    args = parser.parse_args(argv)
+
+    registry = MEMORY_BENCHMARKS if args.memory else BENCHMARKS
+    if args.list:
+        for name, (_, sizes) in registry.items():
+            print(name, list(sizes))
+        return 0
+
+    if args.memory:
+        kind, metrics, threshold, min_delta = "memory", MEMORY_METRICS, DEFAULT_MEMORY_THRESHOLD, MEMORY_MIN_DELTA_KB
+        results = run_memory_benchmarks(args.select, args.max_size)
+    else:
+        kind, metrics, threshold, min_delta = "latency", ("median_ms",), DEFAULT_THRESHOLD, 0.0
+        results = run_benchmarks(args.select, args.max_size, args.min_time)
+    threshold = threshold if args.threshold is None else args.threshold
+
+    history = load_history(args.history)
+    found = []
+    for metric in metrics:
+        baseline = baselines(history, machine_id(), SUITE, kind, metric)
+        found += [(metric,) + r for r in regressions(results, baseline, threshold, metric, min_delta)]
+    if not args.no_record:
+        history.append(make_run(results, SUITE, kind))
+        save_history(history, args.history)
+
+    for metric, case, base, current, ratio in found:
+        print(f"REGRESSION {case} {metric}: {current:.3f} vs baseline {base:.3f} ({ratio:.2f}x)")
+    return 1 if found else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
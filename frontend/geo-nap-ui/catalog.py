@@ -0,0 +1,227 @@
+# catalog.py
+import json
+import os
+import time
+from pathlib import Path
+
+from offer import validate_offers
+
+# Fastest available decoder; all of them take bytes and return plain lists/dicts.
+try:
+    import orjson
+
+    _decode = orjson.loads
+except ImportError:
+    try:
+        import msgspec
+
+        _decode = msgspec.json.decode
+    except ImportError:
+        _decode = json.loads
+
+ROOT_DIR = Path(__file__).resolve().parent
+CACHE_DIR = ROOT_DIR / "cache"
+SNAPSHOT_DIR = CACHE_DIR / "catalog"
+POINTER_PATH = SNAPSHOT_DIR / "CURRENT"
+LEGACY_PATH = CACHE_DIR / "providers.json"
+
+KEEP_VERSIONS = 5
+MEMORY_VERSIONS = 2
+LEGACY_VERSION = "legacy"
+
+# Parsed snapshots by version. Snapshot files are immutable once published,
+# so a version never needs re-reading; callers must treat the lists as read-only.
+_loaded = {}
+# Rows dropped by validation, by version: list of (row index, reason).
+_rejected = {}
+# load_catalog lookups served from _loaded vs read from disk, since start.
+_cache_stats = {"hits": 0, "misses": 0}
+# Rows per version as last loaded, legacy included (it is never kept in _loaded).
+_counts = {}
+
+# With a file watcher running the pointer is re-read only after it changes;
+# otherwise every current_version() call reads it from disk.
+_pointer_watched = False
+_pointer_memo = None
+
+
+def _snapshot_path(version):
+    return SNAPSHOT_DIR / f"providers-{version}.json"
+
+
+def _atomic_write(path, text):
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def publish_catalog(offers, keep=KEEP_VERSIONS):
+    # Write a new immutable snapshot, then flip the pointer with an atomic rename.
+    # Rows that fail validation are dropped here so no reader ever sees them.
+    offers, rejected = validate_offers(offers)
+    if rejected:
+        print(f"Catalog publish dropped {len(rejected)} invalid rows")
+    SNAPSHOT_DIR.mkdir(parents=True, exist_ok=True)
+    version = str(time.time_ns())
+    text = json.dumps(offers, indent=2)
+    _atomic_write(_snapshot_path(version), text)
+    _atomic_write(POINTER_PATH, version)
+    global _pointer_memo
+    _pointer_memo = None
+    # Older tools still read cache/providers.json directly.
+    _atomic_write(LEGACY_PATH, text)
+    prune_versions(keep)
+    return version
+
+
+def list_versions():
+    if not SNAPSHOT_DIR.exists():
+        return []
+    versions = [p.stem[len("providers-"):] for p in SNAPSHOT_DIR.glob("providers-*.json")]
+    return sorted(versions, key=int)
+
+
+def prune_versions(keep=KEEP_VERSIONS):
+    current = current_version()
+    versions = list_versions()
+    for version in versions[:-keep] if keep > 0 else versions:
+        if version != current:
+            _snapshot_path(version).unlink(missing_ok=True)
+
+
+def set_pointer_watched(watched):
+    global _pointer_watched, _pointer_memo
+    _pointer_watched = watched
+    _pointer_memo = None
+
+
+def decode_offers(data):
+    # Bytes -> (valid rows, rejected). Works for catalog files and API payloads.
+    rows = _decode(data)
+    if not isinstance(rows, list):
+        raise ValueError("Catalog must be a JSON list of offers")
+    return validate_offers(rows)
+
+
+def rejected_rows(version):
+    return _rejected.get(version, [])
+
+
+def register_loaded(version, offers):
+    # Lets another source (e.g. shared_catalog.install) serve a version without a disk read.
+    # Oldest registration is evicted first, whatever the version looks like.
+    if version == LEGACY_VERSION:
+        raise ValueError("The legacy catalog can change in place; publish it as a snapshot first")
+    _loaded.pop(version, None)
+    while len(_loaded) >= MEMORY_VERSIONS:
+        _loaded.pop(next(iter(_loaded)))
+    _loaded[version] = offers
+    _record_count(version, offers)
+
+
+def _record_count(version, offers):
+    _counts.pop(version, None)
+    _counts[version] = len(offers)
+    while len(_counts) > KEEP_VERSIONS:
+        _counts.pop(next(iter(_counts)))
+
+
+def invalidate():
+    # Called by the file watcher once per debounced change.
+    global _pointer_memo
+    _pointer_memo = None
+    _loaded.clear()
+
+
+def current_version():
+    global _pointer_memo
+    if _pointer_watched and _pointer_memo is not None:
+        return _pointer_memo
+    version = _read_pointer()
+    if _pointer_watched:
+        _pointer_memo = version
+    return version
+
+
+def _read_pointer():
+    try:
+        version = POINTER_PATH.read_text(encoding="utf-8").strip()
+    except FileNotFoundError:
+        version = ""
+    if version:
+        return version
+    return LEGACY_VERSION if LEGACY_PATH.exists() else None
+
+
+def published_at(version):
+    # Epoch seconds a version was published (snapshot names are time_ns);
+    # the file's mtime for the legacy catalog.
+    if version == LEGACY_VERSION:
+        try:
+            return LEGACY_PATH.stat().st_mtime
+        except FileNotFoundError:
+            return None
+    try:
+        return int(version) / 1e9
+    except (TypeError, ValueError):
+        return None
+
+
+def cache_stats():
+    return dict(_cache_stats)
+
+
+def offer_count(version=None):
+    # Rows in a version (default: current) as last loaded by this process, or
+    # None if it has not been loaded. Never reads from disk or counts a lookup.
+    version = version or current_version()
+    return _counts.get(version)
+
+
+def catalog_exists():
+    return current_version() is not None
+
+
+def load_catalog(version=None):
+    # Returns (version, offers). Pass the version back in to pin a request to
+    # one snapshot even if discovery publishes a newer one meanwhile.
+    follow_pointer = version is None
+    for _ in range(3):
+        if follow_pointer:
+            version = current_version()
+            if version is None:
+                raise FileNotFoundError(f"No provider catalog under {CACHE_DIR}")
+
+        offers = _loaded.get(version)
+        if offers is not None:
+            _cache_stats["hits"] += 1
+            return version, offers
+
+        path = LEGACY_PATH if version == LEGACY_VERSION else _snapshot_path(version)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            # The pointed-to version was pruned between reading the pointer and
+            # opening it; re-read the pointer. Pinned versions fail loudly.
+            if not follow_pointer:
+                raise
+            invalidate()
+            continue
+
+        _cache_stats["misses"] += 1
+        offers, rejected = decode_offers(data)
+        _rejected[version] = rejected
+        while len(_rejected) > KEEP_VERSIONS:
+            _rejected.pop(next(iter(_rejected)))
+        if rejected:
+            print(f"Catalog {version}: skipped {len(rejected)} invalid rows")
+
+        if version != LEGACY_VERSION:
+            register_loaded(version, offers)
+        else:
+            _record_count(version, offers)
+        return version, offers
+    raise FileNotFoundError(f"Catalog kept changing under {SNAPSHOT_DIR}")
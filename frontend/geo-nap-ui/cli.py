@@ -0,0 +1,307 @@
+# cli.py
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import engine
+import shared_catalog
+from catalog import load_catalog
+
+# Positional run_geo_nap arguments with the UI's default values.
+SCENARIO_DEFAULTS = {
+    "required_gpus": 8,
+    "r_max": 20,
+    "model_size": 5,
+    "steps": 0,
+    "dataset_size_gb": 200.0,
+    "epochs": 3,
+    "batch_size": 128,
+    "sample_size_gb": 0.02,
+    "data_source_provider": "aws",
+    "egress_overrides": {},
+    "topology": "ring",
+    "gpu_model": None,
+}
+# Keyword arguments a scenario may set; the catalog version is pinned per run.
+SCENARIO_OPTIONS = (
+    "training_hours",
+    "base_compute_sec",
+    "compute_scale_per_gb",
+    "bandwidth_base_gbps",
+    "top_k",
+    "stale_after_hours",
+    "stale_policy",
+    "egress_pricing",
+    "egress_baseline_gb",
+    "data_strategy",
+    "cache_hit_ratio",
+    "network_model",
+    "origin_region",
+)
+RESULT_FIELDS = (
+    ("offset", "int64"),
+    ("id", "string"),
+    ("status", "string"),
+    ("error", "string"),
+    ("catalog_version", "string"),
+    ("total_cost", "float64"),
+    ("compute_cost", "float64"),
+    ("egress_cost", "float64"),
+    ("inter_provider_cost", "float64"),
+    ("total_time_hours", "float64"),
+    ("placed_gpus", "int64"),
+    ("providers_used", "int64"),
+    ("placement", "string"),
+)
+PROGRESS_INTERVAL_SEC = 2.0
+PARQUET_ROW_GROUP = 1000
+
+# Catalog version pinned for the run; set in each worker by _init_worker.
+_catalog_version = None
+
+
+def _csv_value(text):
+    # CSV cells are strings: "" means default, JSON handles numbers and the
+    # egress_overrides/egress_baseline_gb objects, anything else stays a string.
+    text = text.strip()
+    if not text:
+        return None
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def read_scenarios(path, start=0):
+    # Yields (offset, scenario) from JSONL or CSV, skipping offsets below start.
+    # Blank JSONL lines are not scenarios and do not take an offset.
+    path = Path(path)
+    with path.open("r", encoding="utf-8-sig", newline="") as f:
+        if path.suffix.lower() == ".csv":
+            rows = ({k: _csv_value(v or "") for k, v in row.items()} for row in csv.DictReader(f))
+        else:
+            rows = (json.loads(line) for line in f if line.strip())
+        for offset, row in enumerate(rows):
+            if offset >= start:
+                yield offset, row
+
+
+def scenario_arguments(scenario, extra_keys=()):
+    # (positional args, keyword options) for run_geo_nap; None values mean default.
+    if not isinstance(scenario, dict):
+        raise ValueError("scenario is not an object")
+    unknown = set(scenario) - set(SCENARIO_DEFAULTS) - set(SCENARIO_OPTIONS) - {"id"} - set(extra_keys)
+    if unknown:
+        raise ValueError(f"unknown scenario keys: {', '.join(sorted(unknown))}")
+    args = [default if scenario.get(key) is None else scenario[key] for key, default in SCENARIO_DEFAULTS.items()]
+    options = {key: scenario[key] for key in SCENARIO_OPTIONS if scenario.get(key) is not None}
+    return args, options
+
+
+def plan_scenario(offset, scenario, catalog_version=None):
+    record = {"offset": offset, "id": None, "status": "ok", "error": None}
+    try:
+        if isinstance(scenario, dict) and scenario.get("id") is not None:
+            record["id"] = str(scenario["id"])
+        args, options = scenario_arguments(scenario)
+        placement, total_cost, _, breakdown = engine.run_geo_nap(
+            *args, catalog_version=catalog_version or _catalog_version, **options
+        )
+    except Exception as exc:
+        record["status"] = "error"
+        record["error"] = f"{type(exc).__name__}: {exc}"
+        return record
+
+    record.update({
+        "catalog_version": breakdown.get("catalog_version"),
+        "total_cost": float(total_cost),
+        "compute_cost": float(breakdown["compute_cost"]),
+        "egress_cost": float(breakdown["egress_cost"]),
+        "inter_provider_cost": float(breakdown["inter_provider_cost"]),
+        "total_time_hours": float(breakdown["total_time_hours"]),
+        "placed_gpus": sum(placement.values()),
+        "providers_used": sum(1 for v in placement.values() if v > 0),
+        "placement": placement,
+    })
+    return record
+
+
+def _init_worker(handle):
+    global _catalog_version
+    shared_catalog.install(handle)
+    _catalog_version = handle["version"]
+
+
+def _plan_task(task):
+    return plan_scenario(*task)
+
+
+def _ordered_results(submit, scenarios, window):
+    # At most `window` scenarios in flight; results come back in input order,
+    # so output offsets are contiguous and a resume point is just the last one.
+    queue = deque()
+    for task in scenarios:
+        queue.append(submit(task))
+        if len(queue) >= window:
+            yield queue.popleft().result()
+    while queue:
+        yield queue.popleft().result()
+
+
+class _Done:
+    # Inline stand-in for a future when running without a pool.
+    def __init__(self, value):
+        self._value = value
+
+    def result(self):
+        return self._value
+
+
+class JsonlWriter:
+    def __init__(self, path, append=False):
+        self._stdout = str(path) == "-"
+        self._f = sys.stdout if self._stdout else Path(path).open("a" if append else "w", encoding="utf-8")
+
+    def write(self, record):
+        # One flushed line per result, so an interrupted run loses at most one line.
+        self._f.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._f.flush()
+
+    def close(self):
+        if not self._stdout:
+            self._f.close()
+
+
+class ParquetWriter:
+    def __init__(self, path, row_group=PARQUET_ROW_GROUP):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as exc:
+            raise SystemExit("Parquet output needs pyarrow (pip install pyarrow)") from exc
+        self._pa = pa
+        self._schema = pa.schema([(name, getattr(pa, kind)()) for name, kind in RESULT_FIELDS])
+        self._writer = pq.ParquetWriter(str(path), self._schema)
+        self._row_group = row_group
+        self._rows = []
+
+    def write(self, record):
+        row = dict(record)
+        if row.get("placement") is not None:
+            row["placement"] = json.dumps(row["placement"], separators=(",", ":"))
+        self._rows.append(row)
+        if len(self._rows) >= self._row_group:
+            self._flush()
+
+    def _flush(self):
+        if self._rows:
+            self._writer.write_table(self._pa.Table.from_pylist(self._rows, schema=self._schema))
+            self._rows = []
+
+    def close(self):
+        self._flush()
+        self._writer.close()
+
+
+def resume_offset(path):
+    # Next offset after the last complete line of a JSONL result file. A torn
+    # trailing line from an interrupted run is cut off so appends stay valid.
+    path = Path(path)
+    if not path.exists():
+        return 0
+    with path.open("rb+") as f:
+        size = f.seek(0, os.SEEK_END)
+        end = size
+        tail = b""
+        while end > 0:
+            step = min(65536, end)
+            end -= step
+            f.seek(end)
+            tail = f.read(step) + tail
+            if tail.count(b"\n") >= 2:
+                break
+        complete = tail.rfind(b"\n") + 1
+        if end + complete < size:
+            f.truncate(end + complete)
+        lines = tail[:complete].splitlines()
+    if not lines:
+        return 0
+    return json.loads(lines[-1])["offset"] + 1
+
+
+def plan(args):
+    out_format = args.format or ("parquet" if str(args.out).lower().endswith(".parquet") else "jsonl")
+    start = args.start
+    if args.resume:
+        if out_format != "jsonl" or args.out == "-":
+            raise SystemExit("--resume needs a JSONL output file")
+        start = max(start, resume_offset(args.out))
+    writer = ParquetWriter(args.out) if out_format == "parquet" else JsonlWriter(args.out, append=args.resume)
+
+    workers = args.workers or os.cpu_count() or 1
+    started = time.perf_counter()
+    last_report = started
+    done = errors = 0
+    pool = None
+    try:
+        scenarios = read_scenarios(args.scenarios, start)
+        if workers <= 1:
+            version, _ = load_catalog(args.catalog_version)
+            results = _ordered_results(lambda task: _Done(plan_scenario(*task, version)), scenarios, 1)
+        else:
+            # One shared-memory copy of the pinned catalog for every worker.
+            handle = shared_catalog.share_catalog(args.catalog_version)
+            version = handle["version"]
+            pool = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(handle,))
+            results = _ordered_results(lambda task: pool.submit(_plan_task, task), scenarios, workers * args.window)
+
+        print(f"Planning from offset {start} on catalog {version} with {workers} worker(s)", file=sys.stderr)
+        for record in results:
+            writer.write(record)
+            done += 1
+            errors += record["status"] != "ok"
+            now = time.perf_counter()
+            if not args.quiet and now - last_report >= PROGRESS_INTERVAL_SEC:
+                last_report = now
+                print(f"{done} done ({errors} errors), {done / (now - started):.1f}/s, "
+                      f"next offset {record['offset'] + 1}", file=sys.stderr)
+    finally:
+        writer.close()
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+        shared_catalog.release_all()
+
+    elapsed = time.perf_counter() - started
+    print(f"Planned {done} scenarios ({errors} errors) in {elapsed:.1f}s", file=sys.stderr)
+    return 1 if errors and args.strict else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="geo-nap", description="Headless Geo-NAP planning.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    plan_parser = commands.add_parser("plan", help="evaluate a scenario file against one catalog snapshot")
+    plan_parser.add_argument("scenarios", help="JSONL or CSV file, one scenario per line/row")
+    plan_parser.add_argument("-o", "--out", default="-", help="JSONL or .parquet output (default: stdout)")
+    plan_parser.add_argument("--format", choices=["jsonl", "parquet"], help="override the format implied by --out")
+    plan_parser.add_argument("--workers", type=int, default=0, help="worker processes (default: CPU count, 1 = inline)")
+    plan_parser.add_argument("--window", type=int, default=4, help="in-flight scenarios per worker")
+    plan_parser.add_argument("--start", type=int, default=0, help="skip scenarios before this offset")
+    plan_parser.add_argument("--resume", action="store_true", help="append after the last offset already in --out")
+    plan_parser.add_argument("--catalog-version", help="catalog version to pin (default: current)")
+    plan_parser.add_argument("--strict", action="store_true", help="exit 1 if any scenario failed")
+    plan_parser.add_argument("--quiet", action="store_true", help="no progress lines")
+    plan_parser.set_defaults(func=plan)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,29 @@
+# conftest.py
+import itertools
+
+import pytest
+
+import catalog
+import engine
+from offer import validate_offers
+
+# Test catalogs are registered in memory under versions far from real
+# time_ns snapshot names, so they never touch cache/catalog.
+_versions = itertools.count(100)
+
+
+@pytest.fixture
+def register_catalog():
+    # register_catalog(rows) -> version serving the validated rows.
+    registered = []
+
+    def register(rows):
+        version = str(next(_versions))
+        catalog.register_loaded(version, validate_offers(rows)[0])
+        registered.append(version)
+        return version
+
+    yield register
+    for version in registered:
+        catalog._loaded.pop(version, None)
+    engine.clear_caches()
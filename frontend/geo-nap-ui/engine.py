@@ -1,19 +1,50 @@
 # engine.py
-import json
+import heapq
 import math
+import time
 from pathlib import Path
 
+from catalog import LEGACY_VERSION, load_catalog
+from live.rtt_store import LOCAL_ORIGIN, RttStore
+from models.data_locality import DEFAULT_CACHE_HIT_RATIO, plan_data_movement
+from models.egress import EGRESS_TABLE, FLAT_EGRESS_TABLE
+from models.geo import RttEstimator, load_region_coords, locate, locate_name
+from models.network import flow_rates, pair_bandwidth
+from offer import Offer, offer_name, validate_offers
+from timing import NULL_SPANS, instrumented
+
 ALPHA = 0.01
 BETA = 0.5
+TOP_K_MAX_EXPANSIONS = 50
+# top_k alternatives are the cheapest by total cost among this many times as
+# many distinct placements enumerated by hourly rate.
+TOP_K_CANDIDATE_FACTOR = 4
+# With the fair-share network model the plan is the cheapest by total cost of
+# the first this many k-best fills, since shared links change comm time.
+FAIR_SHARE_CANDIDATES = 16
+DEFAULT_CAPACITY = 32
+VAST_CAPACITY = 8
+STALE_PENALTY = 0.25
 ROOT_DIR = Path(__file__).resolve().parent
 
-def _to_float(value, default=0.0):
+# Enriched offers and model index per immutable catalog version. Cleared by
+# watcher.py when the catalog or data files change.
+_prepared_cache = {}
+PREPARED_CACHE_SIZE = 2
+# prepare calls served from _prepared_cache vs enriched afresh, since start.
+_prepared_stats = {"hits": 0, "misses": 0}
+# Fitted on first use of origin_region.
+_estimator = None
+# Probed RTTs (cache/rtt_store.json), read once; probing runs out of process.
+_rtt_store = None
+
+def to_float(value, default=0.0):
     try:
         return float(value)
     except (TypeError, ValueError):
         return default
 
-def _to_int(value, default=0):
+def to_int(value, default=0):
     try:
         return int(value)
     except (TypeError, ValueError):
@@ -21,10 +52,10 @@ def _to_int(value, default=0):
 
 def _compute_time_per_step(model_size_gb, total_gpus, base_sec, scale_per_gb):
     # Simple heuristic: larger models take longer, more GPUs reduce per-step time.
-    base_sec = _to_float(base_sec, 0.4)
-    model_size_gb = _to_float(model_size_gb, 1.0)
-    scale_per_gb = _to_float(scale_per_gb, 0.08)
-    total_gpus = max(1, _to_int(total_gpus, 1))
+    base_sec = to_float(base_sec, 0.4)
+    model_size_gb = to_float(model_size_gb, 1.0)
+    scale_per_gb = to_float(scale_per_gb, 0.08)
+    total_gpus = max(1, to_int(total_gpus, 1))
     return base_sec + (model_size_gb * scale_per_gb / max(1, total_gpus))
 
 def _all_reduce_comm_time(model_size_gb, bandwidth_gbps, rtt_ms, providers_used, topology):
@@ -38,22 +69,15 @@ def _all_reduce_comm_time(model_size_gb, bandwidth_gbps, rtt_ms, providers_used,
     return (model_size_gb / max(0.1, bandwidth_gbps)) * bandwidth_factor + (rtt_ms / 1000.0) * rtt_factor
 
 def _provider_egress_rate(provider_name):
-    name = provider_name.lower()
-    if "aws" in name:
-        return 0.09
-    if "azure" in name:
-        return 0.08
-    if "gcp" in name:
-        return 0.12
-    if "paperspace" in name:
-        return 0.10
-    if "lambda" in name:
-        return 0.07
-    if "runpod" in name:
-        return 0.06
-    if "vast" in name:
-        return 0.02
-    return 0.09
+    # First-tier list rate; volume-dependent rates come from _egress_table().
+    return EGRESS_TABLE.base_rate(provider_name)
+
+def _egress_table(egress_pricing):
+    if egress_pricing == "flat":
+        return FLAT_EGRESS_TABLE
+    if egress_pricing == "tiered":
+        return EGRESS_TABLE
+    raise ValueError(f"Unknown egress pricing: {egress_pricing}")
 
 def _merge_egress_overrides(defaults, overrides):
     merged = dict(defaults)
@@ -63,177 +87,523 @@ def _merge_egress_overrides(defaults, overrides):
         merged[key] = value
     return merged
 
-def run_geo_nap(
-    required_gpus,
-    r_max,
-    model_size,
-    steps,
-    dataset_size_gb,
-    epochs,
-    batch_size,
-    sample_size_gb,
-    data_source_provider,
-    egress_overrides,
-    topology,
-    gpu_model,
-    training_hours=0.0,
-    base_compute_sec=0.4,
-    compute_scale_per_gb=0.08,
-    bandwidth_base_gbps=10.0,
-):
-    required_gpus = max(1, _to_int(required_gpus, 1))
-    r_max = _to_float(r_max, 20.0)
-    model_size = _to_float(model_size, 5.0)
-    steps = _to_int(steps, 0)
-    dataset_size_gb = _to_float(dataset_size_gb, 1.0)
-    epochs = max(1, _to_int(epochs, 1))
-    batch_size = max(1, _to_int(batch_size, 1))
-    sample_size_gb = _to_float(sample_size_gb, 0.01)
-    training_hours = _to_float(training_hours, 0.0)
-    base_compute_sec = _to_float(base_compute_sec, 0.4)
-    compute_scale_per_gb = _to_float(compute_scale_per_gb, 0.08)
-    bandwidth_base_gbps = _to_float(bandwidth_base_gbps, 10.0)
-
-    providers_path = ROOT_DIR / "cache" / "providers.json"
-    with providers_path.open("r", encoding="utf-8") as f:
-        providers = json.load(f)
+def _load_providers(catalog_version=None, providers=None):
+    # Catalog rows are validated on load; caller-supplied rows are validated here.
+    if providers is None:
+        return load_catalog(catalog_version)[1]
+    return validate_offers(providers)[0]
+
+def default_capacity(name):
+    return VAST_CAPACITY if "vast" in name else DEFAULT_CAPACITY
+
+def _measured_rtts():
+    global _rtt_store
+    if _rtt_store is None:
+        _rtt_store = RttStore.load()
+    return _rtt_store
+
+def _rtt_estimator():
+    # Distance model fitted to stored probes between known locations.
+    global _estimator
+    if _estimator is None:
+        store = _measured_rtts()
+        _estimator = RttEstimator.fitted(
+            (locate_name(src), locate_name(dst), store.lookup(src, dst)) for src, dst in store.pairs()
+        )
+    return _estimator
+
+def _estimated_rtts(providers, origin_region):
+    # RTT per distinct (provider, region) for rows without a catalog RTT: the
+    # stored probe from the origin (this machine when unset), else a distance
+    # estimate. None when neither source has anything to offer.
+    store = _measured_rtts()
+    origin = locate_name(origin_region) if origin_region else None
+    if origin is None and not store:
+        return None
+    source = origin_region or LOCAL_ORIGIN
+    estimator = _rtt_estimator() if origin is not None else None
+    estimates = {}
+    for p in providers:
+        if p.get("rtt_default"):
+            key = (p["provider"], p["region"])
+            if key not in estimates:
+                rtt = store.lookup(source, offer_name(*key))
+                if rtt is None and estimator is not None:
+                    rtt = estimator.estimate(origin, locate(*key))
+                estimates[key] = rtt
+    return estimates
+
+def _enrich(providers, stale_after_hours=0.0, stale_policy="penalize", now=None, origin_region=None):
+    stale_after_sec = to_float(stale_after_hours, 0.0) * 3600.0
+    now = time.time() if now is None else now
+    estimates = _estimated_rtts(providers, origin_region)
 
     enriched = []
     for p in providers:
-        name = p["provider"] + "_" + p["region"]
+        # Rows are validated at load (offer.validate_row), so fields are typed and present.
         price = p["price"]
-        rtt = p.get("rtt", 30)
-        bw = p.get("bandwidth", 10)
-        gpu = p.get("gpu", "unknown")
+        rtt = p["rtt"]
+        if estimates and p.get("rtt_default"):
+            estimate = estimates.get((p["provider"], p["region"]))
+            rtt = rtt if estimate is None else estimate
+        bw = p["bandwidth"]
 
         network_penalty = (1 + ALPHA * rtt) * (1 + BETA / bw)
         effective_price = price * network_penalty
 
-        capacity = 8 if "vast" in name else 32
+        # Offers whose discovery data is too old are skipped or priced up.
+        stale = False
+        fetched_at = p.get("fetched_at")
+        if stale_after_sec > 0 and fetched_at is not None and now - fetched_at > stale_after_sec:
+            if stale_policy == "skip":
+                continue
+            effective_price *= 1 + STALE_PENALTY
+            stale = True
 
-        enriched.append({
-            "name": name,
-            "price": effective_price,
-            "rtt": rtt,
-            "capacity": capacity,
-            "bandwidth": bw,
-            "gpu": gpu,
-        })
+        capacity = p["capacity"] or default_capacity(offer_name(p["provider"], p["region"]))
 
-    # Step 1: filter by RTT and optional GPU model
+        enriched.append(Offer(
+            p["provider"],
+            p["region"],
+            p["gpu"],
+            effective_price,
+            price,
+            rtt,
+            bw,
+            capacity,
+            stale,
+        ))
+    return enriched
+
+def prepare(catalog_version, stale_after_hours, stale_policy, origin_region=None, spans=NULL_SPANS):
+    # Returns (version, enriched, index). Staleness depends on the clock and the
+    # legacy file can change in place, so only clock-independent snapshots are kept.
+    with spans("catalog"):
+        catalog_version, providers = load_catalog(catalog_version)
+    cacheable = catalog_version != LEGACY_VERSION and to_float(stale_after_hours, 0.0) <= 0
+    key = (catalog_version, stale_policy, origin_region or None)
+    if cacheable and key in _prepared_cache:
+        _prepared_stats["hits"] += 1
+        return (catalog_version,) + _prepared_cache[key]
+    _prepared_stats["misses"] += 1
+
+    with spans("enrich"):
+        enriched = _enrich(providers, stale_after_hours, stale_policy, origin_region=origin_region)
+        index = build_model_index(enriched)
+    if cacheable:
+        while len(_prepared_cache) >= PREPARED_CACHE_SIZE:
+            _prepared_cache.pop(next(iter(_prepared_cache)))
+        _prepared_cache[key] = (enriched, index)
+    return catalog_version, enriched, index
+
+def cache_stats():
+    return dict(_prepared_stats)
+
+def clear_caches():
+    global _estimator, _rtt_store
+    _prepared_cache.clear()
+    _estimator = None
+    _rtt_store = None
+    load_region_coords.cache_clear()
+    locate.cache_clear()
+    pair_bandwidth.cache_clear()
+    EGRESS_TABLE.clear()
+    FLAT_EGRESS_TABLE.clear()
+
+def _filter_model(enriched, gpu_model):
     model_filter = (gpu_model or "").strip().lower()
     if model_filter and model_filter != "any":
-        model_allowed = [p for p in enriched if model_filter in str(p["gpu"]).lower()]
-    else:
-        model_allowed = enriched
+        return [p for p in enriched if model_filter in str(p.gpu).lower()]
+    return enriched
 
-    allowed = [p for p in model_allowed if p["rtt"] <= r_max]
-    forbidden = [p["name"] for p in model_allowed if p["rtt"] > r_max]
+def build_model_index(enriched):
+    # Price rank of every offer plus catalog positions grouped by GPU name.
+    order = sorted(range(len(enriched)), key=lambda i: enriched[i].price)
+    rank = [0] * len(enriched)
+    for position, idx in enumerate(order):
+        rank[idx] = position
 
-    # Step 2: sort by effective cost
-    allowed.sort(key=lambda x: x["price"])
+    positions_by_gpu = {}
+    for idx, p in enumerate(enriched):
+        positions_by_gpu.setdefault(str(p.gpu).lower(), []).append(idx)
+    return {"rank": rank, "positions_by_gpu": positions_by_gpu}
 
-    # Step 3: greedy allocation
-    placement = {}
-    remaining = required_gpus
-    total_cost = 0
+def model_positions(enriched, index, gpu_model):
+    # Catalog positions matching the same substring rule as _filter_model.
+    model_filter = (gpu_model or "").strip().lower()
+    if not model_filter or model_filter == "any":
+        return list(range(len(enriched)))
+    positions = []
+    for gpu_name, gpu_positions in index["positions_by_gpu"].items():
+        if model_filter in gpu_name:
+            positions.extend(gpu_positions)
+    positions.sort()
+    return positions
 
-    for p in allowed:
+def greedy_fill(candidates, placement, remaining):
+    for p in candidates:
         if remaining <= 0:
             break
-        alloc = min(p["capacity"], remaining)
-        placement[p["name"]] = alloc
-        total_cost += alloc * p["price"] * steps
+        alloc = min(p.capacity, remaining)
+        placement[p.name] = placement.get(p.name, 0) + alloc
         remaining -= alloc
+    return remaining
+
+def _forbidden_names(model_allowed, r_max):
+    return [p.name for p in model_allowed if p.rtt > r_max]
+
+def _allocate(model_allowed, required_gpus, r_max, presorted=False):
+    allowed = [p for p in model_allowed if p.rtt <= r_max]
+
+    # Step 2: sort by effective cost (stable, so a pre-sorted input is kept as is)
+    if not presorted:
+        allowed.sort(key=lambda x: x.price)
+
+    # Step 3: greedy allocation
+    placement = {}
+    remaining = greedy_fill(allowed, placement, required_gpus)
 
     # Step 4: fallback if still missing GPUs
     if remaining > 0:
-        others = [p for p in model_allowed if p["rtt"] > r_max]
-        others.sort(key=lambda x: x["price"])
-        for p in others:
+        others = [p for p in model_allowed if p.rtt > r_max]
+        if not presorted:
+            others.sort(key=lambda x: x.price)
+        greedy_fill(others, placement, remaining)
+
+    return placement
+
+def _solve_restricted(order, n_allowed, required_gpus, forced, excluded):
+    # Cheapest fill in greedy order where every forced offer keeps at least one GPU.
+    if len(forced) > required_gpus:
+        return None
+    remaining = required_gpus - len(forced)
+    last_forced = max(forced, default=-1)
+    allocs = []
+    fallback_gpus = 0
+    rate = 0.0
+    for i, p in enumerate(order):
+        if remaining <= 0 and i > last_forced:
+            break
+        if i in excluded:
+            continue
+        alloc = 1 if i in forced else 0
+        extra = min(p.capacity - alloc, remaining)
+        if extra > 0:
+            alloc += extra
+            remaining -= extra
+        if alloc > 0:
+            allocs.append((i, alloc))
+            rate += alloc * p.price
+            if i >= n_allowed:
+                fallback_gpus += alloc
+    if not allocs:
+        return None
+    # Unplaced GPUs first, then GPUs spilled past r_max, then the hourly rate.
+    return (remaining, fallback_gpus, rate), allocs
+
+def _k_best_allocations(model_allowed, required_gpus, r_max, k):
+    # Lawler-style k-best enumeration: each popped solution is split into disjoint
+    # subproblems that force its first j-1 used offers and exclude the j-th one.
+    allowed = sorted((p for p in model_allowed if p.rtt <= r_max), key=lambda x: x.price)
+    others = sorted((p for p in model_allowed if p.rtt > r_max), key=lambda x: x.price)
+    order = allowed + others
+    n_allowed = len(allowed)
+
+    root = _solve_restricted(order, n_allowed, required_gpus, frozenset(), frozenset())
+    if root is None:
+        return []
+
+    counter = 0
+    heap = [(root[0], counter, frozenset(), frozenset(), root[1])]
+    seen = set()
+    results = []
+    expansions = 0
+    while heap and len(results) < k and expansions < k * TOP_K_MAX_EXPANSIONS:
+        _, _, forced, excluded, allocs = heapq.heappop(heap)
+        expansions += 1
+
+        # Offers sharing a name (several hosts at one site) add up, as in greedy_fill.
+        placement = {}
+        for i, alloc in allocs:
+            name = order[i].name
+            placement[name] = placement.get(name, 0) + alloc
+        signature = frozenset(placement.items())
+        if signature not in seen:
+            seen.add(signature)
+            results.append(placement)
+
+        prefix = set(forced)
+        for i, _ in allocs:
+            if i not in forced:
+                child_forced = frozenset(prefix)
+                child_excluded = excluded | {i}
+                child = _solve_restricted(order, n_allowed, required_gpus, child_forced, child_excluded)
+                if child is not None:
+                    counter += 1
+                    heapq.heappush(heap, (child[0], counter, child_forced, child_excluded, child[1]))
+            prefix.add(i)
+
+    return results
+
+def _rank_candidates(model_allowed, placement, total_cost, breakdown, n, params, data_source_provider,
+                     egress_overrides, topology, spans):
+    # [(total_cost, order, placement, breakdown)] for the greedy placement
+    # (order 0) and the first n k-best fills placing as many GPUs (order = 1-based
+    # enumeration index), cheapest total cost first.
+    placed_gpus = sum(placement.values())
+    with spans("k_best"):
+        candidates = _k_best_allocations(model_allowed, params["required_gpus"], params["r_max"], n)
+    evaluated = [(total_cost, 0, placement, breakdown)]
+    seen = {frozenset(placement.items())}
+    for order, alt_placement in enumerate(candidates, start=1):
+        signature = frozenset(alt_placement.items())
+        if signature in seen or sum(alt_placement.values()) < placed_gpus:
+            continue
+        seen.add(signature)
+        with spans("evaluate"):
+            alt_cost, alt_breakdown = evaluate_placement(
+                model_allowed, alt_placement, params, data_source_provider, egress_overrides, topology, spans
+            )
+        evaluated.append((alt_cost, order, alt_placement, alt_breakdown))
+    evaluated.sort(key=lambda item: item[:2])
+    return evaluated
+
+def _fair_share_choice(evaluated):
+    # Shared links change comm time per placement, so the plan is the cheapest of
+    # the first FAIR_SHARE_CANDIDATES fills by total cost, whatever top_k asked for.
+    return next(item for item in evaluated if item[1] <= FAIR_SHARE_CANDIDATES)
+
+def _placement_diff(base, other):
+    added = sorted(k for k, v in other.items() if v > 0 and base.get(k, 0) <= 0)
+    removed = sorted(k for k, v in base.items() if v > 0 and other.get(k, 0) <= 0)
+    changed = sorted(
+        k for k, v in other.items()
+        if v > 0 and base.get(k, 0) > 0 and base[k] != v
+    )
+    return added, removed, changed
+
+def _empty_breakdown():
+    return {
+        "compute_cost": 0.0,
+        "egress_cost": 0.0,
+        "inter_provider_cost": 0.0,
+        "total_time_hours": 0.0,
+        "compute_time_per_step_sec": 0.0,
+        "comm_time_per_step_sec": 0.0,
+        "steps_per_epoch": 0,
+        "total_steps": 0,
+        "cost_per_epoch": 0.0,
+        "egress_rate_source": 0.0,
+        "egress_rate_by_provider": {},
+        "pairwise_costs": {},
+    }
+
+def normalize_params(
+    required_gpus,
+    r_max,
+    model_size,
+    steps,
+    dataset_size_gb,
+    epochs,
+    batch_size,
+    sample_size_gb,
+    training_hours,
+    base_compute_sec,
+    compute_scale_per_gb,
+    bandwidth_base_gbps,
+    egress_pricing="tiered",
+    data_strategy="stream",
+    cache_hit_ratio=DEFAULT_CACHE_HIT_RATIO,
+    network_model="average",
+    egress_baseline_gb=None,
+):
+    return {
+        "required_gpus": max(1, to_int(required_gpus, 1)),
+        "r_max": to_float(r_max, 20.0),
+        "model_size": to_float(model_size, 5.0),
+        "steps": to_int(steps, 0),
+        "dataset_size_gb": to_float(dataset_size_gb, 1.0),
+        "epochs": max(1, to_int(epochs, 1)),
+        "batch_size": max(1, to_int(batch_size, 1)),
+        "sample_size_gb": to_float(sample_size_gb, 0.01),
+        "training_hours": to_float(training_hours, 0.0),
+        "base_compute_sec": to_float(base_compute_sec, 0.4),
+        "compute_scale_per_gb": to_float(compute_scale_per_gb, 0.08),
+        "bandwidth_base_gbps": to_float(bandwidth_base_gbps, 10.0),
+        "egress_pricing": egress_pricing or "tiered",
+        "data_strategy": data_strategy or "stream",
+        "cache_hit_ratio": to_float(cache_hit_ratio, DEFAULT_CACHE_HIT_RATIO),
+        "network_model": network_model or "average",
+        # GB each provider (or site) has already billed this month; tiers apply on top.
+        "egress_baseline_gb": dict(egress_baseline_gb or {}),
+    }
+
+def _placement_sites(offers, placement):
+    # One Offer per placed name. Several offers can share a name (many hosts in
+    # one region); the site's GPUs are filled from them cheapest first, so its
+    # price is the GPU-weighted price of that fill.
+    groups = {}
+    for p in offers:
+        if placement.get(p.name, 0) > 0:
+            groups.setdefault(p.name, []).append(p)
+    sites = []
+    for name, group in groups.items():
+        if len(group) == 1:
+            sites.append(group[0])
+            continue
+        group.sort(key=lambda x: x.price)
+        remaining = placement[name]
+        price = base_price = 0.0
+        for p in group:
+            take = min(p.capacity, remaining) if p is not group[-1] else remaining
+            price += take * p.price
+            base_price += take * p.base_price
+            remaining -= take
             if remaining <= 0:
                 break
-            alloc = min(p["capacity"], remaining)
-            placement[p["name"]] = alloc
-            total_cost += alloc * p["price"] * steps
-            remaining -= alloc
+        first = group[0]
+        gpus = placement[name]
+        sites.append(Offer(
+            first.provider,
+            first.region,
+            first.gpu,
+            price / gpus,
+            base_price / gpus,
+            first.rtt,
+            first.bandwidth,
+            sum(p.capacity for p in group),
+            any(p.stale for p in group),
+        ))
+    return sites
+
+def evaluate_placement(enriched, placement, params, data_source_provider, egress_overrides, topology,
+                        spans=NULL_SPANS):
+    # enriched: the offers the placement was drawn from (its names resolve
+    # against these, see _placement_sites).
+    required_gpus = params["required_gpus"]
+    model_size = params["model_size"]
+    steps = params["steps"]
+    dataset_size_gb = params["dataset_size_gb"]
+    epochs = params["epochs"]
 
     providers_used = len([k for k, v in placement.items() if v > 0])
     if providers_used == 0:
-        return placement, 0.0, forbidden, {
-            "compute_cost": 0.0,
-            "egress_cost": 0.0,
-            "inter_provider_cost": 0.0,
-            "total_time_hours": 0.0,
-            "compute_time_per_step_sec": 0.0,
-            "comm_time_per_step_sec": 0.0,
-            "steps_per_epoch": 0,
-            "total_steps": 0,
-            "cost_per_epoch": 0.0,
-            "egress_rate_source": 0.0,
-            "egress_rate_by_provider": {},
-            "pairwise_costs": {},
-        }
-
-    steps_per_epoch = math.ceil(dataset_size_gb / max(1e-6, batch_size * sample_size_gb))
+        return 0.0, _empty_breakdown()
+
+    steps_per_epoch = math.ceil(dataset_size_gb / max(1e-6, params["batch_size"] * params["sample_size_gb"]))
     total_steps = steps if steps > 0 else steps_per_epoch * max(1, epochs)
 
     # Compute time estimate
     compute_time_per_step = _compute_time_per_step(
         model_size_gb=model_size,
         total_gpus=required_gpus,
-        base_sec=base_compute_sec,
-        scale_per_gb=compute_scale_per_gb,
+        base_sec=params["base_compute_sec"],
+        scale_per_gb=params["compute_scale_per_gb"],
     )
 
-    # Communication time estimate uses weighted average bandwidth/RTT
-    used = [p for p in enriched if placement.get(p["name"], 0) > 0]
-    avg_bw = sum(p["bandwidth"] for p in used) / max(1, len(used))
-    avg_rtt = sum(p["rtt"] for p in used) / max(1, len(used))
+    used = _placement_sites(enriched, placement)
+
+    # How each remote site gets the dataset: streaming, staging or a shard cache.
+    remote = [
+        p for p in used
+        if data_source_provider and data_source_provider.lower() not in p.name.lower()
+    ]
+    egress_table = _egress_table(params["egress_pricing"])
+    list_source_rate = float(egress_table.average_rates(
+        [data_source_provider or ""], [0.0], egress_overrides, params["egress_baseline_gb"]
+    )[0])
+    data_plan = plan_data_movement(
+        dataset_size_gb,
+        total_steps,
+        [p.bandwidth for p in remote],
+        [placement[p.name] * p.price for p in remote],
+        list_source_rate,
+        strategy=params["data_strategy"],
+        cache_hit_ratio=params["cache_hit_ratio"],
+    )
+    # Sites copy in parallel before training; the slowest one delays the start.
+    staging_hours = float(data_plan["stall_hours"].max()) if remote else 0.0
+
+    # Communication time estimate uses weighted average bandwidth/RTT, or with the
+    # fair-share model the slowest gradient flow once links are shared.
+    avg_bw = sum(p.bandwidth for p in used) / max(1, len(used))
+    avg_rtt = sum(p.rtt for p in used) / max(1, len(used))
+    allreduce_bw = avg_bw
+    bottleneck_links = []
+    if params["network_model"] == "fair_share":
+        # One site per name (see _placement_sites).
+        sites = [p.name for p in used]
+        access_gbps = {p.name: p.bandwidth for p in used}
+        if data_source_provider:
+            access_gbps.setdefault(data_source_provider, params["bandwidth_base_gbps"])
+        streaming = [p.name for p, strategy in zip(remote, data_plan["strategy"]) if strategy != "stage"]
+        network = flow_rates(sites, access_gbps, data_source_provider, streaming, topology)
+        sync_rates = [r for (kind, _, _), r in zip(network["flows"], network["rates"]) if kind == "sync"]
+        if sync_rates:
+            allreduce_bw = float(min(sync_rates))
+        bottleneck_links = ["/".join(link) for link in network["bottlenecks"]]
+    elif params["network_model"] != "average":
+        raise ValueError(f"Unknown network model: {params['network_model']}")
     comm_time_per_step = _all_reduce_comm_time(
         model_size_gb=model_size,
-        bandwidth_gbps=avg_bw,
+        bandwidth_gbps=allreduce_bw,
         rtt_ms=avg_rtt,
         providers_used=providers_used,
         topology=topology,
     )
 
     derived_hours = (total_steps * (compute_time_per_step + comm_time_per_step)) / 3600.0
-    total_time_hours = training_hours if training_hours > 0 else derived_hours
+    training_hours = params["training_hours"]
+    total_time_hours = (training_hours if training_hours > 0 else derived_hours) + staging_hours
 
     # Compute cost uses time-based pricing
     compute_cost = 0.0
     for p in used:
-        gpus = placement[p["name"]]
-        compute_cost += gpus * p["price"] * total_time_hours
-
-    # Egress from data source per step (streamed dataset)
-    egress_cost = 0.0
-    source_rate = _provider_egress_rate(data_source_provider or "")
-    base_rates = {p["name"]: _provider_egress_rate(p["name"]) for p in used}
-    egress_rate_by_provider = _merge_egress_overrides(base_rates, egress_overrides)
+        gpus = placement[p.name]
+        compute_cost += gpus * p.price * total_time_hours
+
+    # This run's outbound volume per billing name: the data source serves every remote
+    # site per its data plan and each site sends its gradients to every other site.
+    volume_gb = model_size * total_steps
+    data_volume_gb = float(data_plan["volume_gb"].sum())
+    outbound = {}
+    for src in used:
+        peers = sum(1 for dst in used if dst.name != src.name)
+        outbound[src.name] = outbound.get(src.name, 0.0) + volume_gb * peers
     if data_source_provider:
-        egress_rate_by_provider[data_source_provider] = egress_overrides.get(
-            data_source_provider, source_rate
-        )
-    source_rate = egress_rate_by_provider.get(data_source_provider, source_rate)
-    for p in used:
-        if data_source_provider and data_source_provider.lower() not in p["name"].lower():
-            egress_cost += dataset_size_gb * total_steps * source_rate
+        outbound[data_source_provider] = outbound.get(data_source_provider, 0.0) + data_volume_gb
+
+    # Volume-averaged tiered rate per billing name for this run's volume on top of
+    # the month's baseline, overrides as flat $/GB.
+    names = list(outbound)
+    average_rates = egress_table.average_rates(
+        names, [outbound[n] for n in names], egress_overrides, params["egress_baseline_gb"]
+    )
+    billed_rate = dict(zip(names, average_rates.tolist()))
+
+    # Egress from the data source for the planned transfer volume
+    source_rate = billed_rate.get(data_source_provider) if data_source_provider else None
+    if source_rate is None:
+        source_rate = _provider_egress_rate(data_source_provider or "")
+    site_rates = {p.name: billed_rate[p.name] for p in used}
+    egress_rate_by_provider = _merge_egress_overrides(site_rates, egress_overrides)
+    if data_source_provider:
+        egress_rate_by_provider[data_source_provider] = source_rate
+    egress_cost = data_volume_gb * source_rate
 
     # Inter-provider sync cost per step (all-reduce)
     inter_provider_cost = 0.0
     pairwise_costs = {}
-    volume_gb = model_size * total_steps
-    for src in used:
-        for dst in used:
-            if src["name"] == dst["name"]:
-                continue
-            min_bw = min(src["bandwidth"], dst["bandwidth"])
-            bw_penalty = bandwidth_base_gbps / max(0.1, min_bw)
-            cost = volume_gb * egress_rate_by_provider[src["name"]] * bw_penalty
-            pairwise_costs[(src["name"], dst["name"])] = cost
-            inter_provider_cost += cost
+    with spans("evaluate.pairwise"):
+        for src in used:
+            for dst in used:
+                if src.name == dst.name:
+                    continue
+                min_bw = min(src.bandwidth, dst.bandwidth)
+                bw_penalty = params["bandwidth_base_gbps"] / max(0.1, min_bw)
+                cost = volume_gb * billed_rate[src.name] * bw_penalty
+                pairwise_costs[(src.name, dst.name)] = cost
+                inter_provider_cost += cost
 
     total_cost = compute_cost + egress_cost + inter_provider_cost
     cost_per_epoch = total_cost / max(1, epochs)
@@ -254,6 +624,227 @@ def run_geo_nap(
         "pairwise_costs": pairwise_costs,
         "model_size_gb": model_size,
         "dataset_size_gb": dataset_size_gb,
+        "stale_providers": sorted({p.name for p in used if p.stale}),
+        "egress_pricing": params["egress_pricing"],
+        "egress_volume_gb_by_provider": outbound,
+        "data_strategy_by_provider": {p.name: s for p, s in zip(remote, data_plan["strategy"])},
+        "data_volume_gb": data_volume_gb,
+        "data_staging_hours": staging_hours,
+        "network_model": params["network_model"],
+        "allreduce_bandwidth_gbps": allreduce_bw,
+        "bottleneck_links": bottleneck_links,
     }
 
+    return total_cost, breakdown
+
+def run_geo_nap(
+    required_gpus,
+    r_max,
+    model_size,
+    steps,
+    dataset_size_gb,
+    epochs,
+    batch_size,
+    sample_size_gb,
+    data_source_provider,
+    egress_overrides,
+    topology,
+    gpu_model,
+    training_hours=0.0,
+    base_compute_sec=0.4,
+    compute_scale_per_gb=0.08,
+    bandwidth_base_gbps=10.0,
+    top_k=0,
+    catalog_version=None,
+    stale_after_hours=0.0,
+    stale_policy="penalize",
+    egress_pricing="tiered",
+    data_strategy="stream",
+    cache_hit_ratio=DEFAULT_CACHE_HIT_RATIO,
+    network_model="average",
+    origin_region=None,
+    egress_baseline_gb=None,
+    timings=False,
+    profile=False,
+):
+    # timings=True adds breakdown["timings"] (ms per stage); profile=True adds a
+    # cProfile report of this call as breakdown["profile"].
+    params = normalize_params(
+        required_gpus, r_max, model_size, steps, dataset_size_gb, epochs, batch_size,
+        sample_size_gb, training_hours, base_compute_sec, compute_scale_per_gb, bandwidth_base_gbps,
+        egress_pricing, data_strategy, cache_hit_ratio, network_model, egress_baseline_gb,
+    )
+    result, stage_ms, report = instrumented(
+        "run_geo_nap", _plan, params, data_source_provider, egress_overrides, topology, gpu_model,
+        top_k, catalog_version, stale_after_hours, stale_policy, origin_region,
+        timings=timings, profile=profile,
+    )
+    _attach_instrumentation(result[3], stage_ms, report)
+    return result
+
+def _attach_instrumentation(breakdown, stage_ms, report):
+    if stage_ms is not None:
+        breakdown["timings"] = stage_ms
+    if report is not None:
+        breakdown["profile"] = report
+
+def _plan(
+    params,
+    data_source_provider,
+    egress_overrides,
+    topology,
+    gpu_model,
+    top_k,
+    catalog_version,
+    stale_after_hours,
+    stale_policy,
+    origin_region,
+    spans,
+):
+    # Pin one catalog snapshot for the whole request.
+    catalog_version, enriched, _ = prepare(catalog_version, stale_after_hours, stale_policy, origin_region, spans)
+
+    # Step 1: filter by RTT and optional GPU model
+    with spans("filter"):
+        model_allowed = _filter_model(enriched, gpu_model)
+        forbidden = _forbidden_names(model_allowed, params["r_max"])
+    with spans("allocate"):
+        placement = _allocate(model_allowed, params["required_gpus"], params["r_max"])
+
+    with spans("evaluate"):
+        total_cost, breakdown = evaluate_placement(
+            model_allowed, placement, params, data_source_provider, egress_overrides, topology, spans
+        )
+
+    # Optional: the K cheapest distinct placements by total cost, each placing as
+    # many GPUs as the placement above.
+    top_k = to_int(top_k, 0)
+    fair_share = params["network_model"] == "fair_share"
+    if top_k > 1 or fair_share:
+        n = max(top_k * TOP_K_CANDIDATE_FACTOR, FAIR_SHARE_CANDIDATES if fair_share else 0)
+        evaluated = _rank_candidates(
+            model_allowed, placement, total_cost, breakdown, n,
+            params, data_source_provider, egress_overrides, topology, spans,
+        )
+        if fair_share:
+            total_cost, _, placement, breakdown = _fair_share_choice(evaluated)
+    breakdown["catalog_version"] = catalog_version
+
+    if top_k > 1:
+        alternatives = []
+        for rank, (alt_cost, _, alt_placement, alt_breakdown) in enumerate(evaluated[:top_k], start=1):
+            added, removed, changed = _placement_diff(placement, alt_placement)
+            alternatives.append({
+                "rank": rank,
+                "placement": alt_placement,
+                "total_cost": alt_cost,
+                "delta_cost": alt_cost - total_cost,
+                "compute_cost": alt_breakdown["compute_cost"],
+                "egress_cost": alt_breakdown["egress_cost"],
+                "inter_provider_cost": alt_breakdown["inter_provider_cost"],
+                "added": added,
+                "removed": removed,
+                "changed": changed,
+            })
+        breakdown["alternatives"] = alternatives
+
     return placement, total_cost, forbidden, breakdown
+
+def run_geo_nap_by_model(
+    required_gpus,
+    r_max,
+    model_size,
+    steps,
+    dataset_size_gb,
+    epochs,
+    batch_size,
+    sample_size_gb,
+    data_source_provider,
+    egress_overrides,
+    topology,
+    models=None,
+    training_hours=0.0,
+    base_compute_sec=0.4,
+    compute_scale_per_gb=0.08,
+    bandwidth_base_gbps=10.0,
+    catalog_version=None,
+    stale_after_hours=0.0,
+    stale_policy="penalize",
+    egress_pricing="tiered",
+    data_strategy="stream",
+    cache_hit_ratio=DEFAULT_CACHE_HIT_RATIO,
+    network_model="average",
+    origin_region=None,
+    egress_baseline_gb=None,
+    timings=False,
+    profile=False,
+):
+    # Same result as calling run_geo_nap once per model, but the catalog is read,
+    # enriched and price-sorted once and every model reuses that shared pass.
+    # Timings and the profile cover the whole call and are shared by every model.
+    params = normalize_params(
+        required_gpus, r_max, model_size, steps, dataset_size_gb, epochs, batch_size,
+        sample_size_gb, training_hours, base_compute_sec, compute_scale_per_gb, bandwidth_base_gbps,
+        egress_pricing, data_strategy, cache_hit_ratio, network_model, egress_baseline_gb,
+    )
+    results, stage_ms, report = instrumented(
+        "run_geo_nap_by_model", _plan_by_model, params, data_source_provider, egress_overrides, topology,
+        models, catalog_version, stale_after_hours, stale_policy, origin_region,
+        timings=timings, profile=profile,
+    )
+    for result in results.values():
+        _attach_instrumentation(result[3], stage_ms, report)
+    return results
+
+def _plan_by_model(
+    params,
+    data_source_provider,
+    egress_overrides,
+    topology,
+    models,
+    catalog_version,
+    stale_after_hours,
+    stale_policy,
+    origin_region,
+    spans,
+):
+    catalog_version, enriched, index = prepare(catalog_version, stale_after_hours, stale_policy, origin_region, spans)
+
+    if models is None:
+        models = sorted({p.gpu for p in enriched if p.gpu and p.gpu != "unknown"})
+
+    results = {}
+    for model in models:
+        with spans("filter"):
+            positions = model_positions(enriched, index, model)
+            forbidden = _forbidden_names([enriched[i] for i in positions], params["r_max"])
+        with spans("allocate"):
+            positions.sort(key=index["rank"].__getitem__)
+            placement = _allocate(
+                [enriched[i] for i in positions], params["required_gpus"], params["r_max"], presorted=True
+            )
+        with spans("evaluate"):
+            total_cost, breakdown = evaluate_placement(
+                [enriched[i] for i in positions], placement, params, data_source_provider, egress_overrides,
+                topology, spans,
+            )
+        if params["network_model"] == "fair_share":
+            total_cost, _, placement, breakdown = _fair_share_choice(_rank_candidates(
+                [enriched[i] for i in positions], placement, total_cost, breakdown, FAIR_SHARE_CANDIDATES,
+                params, data_source_provider, egress_overrides, topology, spans,
+            ))
+        breakdown["catalog_version"] = catalog_version
+        results[model] = (placement, total_cost, forbidden, breakdown)
+
+    return results
+
+# -----------------------------
+# Planner API
+# -----------------------------
+# Public helpers above (prepare, normalize_params, greedy_fill,
+# evaluate_placement, ...) are shared with the planners in optimizer/ and
+# benchmarks/; underscore names are internal to run_geo_nap.
+
+def load_offers(providers=None, catalog_version=None):
+    # Enriched offers for caller-supplied rows (validated here) or a catalog version.
+    return _enrich(_load_providers(catalog_version, providers))
@@ -1,4 +1,4 @@
-import json
+import sys
 from pathlib import Path
 from azure import get_azure
 from vast import get_vast
@@ -7,8 +7,13 @@ from lambda_labs import get_lambda
 from paperspace import get_paperspace
 from aws import get_aws
 from gcp import get_gcp
+from price_history import append_snapshot, apply_retention
+from discovery_state import record_results
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT_DIR))
+
+from catalog import publish_catalog  # noqa: E402
 
 
 def discover_all():
@@ -27,10 +32,15 @@ def discover_all():
     data += get_aws()
     data += get_gcp()
 
-    providers_path = ROOT_DIR / "cache" / "providers.json"
-    with providers_path.open("w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
-    print("Discovered", len(data), "GPU providers")
+    record_results(data)
+
+    # Readers pin a version, so publishing never tears an in-flight read.
+    version = publish_catalog(data)
+    print("Discovered", len(data), "GPU providers (catalog version", version + ")")
+
+    # Keep every run in the price history instead of only the latest catalog.
+    append_snapshot(data)
+    apply_retention()
 
 if __name__ == "__main__":
     discover_all()
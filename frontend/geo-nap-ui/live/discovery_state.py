@@ -0,0 +1,79 @@
+import json
+import os
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+STATE_PATH = ROOT_DIR / "cache" / "discovery_state.json"
+
+
+def load_state(path=STATE_PATH):
+    try:
+        with Path(path).open("r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+    return state if isinstance(state, dict) else {}
+
+
+def save_state(state, path=STATE_PATH):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp, path)
+
+
+def stamp_offers(offers, fetched_at):
+    for offer in offers:
+        offer["fetched_at"] = fetched_at
+    return offers
+
+
+def record_attempt(state, provider, started_at, duration_sec, offers=None, error=None):
+    entry = state.setdefault(provider, {})
+    entry["last_attempt"] = started_at
+    entry["last_duration_sec"] = round(duration_sec, 3)
+    if error is None:
+        entry["last_success"] = started_at
+        entry["offers"] = len(offers or [])
+        entry["last_error"] = None
+    else:
+        entry["last_error"] = str(error)
+    return state
+
+
+def record_results(offers, fetched_at=None, path=STATE_PATH):
+    # One-shot discovery: stamp offers and mark every provider that returned data.
+    fetched_at = time.time() if fetched_at is None else fetched_at
+    stamp_offers(offers, fetched_at)
+    counts = {}
+    for offer in offers:
+        counts[offer["provider"]] = counts.get(offer["provider"], 0) + 1
+    state = load_state(path)
+    for provider, n in counts.items():
+        record_attempt(state, provider, fetched_at, 0.0, offers=[None] * n)
+    save_state(state, path)
+    return state
+
+
+def provider_ages(offers, state=None, now=None):
+    # Seconds since each provider's data was fetched (offer stamps, else state file).
+    now = time.time() if now is None else now
+    state = load_state() if state is None else state
+    newest = {}
+    for offer in offers:
+        provider = offer.get("provider", "unknown")
+        fetched_at = offer.get("fetched_at")
+        if fetched_at is not None:
+            newest[provider] = max(newest.get(provider, 0.0), float(fetched_at))
+        else:
+            newest.setdefault(provider, None)
+
+    ages = {}
+    for provider, fetched_at in newest.items():
+        if fetched_at is None:
+            fetched_at = state.get(provider, {}).get("last_success")
+        ages[provider] = None if fetched_at is None else max(0.0, now - float(fetched_at))
+    return ages
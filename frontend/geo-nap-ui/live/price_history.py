@@ -0,0 +1,305 @@
+import os
+import shutil
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+HISTORY_DIR = ROOT_DIR / "cache" / "history"
+
+# Raw snapshots are kept for a few days, then compacted to hourly min/mean/max.
+RAW_RETENTION_DAYS = 2
+HISTORY_RETENTION_DAYS = 180
+DOWNSAMPLE_SECONDS = 3600
+
+# Partition layout: "<ts>-<ns>.npz" raw snapshots (ns keeps snapshots taken in the
+# same second apart), "seg-<hour>.npz" lossless merges of a finished hour, and
+# "hourly.npz" once the day is downsampled. Merged files list the files they
+# absorbed under SOURCES_KEY, so a reader that lists a partition mid-merge skips
+# the sources still on disk instead of counting their rows twice.
+COMPACTED_FILE = "hourly.npz"
+SEGMENT_PREFIX = "seg-"
+SOURCES_KEY = "sources"
+STRING_COLUMNS = ("provider", "region", "gpu")
+# Times load_range re-lists after a file vanished under it (merged meanwhile).
+LOAD_ATTEMPTS = 5
+
+
+def _partition_name(ts):
+    return datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+def _partition_start(name):
+    return datetime.strptime(name, "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp()
+
+
+def _encode(values):
+    # Dictionary-encode a string column: small vocabulary + int32 codes.
+    vocab, codes = np.unique(np.asarray(values, dtype=str), return_inverse=True)
+    return vocab, codes.astype(np.int32)
+
+
+def _write_npz(path, columns):
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with tmp.open("wb") as f:
+        np.savez_compressed(f, **columns)
+    os.replace(tmp, path)
+
+
+def _snapshot_columns(ts, offers):
+    n = len(offers)
+    columns = {
+        "ts": np.full(n, int(ts), dtype=np.int64),
+        "price": np.array([float(o.get("price") or 0.0) for o in offers], dtype=np.float32),
+    }
+    for col in STRING_COLUMNS:
+        vocab, codes = _encode([str(o.get(col, "unknown")) for o in offers])
+        columns[f"{col}_vocab"] = vocab
+        columns[f"{col}_code"] = codes
+    return columns
+
+
+def append_snapshot(offers, ts=None, history_dir=HISTORY_DIR):
+    # Append one catalog snapshot to its day partition; never rewrites old files.
+    ts = int(time.time() if ts is None else ts)
+    partition = Path(history_dir) / _partition_name(ts)
+    partition.mkdir(parents=True, exist_ok=True)
+    path = partition / f"{ts}-{time.time_ns()}.npz"
+    _write_npz(path, _snapshot_columns(ts, offers))
+    return path
+
+
+def _raw_ts(path):
+    # "<ts>-<ns>.npz", or "<ts>.npz" as written before the ns suffix.
+    return int(path.stem.split("-", 1)[0])
+
+
+def _read_npz(path):
+    # Returns (columns, names of the files this one absorbed).
+    with np.load(path, allow_pickle=False) as data:
+        columns = {k: data[k] for k in data.files}
+    sources = columns.pop(SOURCES_KEY, None)
+    sources = set() if sources is None else set(sources.tolist())
+    if "price_min" not in columns:
+        columns["price_min"] = columns["price"]
+        columns["price_max"] = columns["price"]
+        columns["samples"] = np.ones(len(columns["price"]), dtype=np.int32)
+    for col in STRING_COLUMNS:
+        columns[col] = columns.pop(f"{col}_vocab")[columns.pop(f"{col}_code")]
+    return columns, sources
+
+
+def _file_span(path):
+    if path.name == COMPACTED_FILE:
+        start = _partition_start(path.parent.name)
+        return start, start + 86400 - 1
+    if path.stem.startswith(SEGMENT_PREFIX):
+        start = int(path.stem[len(SEGMENT_PREFIX):])
+        return start, start + DOWNSAMPLE_SECONDS - 1
+    ts = _raw_ts(path)
+    return ts, ts
+
+
+def _partition_files(history_dir, start, end):
+    history_dir = Path(history_dir)
+    if not history_dir.exists():
+        return []
+    files = []
+    for partition in sorted(p for p in history_dir.iterdir() if p.is_dir()):
+        try:
+            day_start = _partition_start(partition.name)
+        except ValueError:
+            continue
+        if day_start + 86400 <= start or day_start > end:
+            continue
+        for path in sorted(partition.glob("*.npz")):
+            first, last = _file_span(path)
+            if last >= start and first <= end:
+                files.append(path)
+    return files
+
+
+def _load_parts(history_dir, start, end):
+    parts = {}
+    absorbed = set()
+    for path in _partition_files(history_dir, start, end):
+        columns, sources = _read_npz(path)
+        absorbed.update(path.parent / name for name in sources)
+        mask = (columns["ts"] >= start) & (columns["ts"] <= end)
+        if mask.any():
+            parts[path] = {k: v[mask] for k, v in columns.items()}
+    return [part for path, part in parts.items() if path not in absorbed]
+
+
+def load_range(start, end, history_dir=HISTORY_DIR):
+    # All rows with start <= ts <= end as one columnar dict (raw and compacted).
+    # Retention may merge and unlink files between listing and reading them;
+    # the partition is then listed again.
+    for attempt in range(LOAD_ATTEMPTS):
+        try:
+            parts = _load_parts(history_dir, start, end)
+            break
+        except FileNotFoundError:
+            if attempt == LOAD_ATTEMPTS - 1:
+                raise
+    if not parts:
+        return {
+            "ts": np.empty(0, dtype=np.int64),
+            "price": np.empty(0, dtype=np.float32),
+            "price_min": np.empty(0, dtype=np.float32),
+            "price_max": np.empty(0, dtype=np.float32),
+            "samples": np.empty(0, dtype=np.int32),
+            "provider": np.empty(0, dtype=str),
+            "region": np.empty(0, dtype=str),
+            "gpu": np.empty(0, dtype=str),
+        }
+    return {k: np.concatenate([p[k] for p in parts]) for k in parts[0]}
+
+
+def _group_stats(columns, keys):
+    # Sample-weighted min/avg/max per unique combination of the key columns.
+    n = len(columns["price"])
+    if n == 0:
+        return []
+    key_codes = []
+    vocabs = []
+    for key in keys:
+        vocab, codes = np.unique(columns[key], return_inverse=True)
+        vocabs.append(vocab)
+        key_codes.append(codes.astype(np.int64))
+    combined = np.zeros(n, dtype=np.int64)
+    for vocab, codes in zip(vocabs, key_codes):
+        combined = combined * len(vocab) + codes
+    groups, inverse = np.unique(combined, return_inverse=True)
+
+    weights = columns["samples"].astype(np.float64)
+    sums = np.bincount(inverse, weights=columns["price"].astype(np.float64) * weights, minlength=len(groups))
+    counts = np.bincount(inverse, weights=weights, minlength=len(groups))
+    mins = np.full(len(groups), np.inf)
+    np.minimum.at(mins, inverse, columns["price_min"].astype(np.float64))
+    maxs = np.full(len(groups), -np.inf)
+    np.maximum.at(maxs, inverse, columns["price_max"].astype(np.float64))
+
+    rows = []
+    for g, group in enumerate(groups):
+        row = {}
+        rest = int(group)
+        for key, vocab in reversed(list(zip(keys, vocabs))):
+            rest, code = divmod(rest, len(vocab))
+            row[key] = str(vocab[code])
+        row.update({
+            "min_price": float(mins[g]),
+            "avg_price": float(sums[g] / counts[g]),
+            "max_price": float(maxs[g]),
+            "samples": int(counts[g]),
+        })
+        rows.append(row)
+    return rows
+
+
+def price_stats(start, end, keys=("gpu", "region"), gpu_model=None, provider=None, history_dir=HISTORY_DIR):
+    # e.g. min/avg price per GPU model per region over [start, end].
+    columns = load_range(start, end, history_dir)
+    mask = np.ones(len(columns["price"]), dtype=bool)
+    if gpu_model and gpu_model.strip().lower() != "any":
+        mask &= np.char.find(np.char.lower(columns["gpu"]), gpu_model.strip().lower()) >= 0
+    if provider:
+        mask &= np.char.lower(columns["provider"]) == provider.strip().lower()
+    if not mask.all():
+        columns = {k: v[mask] for k, v in columns.items()}
+    return _group_stats(columns, keys)
+
+
+def _merge_files(paths):
+    # Skips files another one in paths already absorbed (a merge interrupted
+    # before it unlinked its sources).
+    loaded = {path: _read_npz(path) for path in paths}
+    absorbed = {path.parent / name for path, (_, sources) in loaded.items() for name in sources}
+    parts = [columns for path, (columns, _) in loaded.items() if path not in absorbed]
+    return {k: np.concatenate([p[k] for p in parts]) for k in parts[0]}
+
+
+def _columns_to_npz(columns, sources=()):
+    out = {k: v for k, v in columns.items() if k not in STRING_COLUMNS}
+    for col in STRING_COLUMNS:
+        vocab, codes = _encode(columns[col])
+        out[f"{col}_vocab"] = vocab
+        out[f"{col}_code"] = codes
+    out[SOURCES_KEY] = np.array(sorted(sources), dtype=str)
+    return out
+
+
+def _seal_hours(partition, now):
+    # Merge raw snapshots of every finished hour into one segment file (lossless).
+    by_hour = {}
+    for path in partition.glob("*.npz"):
+        if path.name == COMPACTED_FILE or path.stem.startswith(SEGMENT_PREFIX):
+            continue
+        hour = _raw_ts(path) // DOWNSAMPLE_SECONDS * DOWNSAMPLE_SECONDS
+        if hour + DOWNSAMPLE_SECONDS <= now:
+            by_hour.setdefault(hour, []).append(path)
+
+    for hour, paths in by_hour.items():
+        segment = partition / f"{SEGMENT_PREFIX}{hour}.npz"
+        if segment.exists():
+            paths = paths + [segment]
+        sources = [path.name for path in paths if path != segment]
+        _write_npz(segment, _columns_to_npz(_merge_files(sorted(paths)), sources))
+        for path in paths:
+            if path != segment:
+                path.unlink()
+    return len(by_hour)
+
+
+def _compact_partition(partition):
+    # Roll a day of raw snapshots into hourly min/mean/max rows per offer.
+    sources = [p for p in partition.glob("*.npz") if p.name != COMPACTED_FILE]
+    if not sources:
+        return False
+    compacted = partition / COMPACTED_FILE
+    columns = _merge_files(sorted(sources) + ([compacted] if compacted.exists() else []))
+    columns["bucket"] = (columns["ts"] // DOWNSAMPLE_SECONDS * DOWNSAMPLE_SECONDS).astype(str)
+    rows = _group_stats(columns, ("bucket",) + STRING_COLUMNS)
+
+    out = {
+        "ts": np.array([int(r["bucket"]) for r in rows], dtype=np.int64),
+        "price": np.array([r["avg_price"] for r in rows], dtype=np.float32),
+        "price_min": np.array([r["min_price"] for r in rows], dtype=np.float32),
+        "price_max": np.array([r["max_price"] for r in rows], dtype=np.float32),
+        "samples": np.array([r["samples"] for r in rows], dtype=np.int32),
+    }
+    for col in STRING_COLUMNS:
+        out[col] = np.array([r[col] for r in rows], dtype=str)
+    _write_npz(compacted, _columns_to_npz(out, [path.name for path in sources]))
+    for path in sources:
+        path.unlink()
+    return True
+
+
+def apply_retention(now=None, history_dir=HISTORY_DIR,
+                    raw_retention_days=RAW_RETENTION_DAYS,
+                    history_retention_days=HISTORY_RETENTION_DAYS):
+    now = time.time() if now is None else now
+    history_dir = Path(history_dir)
+    if not history_dir.exists():
+        return {"sealed": 0, "compacted": 0, "deleted": 0}
+    today = datetime.fromtimestamp(now, tz=timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    compact_before = (today - timedelta(days=raw_retention_days)).timestamp()
+    delete_before = (today - timedelta(days=history_retention_days)).timestamp()
+
+    sealed = compacted = deleted = 0
+    for partition in sorted(p for p in history_dir.iterdir() if p.is_dir()):
+        try:
+            day_start = _partition_start(partition.name)
+        except ValueError:
+            continue
+        if day_start < delete_before:
+            shutil.rmtree(partition)
+            deleted += 1
+        elif day_start < compact_before:
+            compacted += int(_compact_partition(partition))
+        else:
+            sealed += _seal_hours(partition, now)
+    return {"sealed": sealed, "compacted": compacted, "deleted": deleted}
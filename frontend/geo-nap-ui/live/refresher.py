@@ -0,0 +1,158 @@
+import argparse
+import heapq
+import random
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+from azure import get_azure
+from vast import get_vast
+from runpod import get_runpod
+from lambda_labs import get_lambda
+from paperspace import get_paperspace
+from aws import get_aws
+from gcp import get_gcp
+from discovery_state import load_state, record_attempt, save_state, stamp_offers
+from price_history import append_snapshot, apply_retention
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT_DIR))
+
+from catalog import catalog_exists, load_catalog, publish_catalog  # noqa: E402
+from metrics import REFRESHER_PORT, observe_discovery, start_server  # noqa: E402
+
+# provider -> (discovery function, refresh interval in seconds)
+PROVIDERS = {
+    "vast": (get_vast, 300),
+    "runpod": (get_runpod, 600),
+    "lambda": (get_lambda, 600),
+    "paperspace": (get_paperspace, 900),
+    "azure": (get_azure, 1800),
+    "aws": (get_aws, 3600),
+    "gcp": (get_gcp, 3600),
+}
+
+JITTER = 0.1
+RETRY_FRACTION = 0.25
+DEFAULT_CONCURRENCY = 3
+
+
+def _next_due(now, interval, failed=False):
+    base = interval * (RETRY_FRACTION if failed else 1.0)
+    return now + base * (1.0 + random.uniform(-JITTER, JITTER))
+
+
+def _fetch(provider):
+    fn, _ = PROVIDERS[provider]
+    started_at = time.time()
+    started = time.monotonic()
+    try:
+        offers = fn()
+        error = None if offers else "empty result"
+    except Exception as exc:
+        offers, error = [], exc
+    return provider, started_at, time.monotonic() - started, offers, error
+
+
+class Refresher:
+    # Refreshes each provider on its own jittered interval in a small thread
+    # pool and publishes a new catalog snapshot after every successful fetch.
+
+    def __init__(self, providers=None, concurrency=DEFAULT_CONCURRENCY):
+        self.providers = list(providers or PROVIDERS)
+        self.concurrency = max(1, concurrency)
+        self.state = load_state()
+        self._publish_lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def _initial_schedule(self, now):
+        # Resume from the persisted last success so restarts don't refetch everything.
+        schedule = []
+        for provider in self.providers:
+            interval = PROVIDERS[provider][1]
+            last = self.state.get(provider, {}).get("last_success")
+            due = now if last is None else max(now, float(last) + interval)
+            heapq.heappush(schedule, (due + random.uniform(0, JITTER * interval), provider))
+        return schedule
+
+    def _apply(self, provider, started_at, duration, offers, error):
+        with self._publish_lock:
+            record_attempt(self.state, provider, started_at, duration, offers=offers, error=error)
+            observe_discovery(provider, error is None, duration)
+            if error is None:
+                # Swap only this provider's rows; other providers keep theirs.
+                current = load_catalog()[1] if catalog_exists() else []
+                fresh = stamp_offers(offers, started_at)
+                merged = [o for o in current if o.get("provider") != provider] + fresh
+                version = publish_catalog(merged)
+                # History gets only the rows just fetched; the others were
+                # recorded when their own provider refreshed.
+                if fresh:
+                    append_snapshot(fresh, started_at)
+                print(f"[{provider}] {len(offers)} offers in {duration:.1f}s -> catalog {version}")
+            else:
+                print(f"[{provider}] refresh failed: {error}")
+            save_state(self.state)
+
+    def run_once(self):
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            for result in pool.map(_fetch, self.providers):
+                self._apply(*result)
+        apply_retention()
+
+    def run_forever(self):
+        schedule = self._initial_schedule(time.time())
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            while not self._stop.is_set():
+                now = time.time()
+                while schedule and schedule[0][0] <= now and len(running) < self.concurrency:
+                    _, provider = heapq.heappop(schedule)
+                    running[pool.submit(_fetch, provider)] = provider
+
+                if len(running) >= self.concurrency or not schedule:
+                    timeout = None
+                else:
+                    timeout = max(0.0, schedule[0][0] - now)
+                if running:
+                    done, _ = wait(list(running), timeout=timeout, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        provider = running.pop(future)
+                        result = future.result()
+                        self._apply(*result)
+                        interval = PROVIDERS[provider][1]
+                        heapq.heappush(schedule, (_next_due(time.time(), interval, result[4] is not None), provider))
+                    if done:
+                        apply_retention()
+                else:
+                    self._stop.wait(timeout if timeout is not None else 1.0)
+
+    def stop(self):
+        self._stop.set()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Background GPU catalog refresher.")
+    parser.add_argument("--once", action="store_true", help="refresh every provider once and exit")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--providers", nargs="*", choices=sorted(PROVIDERS), default=None)
+    parser.add_argument("--metrics-port", type=int, default=REFRESHER_PORT, help="Prometheus /metrics port (0 = off)")
+    args = parser.parse_args()
+
+    if not args.once:
+        start_server(args.metrics_port)
+
+    refresher = Refresher(args.providers, args.concurrency)
+    if args.once:
+        refresher.run_once()
+        return
+    try:
+        refresher.run_forever()
+    except KeyboardInterrupt:
+        refresher.stop()
+
+
+if __name__ == "__main__":
+    main()
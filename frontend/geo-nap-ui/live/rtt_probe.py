@@ -1,12 +1,32 @@
 import subprocess
 import re
+import sys
 
-def ping(host):
-    result = subprocess.run(["ping", "-n", "4", host],
-                            capture_output=True, text=True)
-    match = re.findall(r"Average = (\d+)ms", result.stdout)
+PING_TIMEOUT_SEC = 15
+
+# Regional endpoints that answer from inside the region. Providers without a
+# per-region host are not probed; the engine falls back to distance estimates.
+REGION_HOSTS = {
+    "aws": "ec2.{region}.amazonaws.com",
+    "gcp": "{region}-run.googleapis.com",
+}
+
+def ping(host, count=4):
+    flag = "-n" if sys.platform.startswith("win") else "-c"
+    try:
+        result = subprocess.run(["ping", flag, str(count), host],
+                                capture_output=True, text=True, timeout=PING_TIMEOUT_SEC)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    # Windows: "Average = 29ms"; Linux/macOS: "rtt min/avg/max/mdev = 1.2/29.0/..."
+    match = re.findall(r"Average = (\d+)ms", result.stdout) or \
+        re.findall(r"= [\d.]+/([\d.]+)/", result.stdout)
     return float(match[0]) if match else None
 
+def probe_host(provider, region):
+    template = REGION_HOSTS.get((provider or "").lower())
+    return template.format(region=region) if template else None
+
 def get_live_rtt():
     hosts = {
         "aws_mumbai": "ec2.ap-south-1.amazonaws.com",
@@ -0,0 +1,175 @@
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+STORE_PATH = ROOT_DIR / "cache" / "rtt_store.json"
+
+# Source key for probes run from this machine.
+LOCAL_ORIGIN = "local"
+EWMA_ALPHA = 0.3
+WINDOW = 32
+DEFAULT_TTL_SEC = 3600
+# Coefficient of variation above which a pair is re-probed before its TTL.
+MAX_CV = 0.25
+MIN_SAMPLES_FOR_CV = 3
+PERCENTILES = (50, 90, 99)
+
+
+def _key(src, dst):
+    return f"{src}|{dst}"
+
+
+class RttStore:
+    # Rolling RTT measurements per (source, target) pair, persisted as JSON.
+    # Entries keep an EWMA, the last WINDOW samples and a lifetime count;
+    # lookup() is a dict read so the engine never waits on a probe.
+
+    def __init__(self, path=STORE_PATH, alpha=EWMA_ALPHA, window=WINDOW):
+        self.path = Path(path)
+        self.alpha = alpha
+        self.window = window
+        self._entries = {}
+
+    @classmethod
+    def load(cls, path=STORE_PATH, **kwargs):
+        store = cls(path, **kwargs)
+        try:
+            with store.path.open("r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return store
+        entries = data.get("pairs") if isinstance(data, dict) else None
+        if isinstance(entries, dict):
+            store._entries = {k: v for k, v in entries.items() if isinstance(v, dict) and "ewma" in v}
+        return store
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump({"pairs": self._entries}, f, indent=2)
+        os.replace(tmp, self.path)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, pair):
+        return _key(*pair) in self._entries
+
+    def pairs(self):
+        return [tuple(k.split("|", 1)) for k in self._entries]
+
+    def record(self, src, dst, rtt_ms, at=None):
+        # Failed probes (None/NaN) only stamp the attempt so the TTL still applies.
+        at = time.time() if at is None else at
+        entry = self._entries.get(_key(src, dst))
+        ok = rtt_ms is not None and math.isfinite(rtt_ms) and rtt_ms >= 0
+        if entry is None:
+            if not ok:
+                return None
+            entry = {"ewma": float(rtt_ms), "samples": [], "count": 0}
+            self._entries[_key(src, dst)] = entry
+        entry["probed_at"] = at
+        if ok:
+            if entry["count"]:
+                entry["ewma"] = self.alpha * float(rtt_ms) + (1 - self.alpha) * entry["ewma"]
+            entry["samples"] = (entry["samples"] + [float(rtt_ms)])[-self.window:]
+            entry["count"] += 1
+            entry["updated_at"] = at
+        return entry
+
+    def lookup(self, src, dst):
+        entry = self._entries.get(_key(src, dst))
+        return entry["ewma"] if entry is not None else None
+
+    def stats(self, src, dst):
+        entry = self._entries.get(_key(src, dst))
+        if entry is None:
+            return None
+        samples = np.asarray(entry["samples"], dtype=np.float64)
+        out = {
+            "ewma": entry["ewma"],
+            "count": entry["count"],
+            "updated_at": entry.get("updated_at"),
+            "cv": self._cv(entry),
+        }
+        values = np.percentile(samples, PERCENTILES) if len(samples) else [math.nan] * len(PERCENTILES)
+        for q, value in zip(PERCENTILES, values):
+            out[f"p{q}"] = None if math.isnan(value) else float(value)
+        return out
+
+    @staticmethod
+    def _cv(entry):
+        samples = entry["samples"]
+        if len(samples) < MIN_SAMPLES_FOR_CV:
+            return None
+        mean = float(np.mean(samples))
+        return float(np.std(samples)) / mean if mean > 0 else None
+
+    def due(self, src, targets, now=None, ttl_sec=DEFAULT_TTL_SEC, max_cv=MAX_CV, budget=None):
+        # Targets needing a probe, in caller priority order: never measured,
+        # older than ttl_sec, or noisier than max_cv. budget caps the list.
+        now = time.time() if now is None else now
+        selected = []
+        for dst in targets:
+            entry = self._entries.get(_key(src, dst))
+            if entry is None or now - entry.get("probed_at", 0) > ttl_sec:
+                selected.append(dst)
+            else:
+                cv = self._cv(entry)
+                if cv is not None and cv > max_cv:
+                    selected.append(dst)
+            if budget is not None and len(selected) >= budget:
+                break
+        return selected
+
+    def refresh(self, probe, targets, src=LOCAL_ORIGIN, now=None, ttl_sec=DEFAULT_TTL_SEC, max_cv=MAX_CV, budget=None):
+        # targets: {dst: host}, highest priority first. probe(host) -> ms or None.
+        due = self.due(src, targets, now=now, ttl_sec=ttl_sec, max_cv=max_cv, budget=budget)
+        for dst in due:
+            self.record(src, dst, probe(targets[dst]))
+        return due
+
+
+def catalog_targets(version=None):
+    # Probe-able catalog sites ordered by cheapest listed price, so a small
+    # budget covers the regions the optimizer is most likely to pick.
+    from catalog import load_catalog
+    from live.rtt_probe import probe_host
+    from offer import offer_name
+
+    _, offers = load_catalog(version)
+    best = {}
+    for offer in offers:
+        name = offer_name(offer["provider"], offer["region"])
+        if name not in best or offer["price"] < best[name][0]:
+            best[name] = (offer["price"], probe_host(offer["provider"], offer["region"]))
+    ordered = sorted(best.items(), key=lambda item: item[1][0])
+    return {name: host for name, (_, host) in ordered if host}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Probe catalog regions whose RTT entry is missing, old or noisy.")
+    parser.add_argument("--budget", type=int, default=20, help="max probes this run")
+    parser.add_argument("--ttl", type=float, default=DEFAULT_TTL_SEC, help="re-probe entries older than this (seconds)")
+    parser.add_argument("--max-cv", type=float, default=MAX_CV, help="re-probe entries noisier than this")
+    args = parser.parse_args()
+
+    sys.path.insert(0, str(ROOT_DIR))
+    from live.rtt_probe import ping
+
+    store = RttStore.load()
+    probed = store.refresh(ping, catalog_targets(), ttl_sec=args.ttl, max_cv=args.max_cv, budget=args.budget)
+    store.save()
+    print("Probed", len(probed), "of", len(store), "RTT entries")
+
+
+if __name__ == "__main__":
+    main()
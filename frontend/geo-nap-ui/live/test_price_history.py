@@ -0,0 +1,110 @@
+# live/test_price_history.py
+import numpy as np
+import pytest
+
+import price_history as ph
+
+DAY = 86400
+# Midnight UTC, so hours and partitions line up with the arithmetic below.
+T0 = 1_790_000_000 - 1_790_000_000 % DAY
+OFFERS = [
+    {"provider": "aws", "region": "us-east-1", "gpu": "H100", "price": 4.0},
+    {"provider": "vast", "region": "Texas, US", "gpu": "RTX 4090", "price": 0.4},
+]
+
+
+def _rows(tmp_path, start=T0, end=T0 + DAY - 1):
+    return ph.load_range(start, end, tmp_path)
+
+
+def _partition(tmp_path, ts=T0):
+    return tmp_path / ph._partition_name(ts)
+
+
+def test_same_second_snapshots_are_both_kept(tmp_path):
+    first = ph.append_snapshot(OFFERS, T0 + 10, tmp_path)
+    second = ph.append_snapshot(OFFERS, T0 + 10, tmp_path)
+    assert first != second
+    columns = _rows(tmp_path)
+    assert len(columns["price"]) == 4
+    assert set(columns["ts"]) == {T0 + 10}
+
+
+def test_sealing_finished_hours_is_lossless(tmp_path):
+    for minute in range(0, 60, 10):
+        ph.append_snapshot(OFFERS, T0 + minute * 60, tmp_path)
+    ph.append_snapshot(OFFERS, T0 + 3600 + 5, tmp_path)
+    before = _rows(tmp_path)
+
+    stats = ph.apply_retention(now=T0 + 3600 + 30, history_dir=tmp_path)
+    assert stats == {"sealed": 1, "compacted": 0, "deleted": 0}
+    names = sorted(p.name for p in _partition(tmp_path).iterdir())
+    assert names[-1] == f"{ph.SEGMENT_PREFIX}{T0}.npz"
+    assert len(names) == 2  # the segment plus the snapshot of the running hour
+
+    after = _rows(tmp_path)
+    assert sorted(after["ts"]) == sorted(before["ts"])
+    np.testing.assert_allclose(sorted(after["price"]), sorted(before["price"]))
+
+
+def test_compaction_downsamples_to_hourly_rows(tmp_path):
+    for minute, scale in ((0, 1.0), (20, 2.0), (40, 3.0)):
+        ph.append_snapshot([dict(OFFERS[0], price=4.0 * scale)], T0 + minute * 60, tmp_path)
+    ph.apply_retention(now=T0 + 7200, history_dir=tmp_path)
+
+    stats = ph.apply_retention(now=T0 + (ph.RAW_RETENTION_DAYS + 1) * DAY, history_dir=tmp_path)
+    assert stats["compacted"] == 1
+    assert [p.name for p in _partition(tmp_path).iterdir()] == [ph.COMPACTED_FILE]
+
+    columns = _rows(tmp_path)
+    assert list(columns["ts"]) == [T0]
+    assert columns["samples"][0] == 3
+    assert columns["price"][0] == pytest.approx(8.0)
+    assert columns["price_min"][0] == pytest.approx(4.0)
+    assert columns["price_max"][0] == pytest.approx(12.0)
+
+
+def test_old_partitions_are_deleted(tmp_path):
+    ph.append_snapshot(OFFERS, T0, tmp_path)
+    ph.append_snapshot(OFFERS, T0 + 5 * DAY, tmp_path)
+    stats = ph.apply_retention(now=T0 + 5 * DAY, history_dir=tmp_path, history_retention_days=3)
+    assert stats["deleted"] == 1
+    assert not _partition(tmp_path).exists()
+    assert _partition(tmp_path, T0 + 5 * DAY).exists()
+
+
+def test_listing_mid_merge_counts_rows_once(tmp_path):
+    # A segment written but its sources not yet unlinked, as a reader may see it.
+    paths = [ph.append_snapshot(OFFERS, T0 + s, tmp_path) for s in (1, 1, 2)]
+    segment = _partition(tmp_path) / f"{ph.SEGMENT_PREFIX}{T0}.npz"
+    ph._write_npz(segment, ph._columns_to_npz(ph._merge_files(paths), [p.name for p in paths]))
+    assert len(_rows(tmp_path)["price"]) == 6
+
+    # The next seal folds the leftovers in once.
+    ph.apply_retention(now=T0 + 3600, history_dir=tmp_path)
+    assert [p.name for p in _partition(tmp_path).iterdir()] == [segment.name]
+    assert len(_rows(tmp_path)["price"]) == 6
+
+
+def test_load_range_relists_after_a_file_vanishes(tmp_path, monkeypatch):
+    ph.append_snapshot(OFFERS, T0 + 1, tmp_path)
+    load_parts = ph._load_parts
+    calls = []
+
+    def flaky(*args):
+        calls.append(args)
+        if len(calls) == 1:
+            raise FileNotFoundError("merged meanwhile")
+        return load_parts(*args)
+
+    monkeypatch.setattr(ph, "_load_parts", flaky)
+    assert len(_rows(tmp_path)["price"]) == 2
+    assert len(calls) == 2
+
+
+def test_legacy_second_names_still_load(tmp_path):
+    partition = _partition(tmp_path)
+    partition.mkdir()
+    ph._write_npz(partition / f"{T0 + 30}.npz", ph._snapshot_columns(T0 + 30, OFFERS))
+    ph.append_snapshot(OFFERS, T0 + 30, tmp_path)
+    assert len(_rows(tmp_path)["price"]) == 4
@@ -1,6 +1,7 @@
 import json
 from pathlib import Path
 from live.rtt_probe import get_live_rtt
+from live.rtt_store import LOCAL_ORIGIN, RttStore
 from live.aws_pricing import get_aws_gpu_price
 from live.azure_pricing import get_azure_gpu_price
 from optimizer.milp import solve_geo_nap
@@ -10,6 +11,10 @@ ROOT_DIR = Path(__file__).resolve().parent
 print("Fetching live data...")
 
 rtt = get_live_rtt()
+rtt_store = RttStore.load()
+for name, ms in rtt.items():
+    rtt_store.record(LOCAL_ORIGIN, name, ms)
+rtt_store.save()
 pricing = {
     "aws_mumbai": get_aws_gpu_price(),
     "azure_mumbai": get_azure_gpu_price(),
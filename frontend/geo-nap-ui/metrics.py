@@ -0,0 +1,307 @@
+# metrics.py
+import math
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import catalog
+import timing
+
+# Prometheus metrics for the Python side, in the text exposition format and
+# without a client library. Each process that wants to be scraped calls
+# start_server(); the Streamlit app, the refresher and api.py (GET /metrics)
+# do. Metric names follow the Node services' metrics.service.
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 9464
+REFRESHER_PORT = 9465
+PORT_ENV = "GEO_NAP_METRICS_PORT"
+HOST_ENV = "GEO_NAP_METRICS_HOST"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+PLAN_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+DISCOVERY_BUCKETS = (0.1, 0.5, 1, 2, 5, 10, 30, 60, 120, 300)
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60, 180)
+
+# timing operation -> solver label of the plan latency histogram.
+SOLVERS = {
+    "run_geo_nap": "greedy",
+    "run_geo_nap_by_model": "greedy_by_model",
+    "solve_geo_nap": "milp",
+}
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _number(value):
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return f"{value:.10g}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        # name -> callable returning exposition lines, evaluated per scrape.
+        self._collectors = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, name, collect):
+        with self._lock:
+            self._collectors[name] = collect
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics)
+            collectors = list(self._collectors.items())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.collect())
+        for name, collect in collectors:
+            try:
+                lines.extend(collect())
+            except Exception as exc:
+                lines.append(f"# collector {name} failed: {type(exc).__name__}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+class Counter:
+    def __init__(self, name, help, labels=(), registry=REGISTRY):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+        registry.register(self)
+
+    def inc(self, amount=1.0, **labels):
+        key = tuple(str(labels[name]) for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def collect(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            lines.append(f"{self.name}{_labels(self.labels, key)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help, labels=(), buckets=PLAN_BUCKETS, registry=REGISTRY):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts (non-cumulative), sum, count]
+        self._series = {}
+        self._lock = threading.Lock()
+        registry.register(self)
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels[name]) for name in self.labels)
+        index = next((i for i, bound in enumerate(self.buckets) if value <= bound), len(self.buckets))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def collect(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((key, (list(s[0]), s[1], s[2])) for key, s in self._series.items())
+        for key, (counts, total, count) in series:
+            cumulative = 0
+            for bound, n in zip(self.buckets + (math.inf,), counts):
+                cumulative += n
+                lines.append(f"{self.name}_bucket{_labels(self.labels, key, [('le', _number(bound))])} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labels, key)} {count}")
+        return lines
+
+
+plan_duration = Histogram(
+    "geo_nap_plan_duration_seconds",
+    "Duration of placement plans in seconds",
+    labels=("solver",),
+)
+discovery_duration = Histogram(
+    "geo_nap_discovery_duration_seconds",
+    "Duration of provider discovery fetches in seconds",
+    labels=("provider", "result"),
+    buckets=DISCOVERY_BUCKETS,
+)
+discovery_runs = Counter(
+    "geo_nap_discovery_runs_total",
+    "Total provider discovery fetches",
+    labels=("provider", "result"),
+)
+backend_duration = Histogram(
+    "geo_nap_backend_request_duration_seconds",
+    "Duration of calls to backend services in seconds",
+    labels=("service", "operation", "status_code"),
+    buckets=REQUEST_BUCKETS,
+)
+http_duration = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request duration in seconds",
+    labels=("method", "path", "status_code"),
+    buckets=REQUEST_BUCKETS,
+)
+
+
+def observe_plan(solver, seconds):
+    plan_duration.observe(seconds, solver=solver)
+
+
+def observe_discovery(provider, ok, seconds):
+    result = "success" if ok else "failed"
+    discovery_duration.observe(seconds, provider=provider, result=result)
+    discovery_runs.inc(provider=provider, result=result)
+
+
+def observe_backend_request(service, operation, status_code, seconds):
+    # status_code "error" when no response came back.
+    backend_duration.observe(seconds, service=service, operation=operation, status_code=status_code)
+
+
+def observe_http_request(method, path, status_code, seconds):
+    http_duration.observe(seconds, method=method, path=path, status_code=status_code)
+
+
+# -----------------------------
+# Scrape-time collectors
+# -----------------------------
+_caches = {}
+
+
+def register_cache(name, stats):
+    # stats() -> {"hits": n, "misses": n}; re-registering a name replaces it.
+    _caches[name] = stats
+
+
+def _collect_caches():
+    lines = []
+    for kind in ("hits", "misses"):
+        name = f"geo_nap_cache_{kind}_total"
+        lines += [f"# HELP {name} Cache {kind} since process start", f"# TYPE {name} counter"]
+        for cache, stats in sorted(_caches.items()):
+            lines.append(f"{name}{_labels(('cache',), (cache,))} {stats()[kind]}")
+    return lines
+
+
+def _collect_catalog():
+    lines = []
+    version = catalog.current_version()
+    if version is None:
+        return lines
+    # Only a version this process has loaded; a scrape never loads one.
+    count = catalog.offer_count(version)
+    if count is not None:
+        lines += [
+            "# HELP geo_nap_catalog_offers Offers in the current catalog version",
+            "# TYPE geo_nap_catalog_offers gauge",
+            f"geo_nap_catalog_offers {count}",
+        ]
+    published = catalog.published_at(version)
+    if published is not None:
+        lines += [
+            "# HELP geo_nap_catalog_age_seconds Seconds since the current catalog version was published",
+            "# TYPE geo_nap_catalog_age_seconds gauge",
+            f"geo_nap_catalog_age_seconds {_number(max(time.time() - published, 0.0))}",
+        ]
+    return lines
+
+
+register_cache("catalog", catalog.cache_stats)
+REGISTRY.add_collector("caches", _collect_caches)
+REGISTRY.add_collector("catalog", _collect_catalog)
+
+# Per-stage engine timings, fed by the timing sink below.
+stage_histograms = timing.StageHistograms()
+REGISTRY.add_collector("stages", lambda: stage_histograms.render().splitlines())
+
+
+def _plan_sink(operation, timings):
+    solver = SOLVERS.get(operation)
+    if solver is not None and "total" in timings:
+        observe_plan(solver, timings["total"] / 1000.0)
+    stage_histograms(operation, timings)
+
+
+def instrument_engine():
+    # Times every engine request in this process; plans run elsewhere (e.g.
+    # api.py workers) are observed by their caller with observe_plan instead.
+    timing.add_sink(_plan_sink)
+
+
+# -----------------------------
+# HTTP endpoint
+# -----------------------------
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = REGISTRY.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_server(port=None, host=None):
+    # Serves GET /metrics from a daemon thread; at most one attempt per
+    # process. Returns the server, or None when disabled (port 0) or the port
+    # is taken.
+    global _server
+    with _server_lock:
+        if _server is not None:
+            return _server or None
+        if port is None:
+            port = int(os.environ.get(PORT_ENV, DEFAULT_PORT))
+        if host is None:
+            host = os.environ.get(HOST_ENV, DEFAULT_HOST)
+        if port <= 0:
+            _server = False
+            return None
+        try:
+            server = ThreadingHTTPServer((host, port), _Handler)
+        except OSError as exc:
+            print(f"Metrics endpoint not started on {host}:{port}: {exc}")
+            _server = False
+            return None
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+        _server = server
+        return server
@@ -0,0 +1,50 @@
+import numpy as np
+
+# How a remote site gets the training data from the data source:
+#   stream - read the dataset from the source on every step (no local copy)
+#   stage  - copy the dataset once before training starts
+#   cache  - keep a local shard cache; hits are copied once, misses are streamed
+STRATEGIES = ("stream", "stage", "cache")
+DEFAULT_CACHE_HIT_RATIO = 0.8
+
+
+def plan_data_movement(
+    dataset_gb,
+    total_steps,
+    bandwidth_gbps,
+    hourly_rate,
+    egress_rate,
+    strategy="auto",
+    cache_hit_ratio=DEFAULT_CACHE_HIT_RATIO,
+):
+    # Vectorized over remote sites: bandwidth_gbps and hourly_rate ($/hr of the
+    # GPUs waiting on a copy) are arrays. Transfer volume is priced at egress_rate
+    # and up-front copy time as idle GPU hours; "auto" picks the cheapest per site.
+    bandwidth = np.maximum(np.asarray(bandwidth_gbps, dtype=np.float64), 0.1)
+    hourly_rate = np.asarray(hourly_rate, dtype=np.float64)
+    n = len(bandwidth)
+    hit = min(1.0, max(0.0, float(cache_hit_ratio)))
+    streamed_gb = dataset_gb * total_steps
+    copy_hours = dataset_gb * 8.0 / bandwidth / 3600.0
+
+    volume_gb = np.vstack([
+        np.full(n, streamed_gb),
+        np.full(n, float(dataset_gb)),
+        np.full(n, hit * dataset_gb + (1.0 - hit) * streamed_gb),
+    ])
+    stall_hours = np.vstack([np.zeros(n), copy_hours, hit * copy_hours])
+    cost = volume_gb * egress_rate + stall_hours * hourly_rate
+
+    if strategy == "auto":
+        choice = np.argmin(cost, axis=0)
+    elif strategy in STRATEGIES:
+        choice = np.full(n, STRATEGIES.index(strategy))
+    else:
+        raise ValueError(f"Unknown data strategy: {strategy}")
+
+    cols = np.arange(n)
+    return {
+        "strategy": [STRATEGIES[c] for c in choice],
+        "volume_gb": volume_gb[choice, cols],
+        "stall_hours": stall_hours[choice, cols],
+    }
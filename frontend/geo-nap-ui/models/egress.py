@@ -0,0 +1,116 @@
+import math
+
+import numpy as np
+
+# Internet egress list prices as (tier upper bound in GB per month, $/GB).
+# The last tier of each schedule is open-ended. Free allowances are ignored.
+# Breakpoints are monthly account totals, so a run is priced as the increment
+# on top of the volume already billed that month (the baseline, 0 by default).
+EGRESS_TIERS = {
+    "aws": ((10_240, 0.09), (51_200, 0.085), (153_600, 0.07), (math.inf, 0.05)),
+    "azure": ((10_240, 0.08), (51_200, 0.075), (153_600, 0.07), (math.inf, 0.05)),
+    "gcp": ((1_024, 0.12), (10_240, 0.11), (math.inf, 0.08)),
+    "paperspace": ((math.inf, 0.10),),
+    "lambda": ((math.inf, 0.07),),
+    "runpod": ((math.inf, 0.06),),
+    "vast": ((math.inf, 0.02),),
+}
+DEFAULT_TIERS = ((math.inf, 0.09),)
+
+
+def flat_tiers(tiers=EGRESS_TIERS):
+    # Single-tier schedules at each provider's first-tier rate (pre-tiering behaviour).
+    return {family: ((math.inf, schedule[0][1]),) for family, schedule in tiers.items()}
+
+
+def tiered_cost(volumes, upper, rates):
+    # Cost of each volume under its own cumulative tier schedule.
+    # volumes: (n,), upper/rates: (n, T); unused trailing tiers have upper = inf.
+    volumes = np.asarray(volumes, dtype=np.float64)
+    lower = np.concatenate([np.zeros((len(volumes), 1)), upper[:, :-1]], axis=1)
+    with np.errstate(invalid="ignore"):
+        width = np.where(np.isinf(lower), 0.0, upper - lower)
+    in_tier = np.minimum(np.maximum(volumes[:, None] - lower, 0.0), width)
+    return (in_tier * rates).sum(axis=1)
+
+
+class EgressRateTable:
+    # Provider names resolve to a tier schedule once (same substring order the
+    # engine always used); overrides are flat $/GB by exact name or family.
+
+    def __init__(self, tiers=EGRESS_TIERS, default=DEFAULT_TIERS):
+        self.families = list(tiers)
+        schedules = [tiers[f] for f in self.families] + [default]
+        width = max(len(s) for s in schedules)
+        self._upper = np.full((len(schedules), width), math.inf)
+        self._rates = np.zeros((len(schedules), width))
+        for row, schedule in enumerate(schedules):
+            for col, (bound, rate) in enumerate(schedule):
+                self._upper[row, col] = bound
+                self._rates[row, col] = rate
+        self._row_by_name = {}
+
+    def _row(self, name):
+        row = self._row_by_name.get(name)
+        if row is None:
+            lowered = name.lower()
+            row = next((i for i, f in enumerate(self.families) if f in lowered), len(self.families))
+            self._row_by_name[name] = row
+        return row
+
+    def family(self, name):
+        row = self._row(name)
+        return self.families[row] if row < len(self.families) else None
+
+    def base_rate(self, name):
+        return float(self._rates[self._row(name), 0])
+
+    def _override(self, name, overrides):
+        if not overrides:
+            return None
+        value = overrides.get(name)
+        if value is None:
+            family = self.family(name)
+            value = overrides.get(family) if family else None
+        return value
+
+    def baselines(self, names, baseline=None):
+        # GB already billed this month per name, by exact name or family.
+        return np.array([float(self._override(name, baseline) or 0.0) for name in names])
+
+    def schedules(self, names, overrides=None):
+        rows = [self._row(name) for name in names]
+        upper = self._upper[rows]
+        rates = self._rates[rows]
+        for i, name in enumerate(names):
+            value = self._override(name, overrides)
+            if value is not None:
+                upper[i] = math.inf
+                rates[i] = value
+        return upper, rates
+
+    def costs(self, names, volumes, overrides=None, baseline=None):
+        # Cost of each volume billed on top of its name's monthly baseline.
+        upper, rates = self.schedules(names, overrides)
+        volumes = np.asarray(volumes, dtype=np.float64)
+        base = self.baselines(names, baseline)
+        return tiered_cost(base + volumes, upper, rates) - tiered_cost(base, upper, rates)
+
+    def average_rates(self, names, volumes, overrides=None, baseline=None):
+        # $/GB actually paid at each volume; the marginal rate at the baseline
+        # when volume is 0.
+        upper, rates = self.schedules(names, overrides)
+        volumes = np.asarray(volumes, dtype=np.float64)
+        base = self.baselines(names, baseline)
+        cost = tiered_cost(base + volumes, upper, rates) - tiered_cost(base, upper, rates)
+        tier = np.minimum((base[:, None] >= upper).sum(axis=1), upper.shape[1] - 1)
+        marginal = rates[np.arange(len(rates)), tier]
+        safe = np.where(volumes > 0, volumes, 1.0)
+        return np.where(volumes > 0, cost / safe, marginal)
+
+    def clear(self):
+        self._row_by_name.clear()
+
+
+EGRESS_TABLE = EgressRateTable()
+FLAT_EGRESS_TABLE = EgressRateTable(flat_tiers())
@@ -0,0 +1,184 @@
+import math
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+COORDS_PATH = ROOT_DIR / "data" / "region_coords.csv"
+
+EARTH_RADIUS_KM = 6371.0
+# RTT = intercept + slope * great-circle km. Light in fiber gives >= 0.01 ms/km
+# round trip; real routes run ~1.5x longer plus fixed switching/queueing delay.
+DEFAULT_INTERCEPT_MS = 5.0
+DEFAULT_SLOPE_MS_PER_KM = 0.015
+MIN_SLOPE_MS_PER_KM = 0.01
+CLOUD_TABLES = ("aws", "azure", "gcp")
+
+@lru_cache(maxsize=1)
+def load_region_coords():
+    df = pd.read_csv(COORDS_PATH)
+    return {str(k): (float(lat), float(lon)) for k, lat, lon in zip(df["key"], df["lat"], df["lon"])}
+
+def _coords_key(provider, region):
+    coords = load_region_coords()
+    provider = (provider or "").strip().lower()
+    region = (region or "").strip()
+    key = f"{provider}:{region.lower()}"
+    if key in coords:
+        return key
+    # "State, CC" / ", CC" geolocations (Vast and similar marketplaces).
+    if "," in region:
+        place, _, country = region.rpartition(",")
+        country = country.strip().upper()
+        place = place.strip()
+        for key in (f"geo:{country}-{place}", f"geo:{country}"):
+            if key in coords:
+                return key
+    # Smaller clouds often reuse AWS/GCP-style region names.
+    for table in CLOUD_TABLES:
+        key = f"{table}:{region.lower()}"
+        if key in coords:
+            return key
+    return None
+
+@lru_cache(maxsize=65536)
+def locate(provider, region):
+    # (lat, lon) for a catalog offer's provider/region, or None when unknown.
+    key = _coords_key(provider, region)
+    return load_region_coords()[key] if key else None
+
+def locate_name(text):
+    # Accepts "aws:us-east-1", an offer name like "azure_eastus2" or "Arizona, US".
+    text = (text or "").strip()
+    if ":" in text:
+        provider, _, region = text.partition(":")
+    else:
+        provider, sep, region = text.partition("_")
+        if not sep:
+            provider, region = "", text
+    return locate(provider, region) or locate("", text)
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    # Vectorized great-circle distance; accepts scalars or numpy arrays.
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(x, dtype=np.float64)) for x in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+def unit_vectors(lat, lon):
+    lat = np.radians(np.asarray(lat, dtype=np.float64))
+    lon = np.radians(np.asarray(lon, dtype=np.float64))
+    return np.stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=-1)
+
+def fit_latency_model(distances_km, rtts_ms):
+    # Least-squares line through measured (distance, RTT) pairs, kept physical.
+    distances_km = np.asarray(distances_km, dtype=np.float64)
+    rtts_ms = np.asarray(rtts_ms, dtype=np.float64)
+    if len(distances_km) < 2 or np.ptp(distances_km) <= 0:
+        return DEFAULT_INTERCEPT_MS, DEFAULT_SLOPE_MS_PER_KM
+    slope, intercept = np.polyfit(distances_km, rtts_ms, 1)
+    slope = max(float(slope), MIN_SLOPE_MS_PER_KM)
+    intercept = max(float(np.mean(rtts_ms - slope * distances_km)), 0.0)
+    return intercept, slope
+
+
+class KDTree:
+    # Static 3-d tree over points on the unit sphere. Chord length grows with
+    # great-circle distance, so a chord radius query is a distance query.
+
+    def __init__(self, points):
+        self.points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        self._nodes = []
+        self._root = self._build(np.arange(len(self.points)), 0)
+
+    def _build(self, idx, depth):
+        if len(idx) == 0:
+            return -1
+        axis = depth % 3
+        order = idx[np.argsort(self.points[idx, axis], kind="stable")]
+        mid = len(order) // 2
+        node = len(self._nodes)
+        self._nodes.append(None)
+        left = self._build(order[:mid], depth + 1)
+        right = self._build(order[mid + 1:], depth + 1)
+        self._nodes[node] = (int(order[mid]), axis, left, right)
+        return node
+
+    def query_radius(self, point, radius):
+        point = np.asarray(point, dtype=np.float64)
+        r2 = radius * radius
+        found = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node < 0:
+                continue
+            i, axis, left, right = self._nodes[node]
+            p = self.points[i]
+            if float(((p - point) ** 2).sum()) <= r2:
+                found.append(i)
+            delta = point[axis] - p[axis]
+            if delta <= radius:
+                stack.append(left)
+            if delta >= -radius:
+                stack.append(right)
+        return found
+
+
+class RttEstimator:
+    # Distance-based RTT for regions without measurements, plus a spatial index
+    # over the coordinate table for "regions within X ms" queries.
+
+    def __init__(self, intercept_ms=DEFAULT_INTERCEPT_MS, slope_ms_per_km=DEFAULT_SLOPE_MS_PER_KM):
+        self.intercept_ms = intercept_ms
+        self.slope_ms_per_km = slope_ms_per_km
+        # Built on the first within_ms call; plain estimates never need it.
+        self._tree = None
+
+    @classmethod
+    def fitted(cls, measurements):
+        # measurements: iterable of ((lat, lon), (lat, lon), rtt_ms).
+        rows = [(a, b, ms) for a, b, ms in measurements if a and b and ms is not None]
+        if not rows:
+            return cls()
+        a = np.array([r[0] for r in rows])
+        b = np.array([r[1] for r in rows])
+        km = haversine_km(a[:, 0], a[:, 1], b[:, 0], b[:, 1])
+        return cls(*fit_latency_model(km, [r[2] for r in rows]))
+
+    def rtt_for_km(self, km):
+        return self.intercept_ms + self.slope_ms_per_km * np.asarray(km, dtype=np.float64)
+
+    def estimate(self, origin, target):
+        # origin/target are (lat, lon); None when either location is unknown.
+        if origin is None or target is None:
+            return None
+        km = haversine_km(origin[0], origin[1], target[0], target[1])
+        return float(self.rtt_for_km(km))
+
+    def _index(self):
+        if self._tree is None:
+            coords = load_region_coords()
+            self.keys = list(coords)
+            self._latlon = np.array([coords[k] for k in self.keys]).reshape(-1, 2)
+            self._tree = KDTree(unit_vectors(self._latlon[:, 0], self._latlon[:, 1]))
+        return self._tree
+
+    def within_ms(self, origin, max_rtt_ms):
+        # [(coordinate-table key, estimated RTT)] for regions whose estimated RTT
+        # from origin is <= max_rtt_ms, nearest first. The tree prunes by chord
+        # length before the exact haversine check.
+        if origin is None or max_rtt_ms < self.intercept_ms:
+            return []
+        km = (max_rtt_ms - self.intercept_ms) / self.slope_ms_per_km
+        angle = min(km / EARTH_RADIUS_KM, math.pi)
+        chord = 2 * math.sin(angle / 2)
+        hits = self._index().query_radius(unit_vectors(origin[0], origin[1]), chord + 1e-12)
+        if not hits:
+            return []
+        hits = np.array(hits)
+        rtts = self.rtt_for_km(haversine_km(origin[0], origin[1], self._latlon[hits, 0], self._latlon[hits, 1]))
+        keep = rtts <= max_rtt_ms
+        order = np.argsort(rtts[keep], kind="stable")
+        return [(self.keys[i], float(r)) for i, r in zip(hits[keep][order], rtts[keep][order])]
@@ -1,15 +1,100 @@
 import pandas as pd
+import numpy as np
+from functools import lru_cache
 from pathlib import Path
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
 
-def load_rtt():
-    df = pd.read_csv(ROOT_DIR / "data" / "rtt.csv")
+RTT_PATH = ROOT_DIR / "data" / "rtt.csv"
+BANDWIDTH_PATH = ROOT_DIR / "data" / "bandwidth.csv"
+
+def load_rtt(path=RTT_PATH):
+    df = pd.read_csv(path)
     return {(r["from"], r["to"]): r["rtt_ms"] for _, r in df.iterrows()}
 
-def load_bandwidth():
-    df = pd.read_csv(ROOT_DIR / "data" / "bandwidth.csv")
+def load_bandwidth(path=BANDWIDTH_PATH):
+    df = pd.read_csv(path)
     return {(r["from"], r["to"]): r["bandwidth_gbps"] for _, r in df.iterrows()}
 
 def rtt_filter(rtt, r_max):
     return {k: v for k, v in rtt.items() if v <= r_max}
+
+@lru_cache(maxsize=1)
+def pair_bandwidth():
+    # Symmetric site-pair capacities from data/bandwidth.csv, read once per process.
+    pairs = {}
+    for (a, b), gbps in load_bandwidth().items():
+        pairs[(a, b)] = float(gbps)
+        pairs[(b, a)] = float(gbps)
+    return pairs
+
+def placement_flows(sites, data_source=None, streaming_sites=(), topology="ring"):
+    # Concurrent transfers of one training step: the source streams to every
+    # streaming site and sites exchange gradients (ring neighbours or all pairs).
+    flows = []
+    if data_source:
+        flows += [("data", data_source, site) for site in streaming_sites]
+    if len(sites) > 1:
+        if topology == "mesh":
+            flows += [("sync", a, b) for a in sites for b in sites if a != b]
+        else:
+            flows += [("sync", a, sites[(i + 1) % len(sites)]) for i, a in enumerate(sites)]
+    return flows
+
+def build_link_graph(flows, access_gbps, pairs=None):
+    # Each flow crosses the sender's uplink, the site-pair link when the bandwidth
+    # matrix has one, and the receiver's downlink. Returns link capacities and a
+    # (links x flows) incidence matrix.
+    pairs = pair_bandwidth() if pairs is None else pairs
+    index = {}
+    capacity = []
+    rows = []
+    cols = []
+
+    def link(key, gbps):
+        i = index.get(key)
+        if i is None:
+            i = index[key] = len(capacity)
+            capacity.append(max(float(gbps), 1e-3))
+        return i
+
+    for f, (_, src, dst) in enumerate(flows):
+        hops = [link(("up", src), access_gbps[src]), link(("down", dst), access_gbps[dst])]
+        if (src, dst) in pairs:
+            hops.append(link(("pair", src, dst), pairs[(src, dst)]))
+        rows += hops
+        cols += [f] * len(hops)
+
+    incidence = np.zeros((len(capacity), len(flows)), dtype=bool)
+    incidence[rows, cols] = True
+    return list(index), np.array(capacity), incidence
+
+def max_min_fair_rates(capacity, incidence, eps=1e-9):
+    # Progressive filling: raise every unfrozen flow equally until a link saturates,
+    # freeze the flows crossing it, repeat. At most one round per link.
+    n_links, n_flows = incidence.shape
+    rates = np.zeros(n_flows)
+    remaining = np.asarray(capacity, dtype=np.float64).copy()
+    active = incidence.any(axis=0)
+    rates[~active] = np.inf
+    weights = incidence.astype(np.float64)
+    while active.any():
+        counts = weights @ active
+        loaded = counts > 0
+        increment = np.min(remaining[loaded] / counts[loaded])
+        rates[active] += increment
+        remaining -= increment * counts
+        saturated = loaded & (remaining <= eps * np.maximum(capacity, 1.0))
+        active &= ~incidence[saturated].any(axis=0)
+    return rates
+
+def flow_rates(sites, access_gbps, data_source=None, streaming_sites=(), topology="ring", pairs=None):
+    # Achievable per-flow Gbps for a placement plus the saturated links.
+    flows = placement_flows(sites, data_source, streaming_sites, topology)
+    if not flows:
+        return {"flows": [], "rates": np.zeros(0), "bottlenecks": []}
+    links, capacity, incidence = build_link_graph(flows, access_gbps, pairs)
+    rates = max_min_fair_rates(capacity, incidence)
+    load = incidence.astype(np.float64) @ np.where(np.isinf(rates), 0.0, rates)
+    bottlenecks = [links[i] for i in np.flatnonzero(load >= capacity * (1 - 1e-6))]
+    return {"flows": flows, "rates": rates, "bottlenecks": bottlenecks}
@@ -0,0 +1,36 @@
+# models/test_egress.py
+import numpy as np
+import pytest
+
+from models.egress import EgressRateTable
+
+
+def test_run_is_priced_on_top_of_the_monthly_baseline():
+    table = EgressRateTable()
+    # 10 TB already billed at AWS: the next 1 TB falls in the 0.085 tier.
+    cost = table.costs(["aws_us-east-1"], [1024.0], baseline={"aws": 10_240})
+    assert cost[0] == pytest.approx(1024 * 0.085)
+    # Straddling a breakpoint splits the run between tiers.
+    cost = table.costs(["aws"], [1000.0], baseline={"aws": 9_740})
+    assert cost[0] == pytest.approx(500 * 0.09 + 500 * 0.085)
+
+
+def test_baseline_by_site_name_wins_and_defaults_to_zero():
+    table = EgressRateTable()
+    names = ["gcp_us-central1", "gcp_europe-west4", "vast_Texas, US"]
+    volumes = [100.0, 100.0, 100.0]
+    baseline = {"gcp": 20_000, "gcp_us-central1": 0}
+    np.testing.assert_allclose(table.costs(names, volumes, baseline=baseline), [12.0, 8.0, 2.0])
+    np.testing.assert_allclose(table.costs(names, volumes), table.costs(names, volumes, baseline={}))
+
+
+def test_average_rate_at_zero_volume_is_the_marginal_rate():
+    table = EgressRateTable()
+    for baseline, rate in ((0, 0.12), (1_024, 0.11), (50_000, 0.08)):
+        assert table.average_rates(["gcp"], [0.0], baseline={"gcp": baseline})[0] == pytest.approx(rate)
+
+
+def test_overrides_stay_flat_whatever_the_baseline():
+    table = EgressRateTable()
+    rates = table.average_rates(["aws"], [500.0], {"aws": 0.01}, baseline={"aws": 1e6})
+    assert rates[0] == pytest.approx(0.01)
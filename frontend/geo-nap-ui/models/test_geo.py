@@ -0,0 +1,49 @@
+# models/test_geo.py
+import numpy as np
+import pytest
+
+from models.geo import KDTree, RttEstimator, haversine_km, load_region_coords, unit_vectors
+
+
+def _random_latlon(rng, n):
+    # Uniform on the sphere, so the poles are not oversampled.
+    lat = np.degrees(np.arcsin(rng.uniform(-1.0, 1.0, n)))
+    lon = rng.uniform(-180.0, 180.0, n)
+    return lat, lon
+
+
+def test_query_radius_matches_brute_force():
+    rng = np.random.default_rng(3)
+    points = unit_vectors(*_random_latlon(rng, 2000))
+    tree = KDTree(points)
+    for radius in (0.0, 0.05, 0.3, 1.0, 2.0):
+        center = unit_vectors(*_random_latlon(rng, 1))[0]
+        expected = np.flatnonzero(((points - center) ** 2).sum(axis=1) <= radius * radius)
+        assert sorted(tree.query_radius(center, radius)) == list(expected)
+
+
+def test_empty_tree():
+    assert KDTree(np.empty((0, 3))).query_radius([1.0, 0.0, 0.0], 2.0) == []
+
+
+@pytest.mark.parametrize("max_rtt_ms", [4.0, 5.0, 20.0, 60.0, 150.0, 400.0])
+def test_within_ms_matches_brute_force(max_rtt_ms):
+    coords = load_region_coords()
+    keys = list(coords)
+    latlon = np.array([coords[k] for k in keys])
+    estimator = RttEstimator()
+    rng = np.random.default_rng(11)
+    origins = [coords["aws:us-east-1"], coords[keys[-1]]] + list(zip(*_random_latlon(rng, 8)))
+    for origin in origins:
+        rtts = estimator.rtt_for_km(haversine_km(origin[0], origin[1], latlon[:, 0], latlon[:, 1]))
+        expected = {keys[i] for i in np.flatnonzero(rtts <= max_rtt_ms)}
+
+        found = estimator.within_ms(origin, max_rtt_ms)
+        assert {key for key, _ in found} == expected
+        assert [ms for _, ms in found] == sorted(ms for _, ms in found)
+        for key, ms in found:
+            assert ms == pytest.approx(estimator.estimate(origin, coords[key]))
+
+
+def test_within_ms_without_origin():
+    assert RttEstimator().within_ms(None, 100.0) == []
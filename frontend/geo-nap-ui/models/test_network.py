@@ -0,0 +1,49 @@
+# models/test_network.py
+import numpy as np
+import pytest
+
+from models.network import flow_rates, max_min_fair_rates
+
+
+def _incidence(rows):
+    return np.array(rows, dtype=bool)
+
+
+def test_shared_link_is_split_evenly():
+    rates = max_min_fair_rates(np.array([10.0]), _incidence([[1, 1]]))
+    np.testing.assert_allclose(rates, [5.0, 5.0])
+
+
+def test_leftover_goes_to_unconstrained_flows():
+    # Flow 0 is capped by its own 3 Gbps link; flow 1 takes the rest of the shared 10.
+    capacity = np.array([3.0, 10.0])
+    incidence = _incidence([
+        [1, 0],
+        [1, 1],
+    ])
+    np.testing.assert_allclose(max_min_fair_rates(capacity, incidence), [3.0, 7.0])
+
+
+def test_rates_fit_every_link():
+    rng = np.random.default_rng(7)
+    capacity = rng.uniform(1.0, 20.0, 12)
+    incidence = rng.random((12, 30)) < 0.3
+    incidence[0] = True
+    rates = max_min_fair_rates(capacity, incidence)
+    load = incidence.astype(float) @ rates
+    assert np.all(load <= capacity * (1 + 1e-9))
+    # Max-min fair: every flow crosses at least one saturated link.
+    saturated = load >= capacity * (1 - 1e-9)
+    assert np.all(incidence[saturated].any(axis=0))
+
+
+def test_flow_without_links_is_unbounded():
+    rates = max_min_fair_rates(np.array([4.0]), _incidence([[1, 0]]))
+    assert rates[0] == pytest.approx(4.0)
+    assert np.isinf(rates[1])
+
+
+def test_flow_rates_reports_bottleneck_uplink():
+    result = flow_rates(["a", "b"], {"a": 1.0, "b": 10.0}, pairs={})
+    np.testing.assert_allclose(result["rates"], [1.0, 1.0])
+    assert ("up", "a") in result["bottlenecks"]
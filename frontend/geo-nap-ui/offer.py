@@ -0,0 +1,139 @@
+# offer.py
+import math
+import sys
+
+# Defaults the engine used to apply per access with .get(); now filled once at load.
+DEFAULT_RTT_MS = 30.0
+DEFAULT_BANDWIDTH_GBPS = 10.0
+DEFAULT_GPU = "unknown"
+
+# Placement key per (provider, region), built and interned once per process.
+_names = {}
+
+
+def offer_name(provider, region):
+    key = (provider, region)
+    name = _names.get(key)
+    if name is None:
+        name = sys.intern(f"{provider}_{region}")
+        _names[key] = name
+    return name
+
+
+class Offer:
+    # One enriched catalog row. `price` is the network-weighted effective price
+    # the engine ranks by; `base_price` is the listed $/GPU-hour.
+    __slots__ = (
+        "name",
+        "provider",
+        "region",
+        "gpu",
+        "price",
+        "base_price",
+        "rtt",
+        "bandwidth",
+        "capacity",
+        "stale",
+    )
+
+    def __init__(self, provider, region, gpu, price, base_price, rtt, bandwidth, capacity, stale=False):
+        self.provider = sys.intern(provider)
+        self.region = sys.intern(region)
+        self.gpu = sys.intern(gpu) if type(gpu) is str else gpu
+        self.name = offer_name(self.provider, self.region)
+        self.price = price
+        self.base_price = base_price
+        self.rtt = rtt
+        self.bandwidth = bandwidth
+        self.capacity = capacity
+        self.stale = stale
+
+    def _fields(self):
+        return tuple(getattr(self, slot) for slot in self.__slots__)
+
+    def __eq__(self, other):
+        if not isinstance(other, Offer):
+            return NotImplemented
+        return self._fields() == other._fields()
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Offer({self.name!r}, gpu={self.gpu!r}, price={self.price!r}, capacity={self.capacity!r})"
+
+    def to_dict(self):
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+
+def _number(value):
+    # Accepts ints/floats and numeric strings ("1.25", " 3 "); None for anything else.
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        number = float(value)
+    elif isinstance(value, str):
+        try:
+            number = float(value.strip())
+        except ValueError:
+            return None
+    else:
+        return None
+    return number if math.isfinite(number) else None
+
+
+def validate_row(row):
+    # Returns (clean_row, None) or (None, reason). Clean rows always carry typed
+    # provider/region/gpu/price/rtt/bandwidth/capacity; fetched_at only if known.
+    # Unknown keys are kept as they are.
+    if not isinstance(row, dict):
+        return None, "not an object"
+    provider = row.get("provider")
+    region = row.get("region")
+    if not isinstance(provider, str) or not provider.strip():
+        return None, "missing provider"
+    if not isinstance(region, str) or not region.strip():
+        return None, "missing region"
+    price = _number(row.get("price"))
+    if price is None or price <= 0:
+        return None, "missing or non-positive price"
+
+    clean = dict(row)
+    clean["provider"] = sys.intern(provider)
+    clean["region"] = sys.intern(region)
+    gpu = row.get("gpu")
+    clean["gpu"] = sys.intern(gpu) if isinstance(gpu, str) and gpu else DEFAULT_GPU
+    clean["price"] = price
+
+    # rtt_default marks a filled-in RTT so a distance estimate may replace it later.
+    rtt = None if row.get("rtt_default") else _number(row.get("rtt"))
+    if rtt is not None and rtt >= 0:
+        clean["rtt"] = rtt
+        clean.pop("rtt_default", None)
+    else:
+        clean["rtt"] = DEFAULT_RTT_MS
+        clean["rtt_default"] = True
+    bandwidth = _number(row.get("bandwidth"))
+    clean["bandwidth"] = bandwidth if bandwidth is not None and bandwidth > 0 else DEFAULT_BANDWIDTH_GBPS
+    capacity = _number(row.get("capacity"))
+    # 0 means "use the provider default" (see engine.default_capacity).
+    clean["capacity"] = int(capacity) if capacity is not None and capacity > 0 else 0
+
+    fetched_at = _number(row.get("fetched_at"))
+    if fetched_at is None:
+        clean.pop("fetched_at", None)
+    else:
+        clean["fetched_at"] = fetched_at
+    return clean, None
+
+
+def validate_offers(rows):
+    # Returns (clean_rows, rejected) where rejected is a list of (index, reason).
+    clean_rows = []
+    rejected = []
+    for idx, row in enumerate(rows):
+        clean, reason = validate_row(row)
+        if clean is None:
+            rejected.append((idx, reason))
+        else:
+            clean_rows.append(clean)
+    return clean_rows, rejected
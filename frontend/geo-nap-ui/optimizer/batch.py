@@ -0,0 +1,169 @@
+# optimizer/batch.py
+from engine import (
+    build_model_index,
+    evaluate_placement,
+    load_offers,
+    model_positions,
+    normalize_params,
+    to_float,
+)
+from optimizer.milp import solve_batch_placement
+
+# Job spec keys, same names and defaults as run_geo_nap arguments.
+JOB_PARAM_KEYS = (
+    "required_gpus",
+    "r_max",
+    "model_size",
+    "steps",
+    "dataset_size_gb",
+    "epochs",
+    "batch_size",
+    "sample_size_gb",
+    "training_hours",
+    "base_compute_sec",
+    "compute_scale_per_gb",
+    "bandwidth_base_gbps",
+    "egress_pricing",
+    "data_strategy",
+    "cache_hit_ratio",
+    "network_model",
+    "egress_baseline_gb",
+)
+
+def _job_params(spec):
+    return normalize_params(*(spec.get(key) for key in JOB_PARAM_KEYS))
+
+def _model_key(gpu_model):
+    key = (gpu_model or "").strip().lower()
+    return "any" if not key else key
+
+def _greedy_allocations(jobs, params, order, enriched, index, residual):
+    ranked_by_model = {}
+    cursor_by_model = {}
+    allocations = {}
+
+    for j in order:
+        key = _model_key(jobs[j].get("gpu_model"))
+        if key not in ranked_by_model:
+            positions = model_positions(enriched, index, key)
+            positions.sort(key=index["rank"].__getitem__)
+            ranked_by_model[key] = positions
+            cursor_by_model[key] = 0
+        ranked = ranked_by_model[key]
+
+        # Capacity only shrinks in a batch, so exhausted offers at the head of the
+        # price order are skipped once per model instead of once per job.
+        start = cursor_by_model[key]
+        while start < len(ranked) and residual[ranked[start]] <= 0:
+            start += 1
+        cursor_by_model[key] = start
+
+        r_max = params[j]["r_max"]
+        remaining = params[j]["required_gpus"]
+        allocs = []
+        # Offers within r_max first, then the same fallback as run_geo_nap.
+        for within_rtt in (True, False):
+            for pos in range(start, len(ranked)):
+                if remaining <= 0:
+                    break
+                i = ranked[pos]
+                if residual[i] <= 0 or (enriched[i].rtt <= r_max) != within_rtt:
+                    continue
+                alloc = min(residual[i], remaining)
+                residual[i] -= alloc
+                remaining -= alloc
+                allocs.append((i, alloc))
+        allocations[j] = allocs
+
+    return allocations
+
+def _milp_allocations(jobs, params, order, enriched, index, residual):
+    max_price = max((p.price for p in enriched), default=0.0)
+    spill_penalty = 10.0 * (max_price + 1.0)
+
+    demand = {}
+    candidates = {}
+    unit_cost = {}
+    penalty = {}
+    positions_by_model = {}
+    for rank, j in enumerate(order):
+        key = _model_key(jobs[j].get("gpu_model"))
+        if key not in positions_by_model:
+            positions_by_model[key] = model_positions(enriched, index, key)
+        r_max = params[j]["r_max"]
+
+        demand[j] = params[j]["required_gpus"]
+        candidates[j] = positions_by_model[key]
+        for i in candidates[j]:
+            p = enriched[i]
+            unit_cost[(j, i)] = p.price + (spill_penalty if p.rtt > r_max else 0.0)
+        # Leaving GPUs unplaced costs more than any spill, more so for higher priority.
+        penalty[j] = 10.0 * spill_penalty * (1.0 + (len(order) - rank) / max(1, len(order)))
+
+    capacity = {i: residual[i] for i in range(len(enriched))}
+    allocation, _ = solve_batch_placement(demand, candidates, unit_cost, capacity, penalty)
+
+    allocations = {j: [] for j in order}
+    for (j, i), gpus in sorted(allocation.items(), key=lambda kv: index["rank"][kv[0][1]]):
+        residual[i] -= gpus
+        allocations[j].append((i, gpus))
+    return allocations
+
+def plan_batch(jobs, providers=None, solver="greedy"):
+    # Place several jobs against shared per-offer capacity.
+    # Each job is a dict of run_geo_nap arguments plus optional "id" and "priority"
+    # (higher goes first). Returns per-job placements and the residual capacity.
+    enriched = load_offers(providers)
+    index = build_model_index(enriched)
+    residual = [p.capacity for p in enriched]
+
+    params = [_job_params(spec) for spec in jobs]
+    order = sorted(range(len(jobs)), key=lambda j: -to_float(jobs[j].get("priority"), 0.0))
+
+    if solver == "milp":
+        allocations = _milp_allocations(jobs, params, order, enriched, index, residual)
+    elif solver == "greedy":
+        allocations = _greedy_allocations(jobs, params, order, enriched, index, residual)
+    else:
+        raise ValueError(f"Unknown batch solver: {solver}")
+
+    results = []
+    total_cost = 0.0
+    for j, spec in enumerate(jobs):
+        placement = {}
+        for i, alloc in allocations[j]:
+            name = enriched[i].name
+            placement[name] = placement.get(name, 0) + alloc
+
+        r_max = params[j]["r_max"]
+        positions = model_positions(enriched, index, spec.get("gpu_model"))
+        forbidden = [enriched[i].name for i in positions if enriched[i].rtt > r_max]
+
+        cost, breakdown = evaluate_placement(
+            [enriched[i] for i in positions],
+            placement,
+            params[j],
+            spec.get("data_source_provider"),
+            spec.get("egress_overrides") or {},
+            spec.get("topology", "ring"),
+        )
+        total_cost += cost
+        results.append({
+            "id": spec.get("id", j),
+            "priority": to_float(spec.get("priority"), 0.0),
+            "placement": placement,
+            "unplaced_gpus": params[j]["required_gpus"] - sum(placement.values()),
+            "total_cost": cost,
+            "forbidden": forbidden,
+            "breakdown": breakdown,
+        })
+
+    residual_capacity = {}
+    for i, p in enumerate(enriched):
+        residual_capacity[p.name] = residual_capacity.get(p.name, 0) + residual[i]
+
+    return {
+        "jobs": results,
+        "residual_capacity": residual_capacity,
+        "total_cost": total_cost,
+    }
@@ -1,30 +1,73 @@
 from pulp import *
 
+from timing import start
+
+
 def solve_geo_nap(providers, gpu_price, egress_price,
                   required_gpus, forbidden,
-                  model_size_gb, steps, capacity):
+                  model_size_gb, steps, capacity, spans=None):
+    # Stage timings go into the caller's spans, or to the timing sinks when
+    # timing is enabled and no spans are passed.
+    own_spans = spans is None
+    if own_spans:
+        spans = start("solve_geo_nap")
 
-    model = LpProblem("GeoNAP", LpMinimize)
+    with spans("milp.build"):
+        model = LpProblem("GeoNAP", LpMinimize)
 
-    x = LpVariable.dicts("GPUs", providers, lowBound=0, cat="Integer")
+        x = LpVariable.dicts("GPUs", providers, lowBound=0, cat="Integer")
 
-    compute = lpSum(x[p] * gpu_price[p] for p in providers)
-    network = lpSum(x[p] * model_size_gb * steps * egress_price[p]
-                    for p in providers)
+        compute = lpSum(x[p] * gpu_price[p] for p in providers)
+        network = lpSum(x[p] * model_size_gb * steps * egress_price[p]
+                        for p in providers)
 
-    model += compute + network
-    model += lpSum(x[p] for p in providers) == required_gpus
+        model += compute + network
+        model += lpSum(x[p] for p in providers) == required_gpus
 
-    # Forbidden providers
-    for p in forbidden:
-        model += x[p] == 0
+        # Forbidden providers
+        for p in forbidden:
+            model += x[p] == 0
 
-    # Capacity constraints
-    for p in providers:
-        model += x[p] <= capacity[p]
+        # Capacity constraints
+        for p in providers:
+            model += x[p] <= capacity[p]
 
-    model.solve()
+    with spans("milp.solve"):
+        model.solve()
 
     placement = {p: int(x[p].value()) for p in providers}
+    if own_spans:
+        spans.finish()
     return placement, value(model.objective)
-    
\ No newline at end of file
+
+def solve_batch_placement(demand, candidates, unit_cost, capacity, unplaced_penalty):
+    # demand: {job: gpus}, candidates: {job: [offer, ...]},
+    # unit_cost: {(job, offer): cost per GPU}, capacity: {offer: gpus shared by all jobs}
+    model = LpProblem("GeoNAPBatch", LpMinimize)
+
+    pairs = [(j, o) for j in demand for o in candidates[j]]
+    x = LpVariable.dicts("GPUs", pairs, lowBound=0, cat="Integer")
+    unplaced = LpVariable.dicts("Unplaced", list(demand), lowBound=0, cat="Integer")
+
+    model += (lpSum(x[k] * unit_cost[k] for k in pairs)
+              + lpSum(unplaced[j] * unplaced_penalty[j] for j in demand))
+
+    # Every job is either placed or explicitly left short
+    for j in demand:
+        model += lpSum(x[(j, o)] for o in candidates[j]) + unplaced[j] == demand[j]
+
+    # Shared capacity constraints
+    by_offer = {}
+    for j, o in pairs:
+        by_offer.setdefault(o, []).append(x[(j, o)])
+    for o, used in by_offer.items():
+        model += lpSum(used) <= capacity[o]
+
+    model.solve(PULP_CBC_CMD(msg=False))
+
+    allocation = {}
+    for k in pairs:
+        gpus = int(round(x[k].value() or 0))
+        if gpus > 0:
+            allocation[k] = gpus
+    return allocation, value(model.objective)
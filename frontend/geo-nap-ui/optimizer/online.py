@@ -0,0 +1,247 @@
+# optimizer/online.py
+import heapq
+from bisect import bisect_left, insort
+
+from engine import load_offers, to_float, to_int
+from offer import validate_row
+
+# Catalog diffs larger than this share of the offers rebuild the free lists.
+REBUILD_DIVISOR = 64
+REBUILD_MIN_CHANGES = 256
+# Free lists are split into RTT bands by upper edge (ms, inclusive): 1 ms wide
+# where r_max limits usually sit, coarser beyond. Only a band that r_max cuts
+# through is filtered offer by offer.
+RTT_BAND_EDGES = tuple(range(1, 50)) + tuple(range(50, 200, 5)) + tuple(range(200, 500, 25))
+
+
+def _offer_keys(enriched):
+    # (provider, region, gpu, n): n tells apart repeated rows of the same SKU.
+    seen = {}
+    keys = []
+    for p in enriched:
+        base = (p.provider, p.region, p.gpu)
+        n = seen.get(base, 0)
+        seen[base] = n + 1
+        keys.append(base + (n,))
+    return keys
+
+
+def _rtt_band(rtt):
+    return bisect_left(RTT_BAND_EDGES, rtt)
+
+
+class OnlinePlacer:
+    # Keeps residual capacity per offer in price-sorted free lists (per RTT band,
+    # for each GPU name plus "Any"), so a placement only walks the cheapest
+    # offers on the right side of r_max and releases/price changes touch just
+    # the affected entries.
+
+    def __init__(self, providers=None):
+        self._offers = []
+        self._residual = []
+        self._retired = []
+        self._index_by_key = {}
+        self._free_any = {}
+        self._free_by_gpu = {}
+        self._filter_cache = {}
+        self._jobs = {}
+        self.apply_catalog(providers)
+
+    # -----------------------------
+    # Free-list maintenance
+    # -----------------------------
+    def _free_lists(self, i):
+        offer = self._offers[i]
+        gpu = str(offer.gpu).lower()
+        if gpu not in self._free_by_gpu:
+            self._free_by_gpu[gpu] = {}
+            self._filter_cache.clear()
+        band = _rtt_band(offer.rtt)
+        return (self._free_any.setdefault(band, []), self._free_by_gpu[gpu].setdefault(band, []))
+
+    def _is_free(self, i):
+        return self._residual[i] > 0 and not self._retired[i]
+
+    def _insert_free(self, i):
+        entry = (self._offers[i].price, i)
+        for free in self._free_lists(i):
+            insort(free, entry)
+
+    def _remove_free(self, i):
+        entry = (self._offers[i].price, i)
+        for free in self._free_lists(i):
+            pos = bisect_left(free, entry)
+            if pos < len(free) and free[pos] == entry:
+                del free[pos]
+
+    def _band_lists(self, gpu_model):
+        model_filter = (gpu_model or "").strip().lower()
+        if not model_filter or model_filter == "any":
+            return [self._free_any]
+        names = self._filter_cache.get(model_filter)
+        if names is None:
+            # Same substring rule as run_geo_nap, resolved once per filter.
+            names = [g for g in self._free_by_gpu if model_filter in g]
+            self._filter_cache[model_filter] = names
+        return [self._free_by_gpu[g] for g in names]
+
+    def _candidates(self, gpu_model, r_max, within_rtt):
+        # Price-ordered (price, i) entries with rtt <= r_max (or > r_max). Bands
+        # below the one holding r_max are all within, bands above all outside.
+        split = _rtt_band(r_max)
+        mixed = split == len(RTT_BAND_EDGES) or RTT_BAND_EDGES[split] != r_max
+        lists = []
+        for bands in self._band_lists(gpu_model):
+            for band, free in bands.items():
+                if band == split and mixed:
+                    free = (e for e in free if (self._offers[e[1]].rtt <= r_max) == within_rtt)
+                elif not free or (band <= split) != within_rtt:
+                    continue
+                lists.append(free)
+        return iter(lists[0]) if len(lists) == 1 else heapq.merge(*lists)
+
+    # -----------------------------
+    # Catalog updates
+    # -----------------------------
+    def _rebuild_free(self):
+        self._free_any = {}
+        self._free_by_gpu = {}
+        self._filter_cache.clear()
+        for i, offer in enumerate(self._offers):
+            if self._is_free(i):
+                entry = (offer.price, i)
+                band = _rtt_band(offer.rtt)
+                self._free_any.setdefault(band, []).append(entry)
+                self._free_by_gpu.setdefault(str(offer.gpu).lower(), {}).setdefault(band, []).append(entry)
+        for bands in (self._free_any, *self._free_by_gpu.values()):
+            for free in bands.values():
+                free.sort()
+
+    def apply_catalog(self, providers=None):
+        # Diff against the current catalog: changed offers are re-keyed, new offers
+        # are added and missing offers are retired (running jobs keep their GPUs
+        # until release). Small diffs patch the free lists in place; large ones
+        # rebuild them with one sort.
+        enriched = load_offers(providers)
+        keys = _offer_keys(enriched)
+        present = set(keys)
+
+        changes = []
+        for key, offer in zip(keys, enriched):
+            i = self._index_by_key.get(key)
+            if i is None or self._retired[i] or self._offers[i] != offer:
+                changes.append((key, i, offer))
+        retired = [
+            i for key, i in self._index_by_key.items()
+            if key not in present and not self._retired[i]
+        ]
+        incremental = len(changes) + len(retired) <= max(REBUILD_MIN_CHANGES, len(self._offers) // REBUILD_DIVISOR)
+
+        for key, i, offer in changes:
+            if i is None:
+                i = len(self._offers)
+                self._index_by_key[key] = i
+                self._offers.append(offer)
+                self._residual.append(offer.capacity)
+                self._retired.append(False)
+            else:
+                if incremental and self._is_free(i):
+                    self._remove_free(i)
+                used = self._offers[i].capacity - self._residual[i]
+                self._offers[i] = offer
+                self._residual[i] = max(0, offer.capacity - used)
+                self._retired[i] = False
+            if incremental and self._residual[i] > 0:
+                self._insert_free(i)
+
+        for i in retired:
+            if incremental and self._is_free(i):
+                self._remove_free(i)
+            self._retired[i] = True
+
+        if not incremental:
+            self._rebuild_free()
+
+    def update_price(self, provider, region, gpu, price, n=0):
+        i = self._index_by_key.get((provider, region, gpu, n))
+        if i is None:
+            raise KeyError(f"Unknown offer: {provider}/{region}/{gpu}")
+        # Same rules as catalog rows; a bad price is rejected, not read as free.
+        raw, reason = validate_row({
+            "provider": provider,
+            "region": region,
+            "gpu": gpu,
+            "price": price,
+            "rtt": self._offers[i].rtt,
+            "bandwidth": self._offers[i].bandwidth,
+            "capacity": self._offers[i].capacity,
+        })
+        if raw is None:
+            raise ValueError(f"Invalid price update for {provider}/{region}/{gpu}: {reason}")
+        offer = load_offers([raw])[0]
+        if self._is_free(i):
+            self._remove_free(i)
+            self._offers[i] = offer
+            self._insert_free(i)
+        else:
+            self._offers[i] = offer
+
+    # -----------------------------
+    # Placement
+    # -----------------------------
+    def place(self, job_id, required_gpus, r_max=20.0, gpu_model="Any"):
+        if job_id in self._jobs:
+            raise ValueError(f"Job already placed: {job_id}")
+        remaining = max(1, to_int(required_gpus, 1))
+        r_max = to_float(r_max, 20.0)
+
+        # Cheapest offers within r_max first, then the run_geo_nap fallback.
+        allocs = []
+        for within_rtt in (True, False):
+            if remaining <= 0:
+                break
+            for _, i in self._candidates(gpu_model, r_max, within_rtt):
+                alloc = min(self._residual[i], remaining)
+                allocs.append((i, alloc))
+                remaining -= alloc
+                if remaining <= 0:
+                    break
+
+        placement = {}
+        hourly_rate = 0.0
+        for i, alloc in allocs:
+            self._residual[i] -= alloc
+            if self._residual[i] <= 0:
+                self._remove_free(i)
+            name = self._offers[i].name
+            placement[name] = placement.get(name, 0) + alloc
+            hourly_rate += alloc * self._offers[i].price
+
+        self._jobs[job_id] = allocs
+        return {
+            "job_id": job_id,
+            "placement": placement,
+            "unplaced_gpus": remaining,
+            "hourly_rate": hourly_rate,
+        }
+
+    def release(self, job_id):
+        allocs = self._jobs.pop(job_id, None)
+        if allocs is None:
+            return False
+        for i, alloc in allocs:
+            was_empty = self._residual[i] <= 0
+            self._residual[i] = min(self._offers[i].capacity, self._residual[i] + alloc)
+            if was_empty and self._is_free(i):
+                self._insert_free(i)
+        return True
+
+    def residual_capacity(self):
+        residual = {}
+        for i, offer in enumerate(self._offers):
+            if not self._retired[i]:
+                residual[offer.name] = residual.get(offer.name, 0) + self._residual[i]
+        return residual
+
+    def active_jobs(self):
+        return list(self._jobs)
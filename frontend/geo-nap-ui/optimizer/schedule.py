@@ -0,0 +1,178 @@
+# optimizer/schedule.py
+import math
+import time
+
+import numpy as np
+
+from engine import default_capacity, greedy_fill, load_offers, to_float, to_int
+from live.price_history import load_range
+from offer import offer_name
+
+SLOT_SECONDS = 3600
+LOOKBACK_DAYS = 7
+
+
+def _price_profiles(columns, slot_seconds):
+    # Expected price per offer for each slot of the day, averaged over the lookback.
+    slots_per_day = max(1, 86400 // slot_seconds)
+    keys = np.char.add(np.char.add(np.char.add(columns["provider"], "\x1f"), columns["region"]),
+                       np.char.add("\x1f", columns["gpu"]))
+    offer_keys, offer_idx = np.unique(keys, return_inverse=True)
+    slot_idx = (columns["ts"] // slot_seconds) % slots_per_day
+
+    cell = offer_idx * slots_per_day + slot_idx
+    weights = columns["samples"].astype(np.float64)
+    size = len(offer_keys) * slots_per_day
+    sums = np.bincount(cell, weights=columns["price"].astype(np.float64) * weights, minlength=size)
+    counts = np.bincount(cell, weights=weights, minlength=size)
+    sums = sums.reshape(len(offer_keys), slots_per_day)
+    counts = counts.reshape(len(offer_keys), slots_per_day)
+
+    # Slots never observed fall back to the offer's overall mean.
+    overall = sums.sum(axis=1) / np.maximum(counts.sum(axis=1), 1e-12)
+    profile = np.where(counts > 0, sums / np.maximum(counts, 1e-12), overall[:, None])
+    return [k.split("\x1f") for k in offer_keys], profile
+
+
+def _window_costs(profile, first_slot, n_starts, run_slots, last_slot_used):
+    # Cost of a run of run_slots slots for every start slot, via one cumsum:
+    # windows[o, s] = sum(price[o, first_slot + s : first_slot + s + run_slots]).
+    slots_per_day = profile.shape[1]
+    span = n_starts + run_slots
+    timeline = profile[:, (first_slot + np.arange(span)) % slots_per_day]
+    csum = np.concatenate([np.zeros((len(profile), 1)), np.cumsum(timeline, axis=1)], axis=1)
+    starts = np.arange(n_starts)
+    full = csum[:, starts + run_slots] - csum[:, starts]
+    # The final slot is usually only partly used.
+    unused = timeline[:, starts + run_slots - 1] * (1.0 - last_slot_used)
+    return full - unused
+
+
+def _cost_from(profile, start_ts, run_hours, slot_seconds):
+    # Cost per GPU of a run starting at start_ts, which may fall mid-slot: each
+    # slot's price weighted by the hours of it the run covers.
+    slots_per_day = profile.shape[1]
+    end_ts = start_ts + run_hours * 3600.0
+    slots = np.arange(math.floor(start_ts / slot_seconds), math.ceil(end_ts / slot_seconds))
+    covered = np.minimum((slots + 1) * slot_seconds, end_ts) - np.maximum(slots * slot_seconds, start_ts)
+    return profile[:, slots % slots_per_day] @ (np.maximum(covered, 0.0) / 3600.0)
+
+
+class _SlotOffer:
+    # What the engine's greedy fill reads from an offer, named by its row so the
+    # resulting placement prices per offer.
+    __slots__ = ("name", "capacity")
+
+    def __init__(self, name, capacity):
+        self.name = name
+        self.capacity = capacity
+
+
+def _fill(rows, per_gpu, capacity, required_gpus):
+    # Cheapest-first fill of required_gpus over rows for one start, up to each
+    # offer's capacity; returns ({row: gpus}, cost, unplaced gpus).
+    order = rows[np.argsort(per_gpu[rows], kind="stable")]
+    placement = {}
+    unplaced = greedy_fill([_SlotOffer(int(i), int(capacity[i])) for i in order], placement, required_gpus)
+    cost = float(sum(per_gpu[i] * gpus for i, gpus in placement.items()))
+    return placement, cost, unplaced
+
+
+def plan_start_times(
+    required_gpus,
+    run_hours,
+    gpu_model="Any",
+    r_max=None,
+    horizon_hours=24,
+    lookback_days=LOOKBACK_DAYS,
+    slot_seconds=SLOT_SECONDS,
+    providers=None,
+    now=None,
+):
+    # Evaluate every (start, offer) pair over the horizon using daily price
+    # profiles from the recorded history and recommend when and where to launch.
+    # Starts are now and each slot boundary in the horizon. Each region's cost
+    # for a start fills required_gpus across its offers up to capacity, cheapest
+    # first.
+    required_gpus = max(1, to_int(required_gpus, 1))
+    run_hours = max(to_float(run_hours, 1.0), 1e-6)
+    slot_seconds = max(60, to_int(slot_seconds, SLOT_SECONDS))
+    now = time.time() if now is None else now
+
+    columns = load_range(now - lookback_days * 86400, now)
+    model_filter = (gpu_model or "").strip().lower()
+    if model_filter and model_filter != "any" and len(columns["gpu"]):
+        mask = np.char.find(np.char.lower(columns["gpu"]), model_filter) >= 0
+        columns = {k: v[mask] for k, v in columns.items()}
+    if not len(columns["price"]):
+        return {"recommendation": None, "by_region": [], "starts_evaluated": 0}
+
+    offer_keys, profile = _price_profiles(columns, slot_seconds)
+
+    # Current catalog supplies RTT and the network penalty missing from history.
+    # Offers sharing (provider, region, gpu) pool their capacity; offers gone from
+    # the catalog get the engine's default.
+    current = {}
+    for offer in load_offers(providers):
+        key = (offer.provider, offer.region, offer.gpu)
+        ratio = offer.price / offer.base_price if offer.base_price else 1.0
+        capacity = current[key][2] if key in current else 0
+        current[key] = (offer.rtt, ratio, capacity + offer.capacity)
+    keep = []
+    penalty = np.ones(len(offer_keys))
+    capacity = np.zeros(len(offer_keys), dtype=np.int64)
+    for i, key in enumerate(offer_keys):
+        rtt, ratio, cap = current.get(tuple(key), (None, 1.0, default_capacity(offer_name(key[0], key[1]))))
+        if r_max is not None and (rtt is None or rtt > to_float(r_max, 20.0)):
+            continue
+        penalty[i] = ratio
+        capacity[i] = cap
+        keep.append(i)
+    if not keep:
+        return {"recommendation": None, "by_region": [], "starts_evaluated": 0}
+    offer_keys = [offer_keys[i] for i in keep]
+    profile = profile[keep] * penalty[keep, None]
+    capacity = capacity[keep]
+
+    slot_hours = slot_seconds / 3600.0
+    run_slots = max(1, math.ceil(run_hours / slot_hours))
+    last_slot_used = run_hours / slot_hours - (run_slots - 1)
+    n_starts = max(1, int(to_float(horizon_hours, 24) / slot_hours) + 1)
+    # The earliest start is the next slot boundary; the current slot has begun.
+    first_slot = math.ceil(now / slot_seconds)
+
+    per_gpu = _window_costs(profile, first_slot, n_starts, run_slots, last_slot_used) * slot_hours
+    per_gpu_now = _cost_from(profile, now, run_hours, slot_seconds)
+
+    # Capacity-aware fill per region for every start, then the best start per region.
+    regions = np.array([offer_name(k[0], k[1]) for k in offer_keys])
+    region_names, region_idx = np.unique(regions, return_inverse=True)
+    by_region = []
+    for r, region in enumerate(region_names):
+        rows = np.flatnonzero(region_idx == r)
+        fills = [_fill(rows, per_gpu[:, s], capacity, required_gpus) for s in range(n_starts)]
+        best_start = min(range(n_starts), key=lambda s: fills[s][1])
+        now_fill = _fill(rows, per_gpu_now, capacity, required_gpus)
+        now_cost = now_fill[1]
+        if now_cost <= fills[best_start][1]:
+            start_ts, (placement, best_cost, unplaced) = now, now_fill
+        else:
+            start_ts, (placement, best_cost, unplaced) = (first_slot + best_start) * slot_seconds, fills[best_start]
+        by_region.append({
+            "provider": str(region),
+            "gpu": ", ".join(sorted({offer_keys[i][2] for i in placement})),
+            "gpus_by_model": {offer_keys[i][2]: gpus for i, gpus in placement.items()},
+            "unplaced_gpus": unplaced,
+            "start_ts": start_ts,
+            "expected_cost": best_cost,
+            "cost_if_now": now_cost,
+            "savings": now_cost - best_cost,
+        })
+    # Regions that hold the whole job first.
+    by_region.sort(key=lambda r: (r["unplaced_gpus"], r["expected_cost"]))
+
+    return {
+        "recommendation": by_region[0],
+        "by_region": by_region,
+        "starts_evaluated": int(per_gpu.size + per_gpu_now.size),
+    }
@@ -0,0 +1,109 @@
+# optimizer/test_online.py
+import random
+
+import pytest
+
+from engine import load_offers
+from optimizer.online import OnlinePlacer
+
+
+def _row(provider, region, gpu, price, capacity, rtt=5.0):
+    return {"provider": provider, "region": region, "gpu": gpu, "price": price,
+            "rtt": rtt, "bandwidth": 10.0, "capacity": capacity}
+
+
+ROWS = [
+    _row("vast", "Texas, US", "RTX 4090", 0.30, 4),
+    _row("vast", "Texas, US", "RTX 4090", 0.35, 4),
+    _row("aws", "us-east-1", "H100", 4.00, 8),
+    _row("gcp", "asia-east1", "H100", 3.00, 8, rtt=200.0),
+]
+
+
+def test_place_fills_cheapest_first_and_sums_same_name_offers():
+    placer = OnlinePlacer(ROWS)
+    result = placer.place("a", 10)
+    assert result["placement"] == {"vast_Texas, US": 8, "aws_us-east-1": 2}
+    assert result["unplaced_gpus"] == 0
+    assert placer.residual_capacity()["vast_Texas, US"] == 0
+
+
+def test_rtt_limit_falls_back_only_when_needed():
+    placer = OnlinePlacer(ROWS)
+    within = placer.place("near", 4, r_max=20, gpu_model="H100")
+    assert within["placement"] == {"aws_us-east-1": 4}
+    spill = placer.place("spill", 8, r_max=20, gpu_model="H100")
+    assert spill["placement"] == {"aws_us-east-1": 4, "gcp_asia-east1": 4}
+
+
+def test_release_returns_capacity():
+    placer = OnlinePlacer(ROWS)
+    before = placer.residual_capacity()
+    placer.place("a", 12)
+    assert placer.release("a")
+    assert not placer.release("a")
+    assert placer.residual_capacity() == before
+    assert placer.place("b", 8)["placement"] == {"vast_Texas, US": 8}
+
+
+def test_duplicate_job_is_rejected():
+    placer = OnlinePlacer(ROWS)
+    placer.place("a", 1)
+    with pytest.raises(ValueError):
+        placer.place("a", 1)
+
+
+def test_update_price_reorders_offers():
+    placer = OnlinePlacer(ROWS)
+    placer.update_price("aws", "us-east-1", "H100", "0.10")
+    assert placer.place("a", 2)["placement"] == {"aws_us-east-1": 2}
+
+
+@pytest.mark.parametrize("price", [0, -1.0, "abc", None, float("nan"), True])
+def test_update_price_rejects_invalid_prices(price):
+    placer = OnlinePlacer(ROWS)
+    with pytest.raises(ValueError):
+        placer.update_price("aws", "us-east-1", "H100", price)
+    # The offer keeps its price, so it is not suddenly the cheapest.
+    assert placer.place("a", 2)["placement"] == {"vast_Texas, US": 2}
+
+
+def test_update_price_unknown_offer():
+    with pytest.raises(KeyError):
+        OnlinePlacer(ROWS).update_price("aws", "nowhere", "H100", 1.0)
+
+
+def test_apply_catalog_retires_missing_offers_and_keeps_running_jobs():
+    placer = OnlinePlacer(ROWS)
+    placer.place("a", 8)
+    placer.apply_catalog(ROWS[2:])
+    assert "vast_Texas, US" not in placer.residual_capacity()
+    assert placer.place("b", 2)["placement"] == {"aws_us-east-1": 2}
+    assert placer.release("a")
+
+
+@pytest.mark.parametrize("r_max", [0.5, 20, 22.5, 47, 180, 1000])
+def test_rtt_bands_match_a_full_scan(r_max):
+    rng = random.Random(5)
+    rows = [
+        _row("p", f"r{i}", rng.choice(["H100", "A100"]), round(rng.uniform(0.5, 5.0), 2),
+             rng.randint(1, 4), rtt=rng.choice([rng.uniform(0, 600), float(rng.randint(1, 60))]))
+        for i in range(400)
+    ]
+    placer = OnlinePlacer(rows)
+    # Effective prices, as the placer ranks them.
+    offers = sorted(load_offers(rows), key=lambda p: p.price)
+    for n, (required, model) in enumerate([(30, "H100"), (60, "Any"), (500, "A100")]):
+        eligible = [p for p in offers if model == "Any" or p.gpu == model]
+        order = [p for p in eligible if p.rtt <= r_max] + [p for p in eligible if p.rtt > r_max]
+        expected, remaining = {}, required
+        for p in order:
+            if remaining <= 0:
+                break
+            alloc = min(p.capacity, remaining)
+            expected[p.name] = alloc
+            remaining -= alloc
+        result = placer.place(n, required, r_max=r_max, gpu_model=model)
+        assert result["placement"] == expected
+        assert result["unplaced_gpus"] == remaining
+        placer.release(n)
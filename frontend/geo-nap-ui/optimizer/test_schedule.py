@@ -0,0 +1,42 @@
+# optimizer/test_schedule.py
+import pytest
+
+from engine import load_offers
+from live import price_history
+from optimizer import schedule
+
+DAY = 86400
+HOUR = 3600
+T0 = 1_790_000_000 - 1_790_000_000 % DAY
+ROW = {"provider": "aws", "region": "us-east-1", "gpu": "H100", "price": 4.0, "rtt": 5, "bandwidth": 10, "capacity": 8}
+
+
+@pytest.fixture
+def history(tmp_path, monkeypatch):
+    # Yesterday: $4/h until noon, $1/h after.
+    for hour in range(24):
+        price = 4.0 if hour < 12 else 1.0
+        price_history.append_snapshot([dict(ROW, price=price)], T0 - DAY + hour * HOUR, tmp_path)
+    monkeypatch.setattr(schedule, "load_range", lambda start, end: price_history.load_range(start, end, tmp_path))
+    offer = load_offers([ROW])[0]
+    return offer.price / offer.base_price
+
+
+def _plan(now, run_hours=1.0):
+    return schedule.plan_start_times(2, run_hours, providers=[ROW], horizon_hours=6, now=now)["recommendation"]
+
+
+def test_cost_if_now_prices_a_start_mid_slot(history):
+    best = _plan(T0 + 11.5 * HOUR)
+    # Half an hour at $4 and half at $1, for 2 GPUs.
+    assert best["cost_if_now"] == pytest.approx(2 * 2.5 * history)
+    assert best["start_ts"] == T0 + 12 * HOUR
+    assert best["expected_cost"] == pytest.approx(2 * 1.0 * history)
+    assert best["savings"] == pytest.approx(best["cost_if_now"] - best["expected_cost"])
+
+
+def test_starting_now_wins_ties(history):
+    now = T0 + 12.5 * HOUR
+    best = _plan(now)
+    assert best["start_ts"] == now
+    assert best["savings"] == 0
@@ -0,0 +1,163 @@
+# shared_catalog.py
+import math
+from collections.abc import Sequence
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import catalog
+
+# Columnar copy of one catalog version in shared memory. The owner process
+# calls share_catalog() and hands the small, picklable handle to workers,
+# which attach_catalog()/install() it instead of re-reading or unpickling
+# the offer list.
+
+HEADER_BYTES = 64
+MAGIC = b"GEONAPC1"
+NUMERIC_COLUMNS = (
+    ("price", np.float64),
+    ("rtt", np.float64),
+    ("bandwidth", np.float64),
+    ("capacity", np.int64),
+    ("fetched_at", np.float64),
+    ("rtt_default", np.int64),
+)
+STRING_COLUMNS = ("provider", "region", "gpu")
+
+# Segments created by this process, by version: (SharedMemory, handle).
+_owned = {}
+
+
+def _header(version):
+    encoded = version.encode("ascii")
+    if len(encoded) > HEADER_BYTES - len(MAGIC):
+        raise ValueError(f"Catalog version too long for shared header: {version}")
+    return (MAGIC + encoded).ljust(HEADER_BYTES, b"\0")
+
+
+def _column_arrays(offers):
+    arrays = {}
+    for column, dtype in NUMERIC_COLUMNS:
+        missing = 0 if dtype is np.int64 else math.nan
+        values = []
+        for offer in offers:
+            value = offer.get(column)
+            values.append(missing if value is None else value)
+        arrays[column] = np.asarray(values, dtype=dtype)
+
+    tables = {}
+    for column in STRING_COLUMNS:
+        codes = {}
+        arrays[column] = np.fromiter(
+            (codes.setdefault(str(offer.get(column, "")), len(codes)) for offer in offers),
+            dtype=np.int32,
+            count=len(offers),
+        )
+        tables[column] = list(codes)
+    return arrays, tables
+
+
+def share_catalog(version=None, keep=catalog.MEMORY_VERSIONS):
+    # Returns a handle for `version` (default: current), creating the segment once.
+    version, offers = catalog.load_catalog(version)
+    if version == catalog.LEGACY_VERSION:
+        # providers.json is rewritten in place, so a shared copy of it could go
+        # stale without any version change; workers get a published snapshot.
+        version, offers = catalog.load_catalog(catalog.publish_catalog(offers))
+    if version in _owned:
+        return _owned[version][1]
+
+    arrays, tables = _column_arrays(offers)
+    layout = {}
+    offset = HEADER_BYTES
+    for column, array in arrays.items():
+        offset = -(-offset // 8) * 8
+        layout[column] = (offset, array.dtype.str)
+        offset += array.nbytes
+
+    shm = shared_memory.SharedMemory(create=True, size=max(offset, HEADER_BYTES))
+    shm.buf[:HEADER_BYTES] = _header(version)
+    for column, array in arrays.items():
+        start, dtype = layout[column]
+        np.ndarray(len(array), dtype=dtype, buffer=shm.buf, offset=start)[:] = array
+
+    handle = {
+        "shm_name": shm.name,
+        "version": version,
+        "length": len(offers),
+        "layout": layout,
+        "strings": tables,
+    }
+    _owned[version] = (shm, handle)
+    while len(_owned) > max(keep, 1):
+        release(next(iter(_owned)))
+    return handle
+
+
+def release(version):
+    # Unlink a segment this process created. Attached workers keep their mapping
+    # until they close it.
+    shm, _ = _owned.pop(version)
+    shm.close()
+    shm.unlink()
+
+
+def release_all():
+    for version in list(_owned):
+        release(version)
+
+
+class SharedCatalog(Sequence):
+    # Read-only offer view over a shared segment. Columns are zero-copy numpy
+    # views; rows are rebuilt as plain dicts only when indexed.
+
+    def __init__(self, handle):
+        self._shm = shared_memory.SharedMemory(name=handle["shm_name"])
+        if bytes(self._shm.buf[:HEADER_BYTES]) != _header(handle["version"]):
+            self._shm.close()
+            raise ValueError(f"Shared catalog {handle['shm_name']} no longer holds version {handle['version']}")
+        self.version = handle["version"]
+        self.strings = handle["strings"]
+        self._length = handle["length"]
+        self.columns = {}
+        for column, (offset, dtype) in handle["layout"].items():
+            view = np.ndarray(self._length, dtype=dtype, buffer=self._shm.buf, offset=offset)
+            view.flags.writeable = False
+            self.columns[column] = view
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(self._length))]
+        if idx < 0:
+            idx += self._length
+        if not 0 <= idx < self._length:
+            raise IndexError(idx)
+        row = {column: self.strings[column][self.columns[column][idx]] for column in STRING_COLUMNS}
+        for column, dtype in NUMERIC_COLUMNS:
+            value = self.columns[column][idx].item()
+            # Only fetched_at is optional in a validated row; it was stored as NaN.
+            if dtype is np.int64 or not math.isnan(value):
+                row[column] = value
+        return row
+
+    def is_current(self):
+        return self.version == catalog.current_version()
+
+    def close(self):
+        self.columns = {}
+        self._shm.close()
+
+
+def attach_catalog(handle):
+    return SharedCatalog(handle)
+
+
+def install(handle):
+    # Worker initializer: attach and register the view under its version so
+    # load_catalog(version) and the engine read from shared memory.
+    shared = attach_catalog(handle)
+    catalog.register_loaded(shared.version, shared)
+    return shared
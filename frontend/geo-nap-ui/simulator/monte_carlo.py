@@ -1,4 +1,6 @@
 import numpy as np
 
-def monte_carlo_samples(mean, runs=500):
-    return np.random.normal(mean, mean*0.2, runs)
+def monte_carlo_samples(mean, runs=500, rng=None):
+    # rng: a numpy Generator; the global RandomState when None.
+    rng = np.random if rng is None else rng
+    return rng.normal(mean, mean*0.2, runs)
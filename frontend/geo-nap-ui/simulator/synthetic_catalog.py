@@ -0,0 +1,274 @@
+import argparse
+import csv
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT_DIR))
+
+from models.geo import RttEstimator, haversine_km, load_region_coords, locate  # noqa: E402
+from offer import offer_name  # noqa: E402
+
+# Seeded provider catalogs in the discovery row schema (provider, region, gpu,
+# price, bandwidth, fetched_at) plus site-pair RTT/bandwidth matrices in the
+# data/rtt.csv and data/bandwidth.csv layout. Rows are produced in chunks and
+# written as they are made, so catalog size is bounded by disk, not memory.
+
+CHUNK_ROWS = 65_536
+
+# List $/GPU-hour per model before provider markup and noise.
+GPU_BASE_PRICE = {
+    "H200": 3.8,
+    "H100": 2.9,
+    "A100": 1.7,
+    "L40S": 1.1,
+    "A10G": 0.9,
+    "A10": 0.8,
+    "L4": 0.6,
+    "RTX PRO 6000": 1.2,
+    "RTX 5090": 0.7,
+    "RTX A6000": 0.5,
+    "RTX 4090": 0.45,
+    "RTX 3090": 0.22,
+}
+
+# share: fraction of rows; table: region_coords.csv prefix the regions come
+# from ("geo" becomes "Place, CC"); skus: (gpu field as discovery reports it,
+# model for pricing); sigma: lognormal price spread; bandwidth: (median, sigma).
+PROVIDERS = {
+    "vast": {
+        "share": 0.45,
+        "table": "geo",
+        "markup": 0.75,
+        "sigma": 0.35,
+        "bandwidth": (800.0, 0.8),
+        "skus": [(m, m) for m in ("RTX 4090", "RTX 5090", "RTX 3090", "RTX A6000", "RTX PRO 6000", "H100", "A100")],
+    },
+    "azure": {
+        "share": 0.15,
+        "table": "azure",
+        "markup": 1.4,
+        "sigma": 0.12,
+        "bandwidth": (40.0, 0.3),
+        "skus": [
+            ("Standard_ND96isr_H100_v5", "H100"),
+            ("Standard_ND96isr_H200_v5", "H200"),
+            ("Standard_NC24ads_A100_v4", "A100"),
+            ("Standard_NV36ads_A10_v5", "A10"),
+            ("NC80adisH100v5 Low Priority", "H100"),
+        ],
+    },
+    "aws": {
+        "share": 0.15,
+        "table": "aws",
+        "markup": 1.45,
+        "sigma": 0.1,
+        "bandwidth": (50.0, 0.3),
+        "skus": [("H100", "H100"), ("H200", "H200"), ("A100", "A100"), ("L40S", "L40S"), ("A10G", "A10G")],
+    },
+    "gcp": {
+        "share": 0.1,
+        "table": "gcp",
+        "markup": 1.35,
+        "sigma": 0.1,
+        "bandwidth": (50.0, 0.3),
+        "skus": [("H100", "H100"), ("A100", "A100"), ("L4", "L4")],
+    },
+    "lambda": {
+        "share": 0.05,
+        "table": "aws",
+        "markup": 1.0,
+        "sigma": 0.05,
+        "bandwidth": (10.0, 0.1),
+        "skus": [("gpu_1x_h100_pcie", "H100"), ("gpu_1x_a100", "A100"), ("gpu_1x_a10", "A10")],
+    },
+    "runpod": {
+        "share": 0.1,
+        "table": None,
+        "markup": 0.9,
+        "sigma": 0.2,
+        "bandwidth": (10.0, 0.1),
+        "skus": [(m, m) for m in ("H100", "A100", "RTX 4090", "RTX A6000", "L40S")],
+    },
+}
+# Azure's low-priority SKUs list at roughly a third of on-demand.
+LOW_PRIORITY_DISCOUNT = 0.3
+MAX_FETCH_AGE_SEC = 3600.0
+
+
+def provider_regions(table):
+    # Region names as the discovery scripts report them for one coordinate table.
+    if table is None:
+        return ["global"]
+    regions = []
+    for key in load_region_coords():
+        prefix, _, rest = key.partition(":")
+        if prefix != table:
+            continue
+        if table == "geo":
+            country, sep, place = rest.partition("-")
+            if sep:
+                regions.append(f"{place}, {country}")
+        else:
+            regions.append(rest)
+    return regions
+
+
+def _provider_tables():
+    # Per-provider arrays indexed by provider position, SKUs flattened with offsets.
+    names = list(PROVIDERS)
+    specs = [PROVIDERS[p] for p in names]
+    shares = np.array([spec["share"] for spec in specs], dtype=np.float64)
+    skus = [sku for spec in specs for sku in spec["skus"]]
+    regions = [provider_regions(spec["table"]) for spec in specs]
+    return {
+        "names": names,
+        "shares": shares / shares.sum(),
+        "regions": regions,
+        "n_regions": np.array([len(r) for r in regions]),
+        "skus": skus,
+        "n_skus": np.array([len(spec["skus"]) for spec in specs]),
+        "sku_offset": np.cumsum([0] + [len(spec["skus"]) for spec in specs[:-1]]),
+        "base_price": np.array([
+            GPU_BASE_PRICE[model] * (LOW_PRIORITY_DISCOUNT if "Low Priority" in sku else 1.0)
+            for sku, model in skus
+        ]),
+        "markup": np.array([spec["markup"] for spec in specs]),
+        "sigma": np.array([spec["sigma"] for spec in specs]),
+        "bw_median": np.array([spec["bandwidth"][0] for spec in specs]),
+        "bw_sigma": np.array([spec["bandwidth"][1] for spec in specs]),
+    }
+
+
+def iter_offers(n, seed=0, now=None):
+    # Yields n discovery-style offer dicts; the same seed gives the same rows.
+    rng = np.random.default_rng(seed)
+    now = time.time() if now is None else now
+    t = _provider_tables()
+    for start in range(0, n, CHUNK_ROWS):
+        size = min(CHUNK_ROWS, n - start)
+        prov = rng.choice(len(t["names"]), size=size, p=t["shares"])
+        region = (rng.random(size) * t["n_regions"][prov]).astype(np.int64)
+        sku = t["sku_offset"][prov] + (rng.random(size) * t["n_skus"][prov]).astype(np.int64)
+        price = t["base_price"][sku] * t["markup"][prov] * np.exp(t["sigma"][prov] * rng.standard_normal(size))
+        bandwidth = t["bw_median"][prov] * np.exp(t["bw_sigma"][prov] * rng.standard_normal(size))
+        fetched_at = now - rng.uniform(0.0, MAX_FETCH_AGE_SEC, size)
+        for p, r, k, pr, bw, at in zip(
+            prov.tolist(), region.tolist(), sku.tolist(),
+            price.round(4).tolist(), bandwidth.round(1).tolist(), fetched_at.round(3).tolist(),
+        ):
+            yield {
+                "provider": t["names"][p],
+                "region": t["regions"][p][r],
+                "gpu": t["skus"][k][0],
+                "price": pr,
+                "bandwidth": bw,
+                "fetched_at": at,
+            }
+
+
+def catalog_sites():
+    # Every (provider, region) the generator can emit.
+    t = _provider_tables()
+    return [(provider, region) for provider, regions in zip(t["names"], t["regions"]) for region in regions]
+
+
+def write_catalog(path, n, seed=0, now=None):
+    # .jsonl gets one row per line; anything else a JSON array like providers.json.
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    lines = path.suffix.lower() == ".jsonl"
+    with path.open("w", encoding="utf-8") as f:
+        if not lines:
+            f.write("[\n")
+        for i, offer in enumerate(iter_offers(n, seed, now)):
+            if lines:
+                f.write(json.dumps(offer) + "\n")
+            else:
+                f.write((",\n" if i else "") + json.dumps(offer))
+        if not lines:
+            f.write("\n]\n")
+    return path
+
+
+def _bandwidth_for_km(km):
+    # Same metro, same region group, same continent, intercontinental.
+    return np.select([km < 50, km < 1000, km < 5000], [100.0, 25.0, 10.0], 2.5)
+
+
+def iter_topology(sites, seed=0, neighbors=0):
+    # Yields (site_a, site_b, rtt_ms, bandwidth_gbps) once per unordered pair of
+    # locatable sites; with neighbors > 0 only each site's nearest `neighbors`.
+    rng = np.random.default_rng(seed)
+    located = [(offer_name(p, r), locate(p, r)) for p, r in sites]
+    located = [(name, coords) for name, coords in located if coords is not None]
+    if len(located) < 2:
+        return
+    names = [name for name, _ in located]
+    lat = np.array([c[0] for _, c in located])
+    lon = np.array([c[1] for _, c in located])
+    estimator = RttEstimator()
+    k = len(names) - 1 if neighbors <= 0 else min(neighbors, len(names) - 1)
+    emitted = set()
+    for a in range(len(names)):
+        km = haversine_km(lat[a], lon[a], lat, lon)
+        km[a] = np.inf
+        for b in np.argsort(km, kind="stable")[:k]:
+            pair = (a, b) if a < b else (b, a)
+            if pair in emitted:
+                continue
+            emitted.add(pair)
+            jitter = float(np.exp(0.1 * rng.standard_normal()))
+            rtt = float(estimator.rtt_for_km(km[b])) * jitter
+            gbps = float(_bandwidth_for_km(km[b])) / jitter
+            yield names[pair[0]], names[pair[1]], round(rtt, 1), round(gbps, 1)
+
+
+def write_topology(out_dir, sites=None, seed=0, neighbors=0):
+    # Writes rtt.csv and bandwidth.csv into out_dir; returns the pair count.
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    sites = catalog_sites() if sites is None else sites
+    count = 0
+    with (out_dir / "rtt.csv").open("w", encoding="utf-8", newline="") as rtt_f, \
+            (out_dir / "bandwidth.csv").open("w", encoding="utf-8", newline="") as bw_f:
+        rtt_w = csv.writer(rtt_f)
+        bw_w = csv.writer(bw_f)
+        rtt_w.writerow(["from", "to", "rtt_ms"])
+        bw_w.writerow(["from", "to", "bandwidth_gbps"])
+        for a, b, rtt, gbps in iter_topology(sites, seed, neighbors):
+            rtt_w.writerow([a, b, rtt])
+            bw_w.writerow([a, b, gbps])
+            count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a seeded synthetic provider catalog and topology.")
+    parser.add_argument("--offers", type=int, default=10_000, help="catalog rows")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=str(ROOT_DIR / "cache" / "synthetic" / "providers.json"),
+                        help=".json array or .jsonl lines")
+    parser.add_argument("--topology-dir", help="also write rtt.csv/bandwidth.csv for every generated site here")
+    parser.add_argument("--neighbors", type=int, default=0, help="pairs per site in the topology (0 = all pairs)")
+    parser.add_argument("--publish", action="store_true", help="publish as the current catalog version instead")
+    args = parser.parse_args()
+
+    if args.publish:
+        from catalog import publish_catalog
+        version = publish_catalog(list(iter_offers(args.offers, args.seed)))
+        print("Published", args.offers, "synthetic offers as catalog version", version)
+    else:
+        path = write_catalog(args.out, args.offers, args.seed)
+        print("Wrote", args.offers, "synthetic offers to", path)
+    if args.topology_dir:
+        pairs = write_topology(args.topology_dir, seed=args.seed, neighbors=args.neighbors)
+        print("Wrote", pairs, "site pairs to", args.topology_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+# test_api.py
+import pytest
+
+import api
+
+
+@pytest.mark.parametrize("top_k", [1, api.MAX_TOP_K])
+def test_top_k_in_range_is_accepted(top_k):
+    request = api._parse_request("plan", {"top_k": top_k})
+    assert request["options"]["top_k"] == top_k
+
+
+@pytest.mark.parametrize("top_k", [0, -1, api.MAX_TOP_K + 1, 10**6, 2.0, True, "5"])
+def test_top_k_out_of_range_is_rejected(top_k):
+    with pytest.raises(api.RequestError, match="top_k"):
+        api._parse_request("plan", {"top_k": top_k})
+
+
+@pytest.mark.parametrize("baseline", [{"aws": -1}, {"aws": "10"}, [1, 2], 5])
+def test_bad_egress_baseline_is_rejected(baseline):
+    with pytest.raises(api.RequestError, match="egress_baseline_gb"):
+        api._parse_request("plan", {"egress_baseline_gb": baseline})
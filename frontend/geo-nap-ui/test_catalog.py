@@ -0,0 +1,50 @@
+# test_catalog.py
+import json
+
+import pytest
+
+import catalog
+import shared_catalog
+
+ROWS = [{"provider": "aws", "region": "us-east-1", "gpu": "H100", "price": 4.0, "capacity": 8}]
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(catalog, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(catalog, "SNAPSHOT_DIR", tmp_path / "catalog")
+    monkeypatch.setattr(catalog, "POINTER_PATH", tmp_path / "catalog" / "CURRENT")
+    monkeypatch.setattr(catalog, "LEGACY_PATH", tmp_path / "providers.json")
+    monkeypatch.setattr(catalog, "_loaded", {})
+    monkeypatch.setattr(catalog, "_pointer_memo", None)
+    yield tmp_path
+    shared_catalog.release_all()
+
+
+def test_register_loaded_evicts_oldest_first(cache_dir):
+    for version in ("b-7", "300", "20"):
+        catalog.register_loaded(version, ROWS)
+    assert list(catalog._loaded) == ["300", "20"]
+    catalog.register_loaded("300", ROWS)
+    assert list(catalog._loaded) == ["20", "300"]
+
+
+def test_legacy_catalog_is_never_registered(cache_dir):
+    with pytest.raises(ValueError):
+        catalog.register_loaded(catalog.LEGACY_VERSION, ROWS)
+
+
+def test_sharing_a_legacy_catalog_publishes_it(cache_dir):
+    (cache_dir / "providers.json").write_text(json.dumps(ROWS))
+    assert catalog.current_version() == catalog.LEGACY_VERSION
+
+    handle = shared_catalog.share_catalog()
+    assert handle["version"] != catalog.LEGACY_VERSION
+    assert catalog.current_version() == handle["version"]
+
+    shared = shared_catalog.install(handle)
+    try:
+        assert shared[0]["price"] == 4.0
+        assert catalog.load_catalog(handle["version"])[1] is shared
+    finally:
+        shared.close()
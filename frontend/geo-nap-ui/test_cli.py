@@ -0,0 +1,45 @@
+# test_cli.py
+import json
+
+from cli import resume_offset
+
+
+def _write(path, offsets, tail=b""):
+    lines = b"".join(json.dumps({"offset": o, "status": "ok"}).encode() + b"\n" for o in offsets)
+    path.write_bytes(lines + tail)
+
+
+def test_missing_or_empty_file_starts_at_zero(tmp_path):
+    path = tmp_path / "results.jsonl"
+    assert resume_offset(path) == 0
+    path.write_bytes(b"")
+    assert resume_offset(path) == 0
+
+
+def test_resumes_after_last_complete_line(tmp_path):
+    path = tmp_path / "results.jsonl"
+    # Offsets need not be contiguous (errors are recorded too, blank lines skipped).
+    _write(path, [0, 1, 2, 5])
+    assert resume_offset(path) == 6
+
+
+def test_torn_trailing_line_is_cut_off(tmp_path):
+    path = tmp_path / "results.jsonl"
+    _write(path, [0, 1], tail=b'{"offset": 2, "sta')
+    assert resume_offset(path) == 2
+    assert path.read_bytes().endswith(b"\n")
+    assert [json.loads(line)["offset"] for line in path.read_text().splitlines()] == [0, 1]
+
+
+def test_only_a_torn_line(tmp_path):
+    path = tmp_path / "results.jsonl"
+    path.write_bytes(b'{"offset": 0')
+    assert resume_offset(path) == 0
+    assert path.read_bytes() == b""
+
+
+def test_last_line_beyond_one_read_block(tmp_path):
+    path = tmp_path / "results.jsonl"
+    record = {"offset": 7, "error": "x" * 200_000}
+    path.write_bytes(json.dumps({"offset": 6}).encode() + b"\n" + json.dumps(record).encode() + b"\n")
+    assert resume_offset(path) == 8
@@ -0,0 +1,98 @@
+# test_engine.py
+import pytest
+
+import engine
+
+# Three hosts behind one offer name (as vast lists them per region) plus two
+# single-offer sites; 40 GPUs in total, 26 cheaper than the "far" site.
+ROWS = [
+    {"provider": "vast", "region": "Ukraine, UA", "gpu": "RTX 4090", "price": 0.30, "rtt": 5, "bandwidth": 10, "capacity": 8},
+    {"provider": "vast", "region": "Ukraine, UA", "gpu": "RTX 4090", "price": 0.32, "rtt": 5, "bandwidth": 10, "capacity": 8},
+    {"provider": "vast", "region": "Ukraine, UA", "gpu": "RTX 4090", "price": 0.34, "rtt": 5, "bandwidth": 10, "capacity": 8},
+    {"provider": "aws", "region": "eu-central-1", "gpu": "RTX 4090", "price": 0.40, "rtt": 8, "bandwidth": 10, "capacity": 2},
+    {"provider": "gcp", "region": "europe-west4", "gpu": "RTX 4090", "price": 0.90, "rtt": 12, "bandwidth": 10, "capacity": 14},
+]
+SCENARIO = (20, 50, 5, 0, 100.0, 2, 32, 0.02, "aws", {}, "ring", "Any")
+
+
+def _plan(version, required_gpus=20, top_k=5):
+    return engine.run_geo_nap(required_gpus, *SCENARIO[1:], top_k=top_k, catalog_version=version)
+
+
+def test_same_name_offers_add_up(register_catalog):
+    version = register_catalog(ROWS)
+    placement, _, _, _ = _plan(version)
+    assert placement == {"vast_Ukraine, UA": 20}
+
+
+def test_every_alternative_places_all_gpus(register_catalog):
+    version = register_catalog(ROWS)
+    for required_gpus in (5, 20, 26, 40):
+        placement, _, _, breakdown = _plan(version, required_gpus)
+        alternatives = breakdown["alternatives"]
+        assert alternatives
+        assert sum(placement.values()) == required_gpus
+        for alt in alternatives:
+            assert sum(alt["placement"].values()) == required_gpus
+
+
+def test_alternatives_rank_by_total_cost(register_catalog):
+    version = register_catalog(ROWS)
+    _, total_cost, _, breakdown = _plan(version, 20, top_k=8)
+    alternatives = breakdown["alternatives"]
+    costs = [alt["total_cost"] for alt in alternatives]
+    assert costs == sorted(costs)
+    assert [alt["rank"] for alt in alternatives] == list(range(1, len(alternatives) + 1))
+    assert len({frozenset(alt["placement"].items()) for alt in alternatives}) == len(alternatives)
+    for alt in alternatives:
+        assert alt["delta_cost"] == pytest.approx(alt["total_cost"] - total_cost)
+
+
+def test_short_catalog_keeps_alternatives_as_full_as_the_plan(register_catalog):
+    version = register_catalog(ROWS)
+    placement, _, _, breakdown = _plan(version, 64)
+    assert sum(placement.values()) == 40
+    assert all(sum(alt["placement"].values()) == 40 for alt in breakdown["alternatives"])
+
+
+def test_evaluation_fills_same_name_offers_cheapest_first(register_catalog):
+    version = register_catalog(ROWS)
+    offers = engine.load_offers(catalog_version=version)
+    hosts = sorted((p for p in offers if p.provider == "vast"), key=lambda p: p.price)
+    params = engine.normalize_params(12, *SCENARIO[1:8], 0.0, 0.4, 0.08, 10.0)
+    _, breakdown = engine.evaluate_placement(offers, {"vast_Ukraine, UA": 12}, params, "aws", {}, "ring")
+    hourly = 8 * hosts[0].price + 4 * hosts[1].price
+    assert breakdown["compute_cost"] == pytest.approx(hourly * breakdown["total_time_hours"])
+
+
+def test_timings_only_when_requested(register_catalog):
+    version = register_catalog(ROWS)
+    assert "timings" not in _plan(version, top_k=0)[3]
+    timings = engine.run_geo_nap(*SCENARIO, catalog_version=version, timings=True)[3]["timings"]
+    assert {"filter", "allocate", "evaluate", "total"} <= set(timings)
+
+
+# Two cheap sites on 1 Gbps links and one dearer site that fits the whole job.
+SLOW_LINK_ROWS = [
+    {"provider": "vast", "region": "Ukraine, UA", "gpu": "RTX 4090", "price": 0.30, "rtt": 5, "bandwidth": 1, "capacity": 8},
+    {"provider": "aws", "region": "eu-central-1", "gpu": "RTX 4090", "price": 0.31, "rtt": 8, "bandwidth": 1, "capacity": 8},
+    {"provider": "gcp", "region": "europe-west4", "gpu": "RTX 4090", "price": 0.45, "rtt": 12, "bandwidth": 10, "capacity": 16},
+]
+
+
+def test_fair_share_plan_avoids_bottlenecked_sites(register_catalog):
+    version = register_catalog(SLOW_LINK_ROWS)
+    args = (16, *SCENARIO[1:])
+    greedy, _, _, _ = engine.run_geo_nap(*args, catalog_version=version)
+    assert greedy == {"vast_Ukraine, UA": 8, "aws_eu-central-1": 8}
+
+    placement, total_cost, _, breakdown = engine.run_geo_nap(
+        *args, top_k=3, catalog_version=version, network_model="fair_share"
+    )
+    assert placement == {"gcp_europe-west4": 16}
+    assert all(alt["total_cost"] >= total_cost for alt in breakdown["alternatives"])
+    # The plan does not depend on how many alternatives were asked for.
+    assert engine.run_geo_nap(*args, catalog_version=version, network_model="fair_share")[0] == placement
+    by_model = engine.run_geo_nap_by_model(*args[:11], ["RTX 4090"], catalog_version=version, network_model="fair_share")
+    assert by_model["RTX 4090"][0] == placement
+    assert by_model["RTX 4090"][1] == pytest.approx(total_cost)
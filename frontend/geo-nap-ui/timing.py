@@ -0,0 +1,178 @@
+# timing.py
+import contextlib
+import cProfile
+import io
+import logging
+import os
+import pstats
+import threading
+import time
+
+# Optional per-stage spans for engine requests. A request that is not timed
+# gets NULL_SPANS, whose spans are one shared no-op context manager, so the
+# instrumented code paths cost a few attribute lookups when timing is off.
+# Timing is on for a request that asks for it, for every request once
+# enable() is called (or GEO_NAP_TIMINGS=1), and whenever a sink is installed;
+# only a request that asks for it gets its timings back.
+
+ENV_VAR = "GEO_NAP_TIMINGS"
+PROFILE_LINES = 30
+# Upper bounds (ms) of the cumulative histogram buckets kept per stage.
+BUCKETS_MS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 25.0, 50.0, 100.0, 250.0, 500.0, 1000.0, 2500.0, 10000.0)
+
+_enabled = os.environ.get(ENV_VAR, "").strip().lower() in ("1", "true", "yes", "on")
+# Callables sink(operation, timings) run after every timed request.
+_sinks = []
+_logger = logging.getLogger("geo_nap.timing")
+
+
+class Spans:
+    # Wall time per stage of one request in ms. A stage entered more than once
+    # (e.g. evaluating each top-k alternative) accumulates; nested stages are
+    # named "outer.inner" and also count towards the outer one.
+    __slots__ = ("operation", "timings", "_started")
+
+    def __init__(self, operation):
+        self.operation = operation
+        self.timings = {}
+        self._started = time.perf_counter()
+
+    @contextlib.contextmanager
+    def __call__(self, stage):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000.0
+            self.timings[stage] = self.timings.get(stage, 0.0) + elapsed
+
+    def finish(self):
+        self.timings["total"] = (time.perf_counter() - self._started) * 1000.0
+        for sink in list(_sinks):
+            try:
+                sink(self.operation, self.timings)
+            except Exception:
+                _logger.exception("timing sink %r failed", sink)
+        return self.timings
+
+
+class _NullSpans:
+    __slots__ = ()
+    operation = None
+    timings = None
+
+    def __call__(self, stage):
+        return _NULL_SPAN
+
+    def finish(self):
+        return None
+
+
+_NULL_SPAN = contextlib.nullcontext()
+NULL_SPANS = _NullSpans()
+
+
+def enable(on=True):
+    global _enabled
+    _enabled = bool(on)
+
+
+def enabled():
+    return _enabled or bool(_sinks)
+
+
+def start(operation, requested=False):
+    return Spans(operation) if requested or _enabled or _sinks else NULL_SPANS
+
+
+def add_sink(sink):
+    if sink not in _sinks:
+        _sinks.append(sink)
+    return sink
+
+
+def remove_sink(sink):
+    if sink in _sinks:
+        _sinks.remove(sink)
+
+
+def profile_report(profiler, lines=PROFILE_LINES, sort="cumulative"):
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).strip_dirs().sort_stats(sort).print_stats(lines)
+    return out.getvalue()
+
+
+def instrumented(operation, fn, *args, timings=False, profile=False):
+    # Runs fn(*args, spans); returns (result, stage timings or None, cProfile
+    # report or None). Stage timings are returned only when timings or profile
+    # is requested; otherwise they go to the sinks alone. Profiling covers this
+    # one call only.
+    requested = timings or profile
+    spans = start(operation, requested)
+    if not profile:
+        result = fn(*args, spans)
+        stage_ms = spans.finish()
+        return result, stage_ms if requested else None, None
+    profiler = cProfile.Profile()
+    result = profiler.runcall(fn, *args, spans)
+    return result, spans.finish(), profile_report(profiler)
+
+
+def log_sink(logger=None, level=logging.INFO):
+    # One line per request: "run_geo_nap total=12.300ms catalog=0.010ms ...".
+    logger = logger or _logger
+
+    def sink(operation, timings):
+        if logger.isEnabledFor(level):
+            stages = " ".join(f"{stage}={ms:.3f}ms" for stage, ms in timings.items())
+            logger.log(level, "%s %s", operation, stages)
+    return sink
+
+
+class StageHistograms:
+    # Prometheus-style aggregate of every timed request: a count and
+    # cumulative latency buckets per (operation, stage). Install the instance
+    # itself as a sink.
+
+    def __init__(self, buckets_ms=BUCKETS_MS):
+        self.buckets_ms = tuple(sorted(buckets_ms))
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, operation, timings):
+        with self._lock:
+            for stage, ms in timings.items():
+                series = self._series.get((operation, stage))
+                if series is None:
+                    series = self._series[(operation, stage)] = {
+                        "count": 0,
+                        "sum_ms": 0.0,
+                        "buckets": [0] * len(self.buckets_ms),
+                    }
+                series["count"] += 1
+                series["sum_ms"] += ms
+                for i, bound in enumerate(self.buckets_ms):
+                    if ms <= bound:
+                        series["buckets"][i] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                key: {"count": s["count"], "sum_ms": s["sum_ms"], "buckets": list(s["buckets"])}
+                for key, s in self._series.items()
+            }
+
+    def render(self, name="geo_nap_stage_seconds"):
+        # Text exposition format; seconds, as Prometheus histograms expect.
+        lines = [
+            f"# HELP {name} Wall time of engine request stages.",
+            f"# TYPE {name} histogram",
+        ]
+        for (operation, stage), s in sorted(self.snapshot().items()):
+            labels = f'operation="{operation}",stage="{stage}"'
+            for bound, count in zip(self.buckets_ms, s["buckets"]):
+                lines.append(f'{name}_bucket{{{labels},le="{bound / 1000.0:g}"}} {count}')
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {s["count"]}')
+            lines.append(f"{name}_sum{{{labels}}} {s['sum_ms'] / 1000.0:.9g}")
+            lines.append(f"{name}_count{{{labels}}} {s['count']}")
+        return "\n".join(lines) + "\n"
@@ -1,8 +1,8 @@
 ﻿# ui/app.py
 import sys
+import time
 from pathlib import Path
 import requests
-import json
 import streamlit as st
 import pandas as pd
 
@@ -10,7 +10,19 @@ import pandas as pd
 APP_ROOT = Path(__file__).resolve().parents[1]
 sys.path.insert(0, str(APP_ROOT))
 
-from engine import run_geo_nap
+from catalog import cache_stats as catalog_cache_stats, catalog_exists, load_catalog, published_at
+from engine import cache_stats as plan_cache_stats, run_geo_nap, run_geo_nap_by_model
+import metrics
+from offer import offer_name
+from live.discovery_state import provider_ages
+from optimizer.schedule import plan_start_times
+from watcher import start_watching
+from ui.results import build_base_result, build_model_results
+from ui.services.observers import add_observer
+from ui import diagnostics
+
+PAGE = "geo_nap"
+diagnostics.begin(PAGE)
 
 
 def render_cost_details(breakdown, fx, currency, title_prefix="", per_gpu_hour_rows=None):
@@ -44,10 +56,16 @@ def render_cost_details(breakdown, fx, currency, title_prefix="", per_gpu_hour_r
 
     st.metric("Data egress cost (USD, $/GB × GB)", f"{breakdown['egress_cost'] * fx:,.2f} {currency}")
     st.caption(
-        "Formula: dataset_size_gb × total_steps × source_egress_rate "
-        f"= {breakdown['egress_rate_source']:.3f} $/GB × {breakdown['dataset_size_gb']:.2f} GB × "
-        f"{breakdown['total_steps']} steps = {breakdown['egress_cost'] * fx:,.2f} {currency}"
+        "Formula: planned data volume × source_egress_rate (volume-averaged over tiers) "
+        f"= {breakdown.get('data_volume_gb', 0.0):,.2f} GB × {breakdown['egress_rate_source']:.3f} $/GB "
+        f"= {breakdown['egress_cost'] * fx:,.2f} {currency}"
     )
+    if breakdown.get("data_strategy_by_provider"):
+        st.caption(
+            "Dataset access: "
+            + ", ".join(f"{k}: {v}" for k, v in sorted(breakdown["data_strategy_by_provider"].items()))
+            + f" | staging adds {breakdown.get('data_staging_hours', 0.0):.2f} hr"
+        )
 
     st.metric("Inter-provider cost (USD, $/GB × GB)", f"{breakdown['inter_provider_cost'] * fx:,.2f} {currency}")
     st.caption(
@@ -65,7 +83,7 @@ def render_cost_details(breakdown, fx, currency, title_prefix="", per_gpu_hour_r
         f"{breakdown['comm_time_per_step_sec']:.3f}s comm."
     )
 
-    total_gb_egress = breakdown["dataset_size_gb"] * breakdown["total_steps"]
+    total_gb_egress = breakdown.get("data_volume_gb", breakdown["dataset_size_gb"] * breakdown["total_steps"])
     total_gb_inter = breakdown["model_size_gb"] * breakdown["total_steps"]
     line_items = [
         {
@@ -81,10 +99,7 @@ def render_cost_details(breakdown, fx, currency, title_prefix="", per_gpu_hour_r
             "Component": "Data egress",
             "Unit": "$/GB × GB",
             "Amount (USD)": breakdown["egress_cost"] * fx,
-            "Formula": (
-                f"{breakdown['egress_rate_source']:.3f} $/GB × {breakdown['dataset_size_gb']:.2f} GB × "
-                f"{breakdown['total_steps']} steps"
-            ),
+            "Formula": f"{breakdown['egress_rate_source']:.3f} $/GB × {total_gb_egress:,.2f} GB",
             "Hours used": "",
             "Egress GB": round(total_gb_egress, 2),
             "Inter-provider GB": "",
@@ -116,6 +131,24 @@ def render_cost_details(breakdown, fx, currency, title_prefix="", per_gpu_hour_r
         st.dataframe(pd.DataFrame(per_gpu_hour_rows), use_container_width=True)
 
 
+def build_model_comparison_rows(model_results, base_cost, fx):
+    rows = []
+    for model_name, result in model_results.items():
+        used = {k: v for k, v in result["placement"].items() if v > 0}
+        if not used:
+            continue
+        rows.append({
+            "GPU Model": model_name,
+            "GPUs placed": sum(used.values()),
+            "Providers": len(used),
+            "Total cost": result["cost"] * fx,
+            "Cost per epoch": result["breakdown"]["cost_per_epoch"] * fx,
+            "Δ vs base": (result["cost"] - base_cost) * fx,
+        })
+    rows.sort(key=lambda r: r["Total cost"])
+    return rows
+
+
 def build_report_csv(base_result, model_result):
     rows = []
     rows.append({"Section": "Base", "Metric": "Total cost", "Value": base_result["breakdown"]["total_cost"]})
@@ -132,13 +165,42 @@ def build_report_csv(base_result, model_result):
     return pd.DataFrame(rows).to_csv(index=False).encode("utf-8")
 
 
+def format_age(seconds):
+    if seconds is None:
+        return "unknown"
+    if seconds < 3600:
+        return f"{seconds / 60:.0f} min"
+    if seconds < 86400:
+        return f"{seconds / 3600:.1f} h"
+    return f"{seconds / 86400:.1f} d"
+
+
+def parse_provider_values(text):
+    # "provider_name,number" lines; malformed lines are skipped.
+    values = {}
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        parts = [p.strip() for p in line.split(",")]
+        if len(parts) == 2:
+            try:
+                values[parts[0].lower()] = float(parts[1])
+            except ValueError:
+                pass
+    return values
+
+
+def scalar_breakdown(breakdown):
+    return {k: v for k, v in breakdown.items() if not isinstance(v, (dict, list))}
+
+
 def build_report_html(base_result, model_result):
     html = ["<h2>Geo-NAP Report</h2>"]
     html.append("<h3>Base placement</h3>")
-    html.append(pd.DataFrame(base_result["breakdown"], index=[0]).to_html(index=False))
+    html.append(pd.DataFrame(scalar_breakdown(base_result["breakdown"]), index=[0]).to_html(index=False))
     if model_result:
         html.append(f"<h3>Model placement: {model_result['model']}</h3>")
-        html.append(pd.DataFrame(model_result["breakdown"], index=[0]).to_html(index=False))
+        html.append(pd.DataFrame(scalar_breakdown(model_result["breakdown"]), index=[0]).to_html(index=False))
     return "\n".join(html).encode("utf-8")
 
 
@@ -147,6 +209,7 @@ def build_report_html(base_result, model_result):
 # -----------------------------
 @st.cache_data(ttl=3600)
 def get_live_rates():
+    diagnostics.miss("currency")
     fallback = {
         "USD": 1.0,
         "INR": 83.0,
@@ -176,7 +239,9 @@ def get_live_rates():
     return fallback
 
 
-rates = get_live_rates()
+diagnostics.lookup("currency")
+with diagnostics.span(PAGE, "currency"):
+    rates = get_live_rates()
 
 
 # -----------------------------
@@ -425,18 +490,59 @@ st.markdown("")
 # -----------------------------
 # Cache Safety Check
 # -----------------------------
-providers_path = APP_ROOT / "cache" / "providers.json"
-if not providers_path.exists():
+if not catalog_exists():
     st.error("Provider cache not found. Run discovery once before planning a run.")
     st.code("python live/discover_all.py")
     st.stop()
 
-with providers_path.open("r", encoding="utf-8") as f:
-    providers_cache = json.load(f)
+# One watcher per process invalidates catalog and engine caches when files change.
+data_watcher = start_watching()
+
+# One metrics endpoint per process (GEO_NAP_METRICS_PORT, default 9464).
+metrics.instrument_engine()
+add_observer(metrics.observe_backend_request)
+metrics.register_cache("plan_memo", plan_cache_stats)
+metrics.register_cache("currency", lambda: diagnostics.counter_stats("currency"))
+metrics.start_server()
+st.session_state["data_generation"] = data_watcher.generation
+
+# Pin one catalog snapshot for this rerun; discovery may publish a newer one meanwhile.
+with diagnostics.span(PAGE, "catalog.load"):
+    catalog_version, providers_cache = load_catalog()
+catalog_published = published_at(catalog_version)
+diagnostics.note(PAGE, "Catalog version", catalog_version)
+diagnostics.note(
+    PAGE,
+    "Catalog age",
+    format_age(time.time() - catalog_published if catalog_published is not None else None),
+)
 
-gpu_models = sorted({p.get("gpu", "unknown") for p in providers_cache})
+
+@st.fragment(run_every=5)
+def fresh_data_notice():
+    # Cheap in-memory check; long-lived sessions learn about new data without a full rerun.
+    if data_watcher.generation != st.session_state.get("data_generation"):
+        st.info("Fresh provider data is available.")
+        if st.button("Reload data"):
+            st.rerun()
+
+
+fresh_data_notice()
+
+
+data_ages = provider_ages(providers_cache)
+with st.expander("Catalog data age per provider"):
+    st.dataframe(
+        pd.DataFrame(
+            [{"Provider": k, "Data age": format_age(v)} for k, v in sorted(data_ages.items())]
+        ),
+        use_container_width=True,
+    )
+    st.caption("Keep prices fresh with `python live/refresher.py` running in the background.")
+
+gpu_models = sorted({p["gpu"] for p in providers_cache})
 gpu_model_options = ["Any"] + [m for m in gpu_models if m and m != "unknown"]
-provider_names = sorted({str(p.get("provider", "")).strip().lower() for p in providers_cache if p.get("provider")})
+provider_names = sorted({p["provider"].strip().lower() for p in providers_cache})
 if not provider_names:
     provider_names = ["aws", "azure", "gcp", "vast"]
 data_source_options = provider_names + ["custom"]
@@ -487,6 +593,13 @@ with st.form("plan_form"):
     with dc5:
         sample_size_gb = st.number_input("Sample size (GB)", min_value=0.001, value=0.02, step=0.001)
     with dc6:
+        egress_pricing = st.selectbox("Egress pricing", ["tiered", "flat"], help="Tiered applies volume discounts per provider.")
+        data_strategy = st.selectbox(
+            "Dataset access per site",
+            ["auto", "stream", "stage", "cache"],
+            help="auto picks the cheapest of streaming, staging once, or a shard cache for each remote site.",
+        )
+        cache_hit_ratio = st.slider("Shard cache hit ratio", 0.0, 1.0, 0.8, 0.05)
         st.caption("Provider-specific egress is auto-detected from provider names.")
     st.markdown("</div>", unsafe_allow_html=True)
 
@@ -495,13 +608,37 @@ with st.form("plan_form"):
     a1, a2 = st.columns([1, 1])
     with a1:
         topology = st.selectbox("All-reduce topology", ["ring", "mesh"])
+        network_model = st.selectbox(
+            "Network model",
+            ["average", "fair_share"],
+            help="fair_share splits shared uplinks/downlinks max-min fairly between data and gradient flows, "
+            "and plans the cheapest of the first 16 candidate placements under that model.",
+        )
         training_hours = st.number_input("Training hours (override)", min_value=0.0, value=0.0, step=0.5)
+        top_k = st.number_input("Alternative placements (top K)", min_value=1, max_value=20, value=5, step=1)
     with a2:
         base_compute_sec = st.number_input("Base sec/step", min_value=0.05, value=0.4, step=0.05)
         compute_scale_per_gb = st.number_input("Sec per GB per step", min_value=0.01, value=0.08, step=0.01)
+        stale_after_hours = st.number_input("Stale offer age (hours, 0 = off)", min_value=0.0, value=0.0, step=1.0)
+        stale_policy = st.selectbox("Stale offers", ["penalize", "skip"])
+        origin_region = st.text_input(
+            "Origin region for RTT estimates",
+            value="",
+            placeholder="aws:us-east-1 or Arizona, US",
+            help="Offers without a measured RTT get a distance-based estimate from this region.",
+        ).strip()
     override_text = st.text_area(
         "Override egress rates ($/GB), one per line: provider_name,rate",
-        value="aws,0.09\nazure,0.08\ngcp,0.12\nvast,0.02",
+        value="",
+        placeholder="aws,0.09\nazure,0.08",
+        help="A flat rate for a provider (e.g. aws) or a single site (e.g. aws_us-east-1). Leave empty for list prices.",
+        height=100,
+    )
+    baseline_text = st.text_area(
+        "Egress already billed this month (GB), one per line: provider_name,GB",
+        value="",
+        placeholder="aws,40000",
+        help="Tiered prices are monthly, so this run is priced on top of these totals. Leave empty if the run is the month's only egress.",
         height=100,
     )
     st.markdown("</div>", unsafe_allow_html=True)
@@ -510,16 +647,8 @@ with st.form("plan_form"):
 
 gpu_model = "Any"
 
-egress_overrides = {}
-for line in override_text.splitlines():
-    if not line.strip():
-        continue
-    parts = [p.strip() for p in line.split(",")]
-    if len(parts) == 2:
-        try:
-            egress_overrides[parts[0].lower()] = float(parts[1])
-        except ValueError:
-            pass
+egress_overrides = parse_provider_values(override_text)
+egress_baseline_gb = {k: v for k, v in parse_provider_values(baseline_text).items() if v >= 0}
 
 # -----------------------------
 # Run Optimization
@@ -543,30 +672,59 @@ if run_clicked:
             training_hours,
             base_compute_sec,
             compute_scale_per_gb,
+            top_k=top_k,
+            catalog_version=catalog_version,
+            stale_after_hours=stale_after_hours,
+            stale_policy=stale_policy,
+            egress_pricing=egress_pricing,
+            data_strategy=data_strategy,
+            cache_hit_ratio=cache_hit_ratio,
+            network_model=network_model,
+            origin_region=origin_region or None,
+            egress_baseline_gb=egress_baseline_gb,
+            timings=True,
         )
+    diagnostics.record_timings(PAGE, "engine.run_geo_nap", breakdown.get("timings"))
 
-    base_rows = []
-    for p in providers_cache:
-        key = f"{p.get('provider','unknown')}_{p.get('region','unknown')}"
-        if key in placement:
-            price = p.get("price", 0.0) or 0.0
-            gpus = placement[key]
-            base_rows.append({
-                "Provider": key,
-                "GPU Model": p.get("gpu", "unknown"),
-                "GPUs": gpus,
-                "Price ($/hr)": price,
-                "Total $/hr": round(price * gpus, 4),
-            })
-
-    breakdown["total_cost"] = cost
-    st.session_state["base_result"] = {
-        "placement": placement,
-        "cost": cost,
-        "forbidden": forbidden,
-        "breakdown": breakdown,
-        "per_gpu_rows": base_rows,
-    }
+    st.session_state["base_result"] = build_base_result(
+        providers_cache, placement, cost, forbidden, breakdown, catalog_version
+    )
+
+    # Model-filtered placements for every GPU model in one pass, cached for the model picker.
+    with st.spinner("Computing placements for every GPU model..."):
+        by_model = run_geo_nap_by_model(
+            required_gpus,
+            r_max,
+            model_size,
+            steps,
+            dataset_size_gb,
+            epochs,
+            batch_size,
+            sample_size_gb,
+            data_source_provider,
+            egress_overrides,
+            topology,
+            None,
+            training_hours,
+            base_compute_sec,
+            compute_scale_per_gb,
+            catalog_version=catalog_version,
+            stale_after_hours=stale_after_hours,
+            stale_policy=stale_policy,
+            egress_pricing=egress_pricing,
+            data_strategy=data_strategy,
+            cache_hit_ratio=cache_hit_ratio,
+            network_model=network_model,
+            origin_region=origin_region or None,
+            egress_baseline_gb=egress_baseline_gb,
+            timings=True,
+        )
+    # Every model's breakdown carries the same whole-call timings.
+    if by_model:
+        model_breakdown = next(iter(by_model.values()))[3]
+        diagnostics.record_timings(PAGE, "engine.run_geo_nap_by_model", model_breakdown.get("timings"))
+    st.session_state["model_results"] = build_model_results(providers_cache, by_model)
+    st.session_state.pop("model_result", None)
 
 base_result = st.session_state.get("base_result")
 if base_result:
@@ -582,6 +740,16 @@ if base_result:
     # Results Section
     # -----------------------------
     st.success("Optimal placement found")
+    st.caption(f"Catalog snapshot: {base_result.get('catalog_version', catalog_version)}")
+    if base_result.get("catalog_version", catalog_version) != catalog_version:
+        st.warning("These results were computed on an older catalog. Run the optimization again to refresh them.")
+    if breakdown.get("bottleneck_links"):
+        st.caption(
+            f"All-reduce runs at {breakdown['allreduce_bandwidth_gbps']:.2f} Gbps; saturated links: "
+            + ", ".join(breakdown["bottleneck_links"])
+        )
+    if breakdown.get("stale_providers"):
+        st.warning("Placement uses stale offers: " + ", ".join(breakdown["stale_providers"]))
 
     st.markdown("### Quick summary")
     s1, s2, s3, s4 = st.columns(4)
@@ -617,7 +785,7 @@ if base_result:
     # -----------------------------
     # Results
     # -----------------------------
-    tabs = st.tabs(["Allocation", "Cost details", "Rejected providers"])
+    tabs = st.tabs(["Allocation", "Cost details", "Alternatives", "Rejected providers"])
 
     df = pd.DataFrame(placement.items(), columns=["Provider", "GPUs"])
     df = df[df["GPUs"] > 0]
@@ -639,9 +807,9 @@ if base_result:
         placement_regions = set(placement.keys())
         available_models = {"Any"}
         for p in providers_cache:
-            key = f"{p.get('provider','unknown')}_{p.get('region','unknown')}"
+            key = offer_name(p["provider"], p["region"])
             if key in placement_regions:
-                model_name = p.get("gpu", "unknown")
+                model_name = p["gpu"]
                 if model_name and model_name != "unknown":
                     available_models.add(model_name)
         available_model_options = ["Any"] + sorted(m for m in available_models if m != "Any")
@@ -650,8 +818,8 @@ if base_result:
         if chosen_model != "Any":
             availability = {}
             for p in providers_cache:
-                key = f"{p.get('provider','unknown')}_{p.get('region','unknown')}"
-                availability.setdefault(key, set()).add(p.get("gpu", "unknown"))
+                key = offer_name(p["provider"], p["region"])
+                availability.setdefault(key, set()).add(p["gpu"])
 
             rows = []
             for provider_name, gpus in df.values:
@@ -664,59 +832,28 @@ if base_result:
         else:
             st.info("Select a GPU model to check availability in the allocated regions.")
 
+        model_results = st.session_state.get("model_results", {})
         if chosen_model != "Any":
-            st.markdown("### Recalculate with selected model")
-            if st.button("Recalculate placement for selected model", use_container_width=True, key="recalc_model"):
-                with st.spinner("Recomputing placement with model filter..."):
-                    m_placement, m_cost, m_forbidden, m_breakdown = run_geo_nap(
-                        required_gpus,
-                        r_max,
-                        model_size,
-                        steps,
-                        dataset_size_gb,
-                        epochs,
-                        batch_size,
-                        sample_size_gb,
-                        data_source_provider,
-                        egress_overrides,
-                        topology,
-                        chosen_model,
-                        training_hours,
-                        base_compute_sec,
-                        compute_scale_per_gb,
-                    )
-                m_breakdown["total_cost"] = m_cost
-                m_fx = rates.get(currency, 1.0)
-                st.success(f"Model-filtered placement computed for {chosen_model}.")
-                m_df = pd.DataFrame(m_placement.items(), columns=["Provider", "GPUs"])
-                m_df = m_df[m_df["GPUs"] > 0]
-                if len(m_df) == 0:
-                    st.warning("No feasible placement found for that model and constraints.")
-                else:
-                    st.dataframe(m_df, use_container_width=True)
-                    st.metric("Model-filtered total cost", f"{m_cost * m_fx:,.2f} {currency}")
-                    st.metric("Model-filtered cost per epoch", f"{m_breakdown['cost_per_epoch'] * m_fx:,.2f} {currency}")
-                    m_rows = []
-                    for p in providers_cache:
-                        key = f"{p.get('provider','unknown')}_{p.get('region','unknown')}"
-                        if key in m_placement:
-                            price = p.get("price", 0.0) or 0.0
-                            gpus = m_placement[key]
-                            m_rows.append({
-                                "Provider": key,
-                                "GPU Model": p.get("gpu", "unknown"),
-                                "GPUs": gpus,
-                                "Price ($/hr)": price,
-                                "Total $/hr": round(price * gpus, 4),
-                            })
-
-                    st.session_state["model_result"] = {
-                        "model": chosen_model,
-                        "placement": m_placement,
-                        "cost": m_cost,
-                        "breakdown": m_breakdown,
-                        "per_gpu_rows": m_rows,
-                    }
+            st.markdown("### Placement with selected model")
+            cached = model_results.get(chosen_model)
+            m_placement = cached["placement"] if cached else {}
+            m_df = pd.DataFrame(m_placement.items(), columns=["Provider", "GPUs"])
+            m_df = m_df[m_df["GPUs"] > 0]
+            if len(m_df) == 0:
+                st.warning("No feasible placement found for that model and constraints.")
+                st.session_state.pop("model_result", None)
+            else:
+                st.dataframe(m_df, use_container_width=True)
+                st.metric("Model-filtered total cost", f"{cached['cost'] * fx:,.2f} {currency}")
+                st.metric("Model-filtered cost per epoch", f"{cached['breakdown']['cost_per_epoch'] * fx:,.2f} {currency}")
+                st.session_state["model_result"] = cached
+        else:
+            st.session_state.pop("model_result", None)
+
+        comparison_rows = build_model_comparison_rows(model_results, breakdown["total_cost"], fx)
+        if comparison_rows:
+            st.markdown("### Compare all GPU models")
+            st.dataframe(pd.DataFrame(comparison_rows), use_container_width=True)
 
         model_result = st.session_state.get("model_result")
         if model_result:
@@ -779,6 +916,26 @@ if base_result:
             render_cost_details(breakdown, fx, currency, "Base placement", base_result.get("per_gpu_rows"))
 
     with tabs[2]:
+        st.markdown("### Next-best placements")
+        alternatives = breakdown.get("alternatives", [])
+        if not alternatives:
+            st.info("No alternative placements under current constraints.")
+        else:
+            st.caption("Cheapest placements by total cost that place the same number of GPUs; Δ is against the placement above.")
+            alt_rows = []
+            for alt in alternatives:
+                alt_rows.append({
+                    "Rank": alt["rank"],
+                    "Total cost": alt["total_cost"] * fx,
+                    "Δ vs best": alt["delta_cost"] * fx,
+                    "Providers": ", ".join(f"{k} ({v})" for k, v in alt["placement"].items() if v > 0),
+                    "Added": ", ".join(alt["added"]),
+                    "Removed": ", ".join(alt["removed"]),
+                    "Changed GPUs": ", ".join(alt["changed"]),
+                })
+            st.dataframe(pd.DataFrame(alt_rows), use_container_width=True)
+
+    with tabs[3]:
         st.markdown("### Rejected providers (high RTT)")
         if len(forbidden) == 0:
             st.info("No providers rejected by RTT constraint.")
@@ -801,6 +958,35 @@ if base_result:
         )
         st.dataframe(rate_df, use_container_width=True)
 
+    with st.expander("Best time to launch (from price history)"):
+        horizon_hours = st.slider("Search horizon (hours)", 1, 72, 24, key="launch_horizon")
+        if st.button("Find cheapest launch window", use_container_width=True, key="launch_window"):
+            schedule = plan_start_times(
+                required_gpus,
+                breakdown["total_time_hours"],
+                gpu_model,
+                r_max=r_max,
+                horizon_hours=horizon_hours,
+            )
+            best = schedule["recommendation"]
+            if best is None:
+                st.info("No price history yet. Run discovery a few times to record snapshots.")
+            else:
+                start_at = pd.to_datetime(best["start_ts"], unit="s", utc=True)
+                st.success(
+                    f"Launch on {best['provider']} ({best['gpu']}) at {start_at:%Y-%m-%d %H:%M} UTC: "
+                    f"{best['expected_cost'] * fx:,.2f} {currency} compute, "
+                    f"saving {best['savings'] * fx:,.2f} {currency} vs starting now."
+                )
+                if best["unplaced_gpus"]:
+                    st.warning(f"No region holds all {required_gpus} GPUs; {best['unplaced_gpus']} left unplaced.")
+                launch_df = pd.DataFrame(schedule["by_region"])
+                launch_df["start_utc"] = pd.to_datetime(launch_df["start_ts"], unit="s", utc=True)
+                st.dataframe(
+                    launch_df[["provider", "gpu", "unplaced_gpus", "start_utc", "expected_cost", "cost_if_now", "savings"]],
+                    use_container_width=True,
+                )
+
     st.markdown("")
     st.markdown(
         """
@@ -814,3 +1000,12 @@ if base_result:
 """,
         unsafe_allow_html=True,
     )
+
+diagnostics.render(
+    PAGE,
+    {
+        "Catalog": catalog_cache_stats(),
+        "Plan memo (prepared catalog)": plan_cache_stats(),
+        "Currency rates": diagnostics.counter_stats("currency"),
+    },
+)
@@ -18,6 +18,15 @@ from ui.services.cost_estimator_api import (  # noqa: E402
     CostEstimatorApiError,
     estimate_cost,
 )
+from ui.services.observers import add_observer  # noqa: E402
+from ui import diagnostics  # noqa: E402
+import metrics  # noqa: E402
+
+PAGE = "cost_estimator"
+diagnostics.begin(PAGE)
+
+# Backend calls go to the metrics endpoint the Geo-NAP page serves.
+add_observer(metrics.observe_backend_request)
 
 
 st.set_page_config(
@@ -283,7 +292,7 @@ if extract_clicked:
         st.session_state["ce_error"] = None
 
         try:
-            with st.spinner("Extracting requirements..."):
+            with st.spinner("Extracting requirements..."), diagnostics.span(PAGE, "backend.extract"):
                 payload = extract_requirements(
                     uploaded_file.name,
                     uploaded_file.getvalue(),
@@ -480,7 +489,7 @@ if isinstance(candidate, dict) and issues:
             clarifications["network"] = network_patch
 
         try:
-            with st.spinner("Validating clarifications..."):
+            with st.spinner("Validating clarifications..."), diagnostics.span(PAGE, "backend.clarify"):
                 resp = submit_clarifications(candidate, clarifications)
 
             status = str(resp.get("status", "")).upper()
@@ -581,10 +590,12 @@ if estimate_clicked:
         requirement = sample_requirement()
 
     payload = build_payload(selected_providers, region, requirement)
+    estimate_timings: Dict[str, float] = {}
 
     try:
         with st.spinner("Calculating cost..."):
-            response = estimate_cost(payload)
+            with diagnostics.span(PAGE, "backend.estimate.round_trip"):
+                response = estimate_cost(payload, timings=estimate_timings)
             results = response.get("results", [])
             if not isinstance(results, list):
                 raise CostEstimatorApiError(
@@ -597,6 +608,16 @@ if estimate_clicked:
         st.session_state["ce_error"] = f"Unexpected error: {exc}"
     finally:
         st.session_state["ce_loading"] = False
+        # Whatever stages completed, also when the call failed part way.
+        for stage, label in (
+            ("auth_ms", "auth"),
+            ("submit_ms", "submit"),
+            ("poll_ms", "job_polling"),
+        ):
+            if stage in estimate_timings:
+                diagnostics.record(PAGE, f"backend.estimate.{label}", estimate_timings[stage])
+        if "polls" in estimate_timings:
+            diagnostics.note(PAGE, "Estimate job polls", estimate_timings["polls"])
 
 st.markdown("</div>", unsafe_allow_html=True)
 
@@ -641,3 +662,5 @@ else:
         unsafe_allow_html=True,
     )
     st.markdown("</div>", unsafe_allow_html=True)
+
+diagnostics.render(PAGE)
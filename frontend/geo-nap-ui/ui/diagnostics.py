@@ -0,0 +1,130 @@
+# ui/diagnostics.py
+import contextlib
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# Per-session performance panel. A page calls begin() at the top of its script
+# and render() at the bottom; timings recorded in between belong to that rerun
+# and are kept for the last HISTORY_RERUNS reruns of the session. Reruns cut
+# short by st.rerun() or st.stop() are not recorded.
+
+HISTORY_RERUNS = 100
+PERCENTILES = (50, 90, 99)
+
+# Process-wide lookups/misses for caches that keep no counters of their own
+# (e.g. st.cache_data functions).
+_counters = {}
+_counters_lock = threading.Lock()
+
+
+def _state(page):
+    key = f"perf_{page}"
+    if key not in st.session_state:
+        st.session_state[key] = {"current": None, "history": deque(maxlen=HISTORY_RERUNS)}
+    return st.session_state[key]
+
+
+def begin(page):
+    _state(page)["current"] = {"started": time.perf_counter(), "metrics": {}, "notes": {}}
+
+
+def record(page, name, ms):
+    current = _state(page)["current"]
+    if current is not None:
+        current["metrics"][name] = current["metrics"].get(name, 0.0) + ms
+
+
+def record_timings(page, prefix, timings):
+    # Stage timings as returned in breakdown["timings"].
+    for stage, ms in (timings or {}).items():
+        record(page, f"{prefix}.{stage}", ms)
+
+
+@contextlib.contextmanager
+def span(page, name):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(page, name, (time.perf_counter() - started) * 1000.0)
+
+
+def note(page, label, value):
+    current = _state(page)["current"]
+    if current is not None:
+        current["notes"][label] = value
+
+
+def lookup(cache):
+    with _counters_lock:
+        _counters.setdefault(cache, [0, 0])[0] += 1
+
+
+def miss(cache):
+    with _counters_lock:
+        _counters.setdefault(cache, [0, 0])[1] += 1
+
+
+def counter_stats(cache):
+    with _counters_lock:
+        lookups, misses = _counters.get(cache, (0, 0))
+    return {"hits": max(lookups - misses, 0), "misses": misses}
+
+
+def _timing_rows(current, history):
+    names = list(current)
+    for metrics in history:
+        names.extend(name for name in metrics if name not in names)
+    rows = []
+    for name in names:
+        values = [metrics[name] for metrics in history if name in metrics]
+        row = {"Metric": name, "This rerun (ms)": current.get(name), "Reruns": len(values)}
+        for q, value in zip(PERCENTILES, np.percentile(values, PERCENTILES)):
+            row[f"p{q} (ms)"] = float(value)
+        rows.append(row)
+    return rows
+
+
+def _cache_rows(caches):
+    rows = []
+    for name, stats in caches.items():
+        lookups = stats["hits"] + stats["misses"]
+        rows.append({
+            "Cache": name,
+            "Hits": stats["hits"],
+            "Misses": stats["misses"],
+            "Hit rate": f"{stats['hits'] / lookups:.0%}" if lookups else "-",
+        })
+    return rows
+
+
+def render(page, caches=None):
+    # caches: {label: {"hits": n, "misses": n}}, process-wide since start.
+    state = _state(page)
+    current = state["current"]
+    if current is None:
+        return
+    current["metrics"]["script"] = (time.perf_counter() - current["started"]) * 1000.0
+    state["history"].append(current["metrics"])
+    state["current"] = None
+
+    with st.expander("Performance diagnostics"):
+        st.caption(
+            f"Script run: {current['metrics']['script']:,.1f} ms. "
+            f"Percentiles over the last {len(state['history'])} reruns of this session."
+        )
+        for label, value in current["notes"].items():
+            st.caption(f"{label}: {value}")
+        st.dataframe(
+            pd.DataFrame(_timing_rows(current["metrics"], state["history"])),
+            use_container_width=True,
+            hide_index=True,
+        )
+        if caches:
+            st.markdown("**Cache hit rates (this server process)**")
+            st.dataframe(pd.DataFrame(_cache_rows(caches)), use_container_width=True, hide_index=True)
@@ -0,0 +1,49 @@
+# ui/results.py
+from offer import offer_name
+
+# Result objects the UI keeps in st.session_state. Kept free of Streamlit so
+# benchmarks can build and measure the same objects.
+
+
+def build_per_gpu_rows(providers_cache, placement):
+    rows = []
+    for p in providers_cache:
+        key = offer_name(p["provider"], p["region"])
+        if key in placement:
+            price = p["price"]
+            gpus = placement[key]
+            rows.append({
+                "Provider": key,
+                "GPU Model": p["gpu"],
+                "GPUs": gpus,
+                "Price ($/hr)": price,
+                "Total $/hr": round(price * gpus, 4),
+            })
+    return rows
+
+
+def build_base_result(providers_cache, placement, cost, forbidden, breakdown, catalog_version):
+    breakdown["total_cost"] = cost
+    return {
+        "placement": placement,
+        "cost": cost,
+        "forbidden": forbidden,
+        "breakdown": breakdown,
+        "per_gpu_rows": build_per_gpu_rows(providers_cache, placement),
+        "catalog_version": catalog_version,
+    }
+
+
+def build_model_results(providers_cache, by_model):
+    results = {}
+    for model_name, (m_placement, m_cost, m_forbidden, m_breakdown) in by_model.items():
+        m_breakdown["total_cost"] = m_cost
+        results[model_name] = {
+            "model": model_name,
+            "placement": m_placement,
+            "cost": m_cost,
+            "forbidden": m_forbidden,
+            "breakdown": m_breakdown,
+            "per_gpu_rows": build_per_gpu_rows(providers_cache, m_placement),
+        }
+    return results
@@ -3,7 +3,10 @@ from typing import Any, Dict, Optional
 
 import requests
 
+from ui.services.observers import send
 
+
+SERVICE = "ai_extraction"
 DEFAULT_AI_EXTRACTION_URL = "http://127.0.0.1:4010"
 
 
@@ -24,6 +27,10 @@ def _extract_error_message(response: requests.Response, default_msg: str) -> str
     return default_msg
 
 
+def _send(method: str, url: str, operation: str, **kwargs: Any) -> requests.Response:
+    return send(SERVICE, method, url, operation, **kwargs)
+
+
 def _base_url() -> str:
     return os.getenv("AI_EXTRACTION_API_URL", DEFAULT_AI_EXTRACTION_URL).rstrip("/")
 
@@ -39,7 +46,7 @@ def extract_requirements(
     }
 
     try:
-        response = requests.post(endpoint, files=files, timeout=180)
+        response = _send("POST", endpoint, "extract", files=files, timeout=180)
     except requests.RequestException as exc:
         raise AiExtractionApiError(
             f"Unable to connect to ai-extraction-service at {endpoint}."
@@ -74,7 +81,7 @@ def submit_clarifications(
     }
 
     try:
-        response = requests.post(endpoint, json=body, timeout=180)
+        response = _send("POST", endpoint, "clarify", json=body, timeout=180)
     except requests.RequestException as exc:
         raise AiExtractionApiError(
             f"Unable to connect to ai-extraction-service at {endpoint}."
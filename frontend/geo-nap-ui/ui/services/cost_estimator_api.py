@@ -4,7 +4,10 @@ from typing import Any, Dict, Optional
 
 import requests
 
+from ui.services.observers import send
 
+
+SERVICE = "cost_estimator"
 DEFAULT_COST_ESTIMATOR_BASE_URL = "http://127.0.0.1:4001"
 DEFAULT_COST_ESTIMATOR_URL = f"{DEFAULT_COST_ESTIMATOR_BASE_URL}/estimate"
 
@@ -34,6 +37,10 @@ def _extract_error_message(response: requests.Response, default: str) -> str:
     return default
 
 
+def _send(method: str, url: str, operation: str, **kwargs: Any) -> requests.Response:
+    return send(SERVICE, method, url, operation, **kwargs)
+
+
 def _base_url() -> str:
     explicit = os.getenv("COST_ESTIMATOR_API_BASE_URL")
     if explicit and explicit.strip():
@@ -59,8 +66,10 @@ def _demo_auth_identity() -> Dict[str, str]:
 def _login(base: str, email: str, password: str) -> Optional[str]:
     endpoint = f"{base}/auth/login"
     try:
-        response = requests.post(
+        response = _send(
+            "POST",
             endpoint,
+            "login",
             json={"email": email, "password": password},
             timeout=20,
         )
@@ -83,8 +92,10 @@ def _login(base: str, email: str, password: str) -> Optional[str]:
 def _register(base: str, email: str, password: str, organization_name: str) -> str:
     endpoint = f"{base}/auth/register"
     try:
-        response = requests.post(
+        response = _send(
+            "POST",
             endpoint,
+            "register",
             json={
                 "email": email,
                 "password": password,
@@ -147,8 +158,10 @@ def _ensure_project(base: str, token: str, region: str) -> str:
 
     list_endpoint = f"{base}/projects"
     try:
-        response = requests.get(
+        response = _send(
+            "GET",
             list_endpoint,
+            "list_projects",
             headers=_auth_headers(token),
             timeout=20,
         )
@@ -183,8 +196,10 @@ def _ensure_project(base: str, token: str, region: str) -> str:
     create_endpoint = f"{base}/projects"
     project_name = f"GeoNAP {region_key}"
     try:
-        response = requests.post(
+        response = _send(
+            "POST",
             create_endpoint,
+            "create_project",
             headers=_auth_headers(token),
             json={"name": project_name, "region": region_key},
             timeout=20,
@@ -214,8 +229,20 @@ def _ensure_project(base: str, token: str, region: str) -> str:
     return project_id
 
 
-def estimate_cost(payload: Dict[str, Any]) -> Dict[str, Any]:
+def _elapsed_ms(started: float) -> float:
+    return (time.perf_counter() - started) * 1000.0
+
+
+def estimate_cost(
+    payload: Dict[str, Any],
+    timings: Optional[Dict[str, float]] = None,
+) -> Dict[str, Any]:
+    # timings, when given, is filled with auth_ms, submit_ms, poll_ms (submit
+    # response to final job status, sleeps included) and polls.
     global _TOKEN_CACHE
+    if timings is None:
+        timings = {}
+    started = time.perf_counter()
     base = _base_url()
     endpoint = f"{base}/estimate"
     poll_interval_sec = float(os.getenv("COST_ESTIMATOR_POLL_INTERVAL_SEC", "2"))
@@ -226,13 +253,17 @@ def estimate_cost(payload: Dict[str, Any]) -> Dict[str, Any]:
     project_id = payload.get("projectId")
     if not isinstance(project_id, str) or not project_id.strip():
         project_id = _ensure_project(base, token, region)
+    timings["auth_ms"] = _elapsed_ms(started)
 
     request_payload = dict(payload)
     request_payload["projectId"] = project_id
 
+    submit_started = time.perf_counter()
     try:
-        response = requests.post(
+        response = _send(
+            "POST",
             endpoint,
+            "estimate_submit",
             json=request_payload,
             headers=_auth_headers(token),
             timeout=20,
@@ -240,8 +271,10 @@ def estimate_cost(payload: Dict[str, Any]) -> Dict[str, Any]:
         if response.status_code == 401:
             _TOKEN_CACHE = None
             token = _ensure_auth_token(base)
-            response = requests.post(
+            response = _send(
+                "POST",
                 endpoint,
+                "estimate_submit",
                 json=request_payload,
                 headers=_auth_headers(token),
                 timeout=20,
@@ -265,6 +298,7 @@ def estimate_cost(payload: Dict[str, Any]) -> Dict[str, Any]:
         raise CostEstimatorApiError(
             "Cost estimator returned a non-JSON response."
         ) from exc
+    timings["submit_ms"] = _elapsed_ms(submit_started)
 
     # Backward compatibility: if service still returns synchronous result.
     if isinstance(submit_data, dict) and "results" in submit_data:
@@ -278,11 +312,16 @@ def estimate_cost(payload: Dict[str, Any]) -> Dict[str, Any]:
     job_id = submit_data["jobId"]
     status_endpoint = endpoint.rstrip("/") + f"/{job_id}"
     deadline = time.time() + timeout_sec
+    poll_started = time.perf_counter()
+    timings["polls"] = 0
 
     while time.time() <= deadline:
+        timings["polls"] += 1
         try:
-            status_response = requests.get(
+            status_response = _send(
+                "GET",
                 status_endpoint,
+                "estimate_status",
                 headers=_auth_headers(token),
                 timeout=20,
             )
@@ -307,6 +346,7 @@ def estimate_cost(payload: Dict[str, Any]) -> Dict[str, Any]:
             raise CostEstimatorApiError("Invalid job status response payload.")
 
         status = str(status_data.get("status", "")).upper()
+        timings["poll_ms"] = _elapsed_ms(poll_started)
         if status == "COMPLETED":
             result = status_data.get("result", [])
             if not isinstance(result, list):
@@ -0,0 +1,41 @@
+import logging
+import time
+from typing import Any, Callable, List
+
+import requests
+
+
+# observer(service, operation, status_code, seconds) after every backend call;
+# status_code is "error" when no response came back.
+Observer = Callable[[str, str, str, float], None]
+
+_observers: List[Observer] = []
+_logger = logging.getLogger("geo_nap.services")
+
+
+def add_observer(observer: Observer) -> Observer:
+    if observer not in _observers:
+        _observers.append(observer)
+    return observer
+
+
+def remove_observer(observer: Observer) -> None:
+    if observer in _observers:
+        _observers.remove(observer)
+
+
+def send(service: str, method: str, url: str, operation: str, **kwargs: Any) -> requests.Response:
+    # requests.request, timed and reported to the installed observers.
+    started = time.perf_counter()
+    status_code = "error"
+    try:
+        response = requests.request(method, url, **kwargs)
+        status_code = str(response.status_code)
+        return response
+    finally:
+        seconds = time.perf_counter() - started
+        for observer in list(_observers):
+            try:
+                observer(service, operation, status_code, seconds)
+            except Exception:
+                _logger.exception("service observer %r failed", observer)
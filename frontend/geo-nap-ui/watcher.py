@@ -0,0 +1,210 @@
+# watcher.py
+import ctypes
+import ctypes.util
+import fnmatch
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent
+
+# (directory, filename pattern) pairs whose changes invalidate cached data.
+WATCHED = (
+    (ROOT_DIR / "cache", "providers.json"),
+    (ROOT_DIR / "cache", "rtt_store.json"),
+    (ROOT_DIR / "cache" / "catalog", "CURRENT"),
+    (ROOT_DIR / "data", "*.csv"),
+)
+
+DEBOUNCE_SEC = 0.5
+POLL_INTERVAL_SEC = 2.0
+
+# inotify(7) constants
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+def _matches(name, patterns):
+    return any(fnmatch.fnmatch(name, pattern) for pattern in patterns)
+
+
+def _patterns_by_dir(watched):
+    by_dir = {}
+    for directory, pattern in watched:
+        by_dir.setdefault(Path(directory), []).append(pattern)
+    return by_dir
+
+
+class _InotifyBackend:
+    def __init__(self, watched):
+        libc_name = ctypes.util.find_library("c")
+        if not sys.platform.startswith("linux") or not libc_name:
+            raise OSError("inotify is not available")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs = {}
+        mask = IN_CLOSE_WRITE | IN_MOVED_TO | IN_MOVED_FROM | IN_CREATE | IN_DELETE
+        for directory, patterns in _patterns_by_dir(watched).items():
+            directory.mkdir(parents=True, exist_ok=True)
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), mask)
+            if wd < 0:
+                os.close(self._fd)
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+            self._dirs[wd] = (directory, patterns)
+
+    def wait(self, timeout):
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        changed = set()
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, _, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0").decode(errors="replace")
+            offset += length
+            directory, patterns = self._dirs.get(wd, (None, ()))
+            if directory is not None and _matches(name, patterns):
+                changed.add(directory / name)
+        return changed
+
+    def close(self):
+        os.close(self._fd)
+
+
+class _PollingBackend:
+    def __init__(self, watched, interval=POLL_INTERVAL_SEC):
+        self._by_dir = _patterns_by_dir(watched)
+        self._interval = interval
+        self._last = self._signature()
+
+    def _signature(self):
+        signature = {}
+        for directory, patterns in self._by_dir.items():
+            if not directory.exists():
+                continue
+            for entry in os.scandir(directory):
+                if entry.is_file() and _matches(entry.name, patterns):
+                    stat = entry.stat()
+                    signature[Path(entry.path)] = (stat.st_mtime_ns, stat.st_size)
+        return signature
+
+    def wait(self, timeout):
+        time.sleep(min(self._interval, timeout) if timeout is not None else self._interval)
+        current = self._signature()
+        changed = {p for p in current.keys() | self._last.keys() if current.get(p) != self._last.get(p)}
+        self._last = current
+        return changed
+
+    def close(self):
+        pass
+
+
+class FileWatcher:
+    # Calls every registered callback once per burst of changes (trailing
+    # debounce) and bumps a generation counter sessions can compare against.
+
+    def __init__(self, watched=WATCHED, debounce_sec=DEBOUNCE_SEC, force_polling=False):
+        self._watched = watched
+        self._debounce = debounce_sec
+        self._force_polling = force_polling
+        self._callbacks = {}
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._stop = threading.Event()
+        self._thread = None
+        self.backend_name = None
+
+    def register(self, key, callback):
+        # Keyed so Streamlit reruns re-registering the same hook don't duplicate it.
+        with self._lock:
+            self._callbacks[key] = callback
+
+    @property
+    def generation(self):
+        return self._generation
+
+    def start(self):
+        if self._thread is not None:
+            return self
+        backend = None
+        if not self._force_polling:
+            try:
+                backend = _InotifyBackend(self._watched)
+            except OSError:
+                backend = None
+        if backend is None:
+            backend = _PollingBackend(self._watched)
+        self.backend_name = "inotify" if isinstance(backend, _InotifyBackend) else "polling"
+        self._thread = threading.Thread(target=self._run, args=(backend,), name="geo-nap-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _fire(self, changed):
+        with self._lock:
+            self._generation += 1
+            callbacks = list(self._callbacks.values())
+        for callback in callbacks:
+            try:
+                callback(changed)
+            except Exception as exc:
+                print("watcher callback failed:", exc)
+
+    def _run(self, backend):
+        pending = set()
+        deadline = None
+        try:
+            while not self._stop.is_set():
+                timeout = POLL_INTERVAL_SEC if deadline is None else max(0.0, deadline - time.monotonic())
+                changed = backend.wait(timeout)
+                if changed:
+                    pending |= changed
+                    deadline = time.monotonic() + self._debounce
+                elif deadline is not None and time.monotonic() >= deadline:
+                    self._fire(pending)
+                    pending = set()
+                    deadline = None
+        finally:
+            backend.close()
+
+
+_watcher = None
+_watcher_lock = threading.Lock()
+
+
+def start_watching():
+    # Process-wide watcher that invalidates the catalog and engine caches.
+    global _watcher
+    with _watcher_lock:
+        if _watcher is None:
+            import catalog
+            import engine
+
+            _watcher = FileWatcher()
+            _watcher.register("catalog", lambda changed: catalog.invalidate())
+            _watcher.register("engine", lambda changed: engine.clear_caches())
+            _watcher.start()
+            catalog.set_pointer_watched(True)
+        return _watcher